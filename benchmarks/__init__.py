@@ -0,0 +1,4 @@
+"""Benchmarks for pyavreceiver.
+
+Run from the repository root, eg. `python -m benchmarks.http_api`.
+"""
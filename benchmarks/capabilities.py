@@ -0,0 +1,79 @@
+"""Benchmark update_all against a telnet stand-in for a model lacking some features.
+
+The stand-in answers every query except those of the unsupported groups.  Without
+capability learning every refresh waits on their retries.  With it, the first
+two refreshes learn the unsupported groups and later ones, and every refresh
+after a restart with the cache, skip them.  Reports the duration of each
+refresh, the queries sent and the time saved.
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.telnet_server import TelnetServer
+from pyavreceiver import const
+from pyavreceiver.cache import FileCache
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.dispatch import Dispatcher
+
+UNSUPPORTED = ("ECO", "SV", "PV", "SSLEV", "Z2CV", "Z2HPF")
+REFRESHES = 4
+
+
+class ModelServer(TelnetServer):
+    """Answer queries with a value, except those of unsupported groups."""
+
+    async def respond(self, message):
+        if message.startswith(UNSUPPORTED):
+            return None
+        if message.endswith("?"):
+            return f"{message[:-1]}50"
+        return await super().respond(message)
+
+
+async def measure(http_port: int, cache: FileCache) -> list:
+    """Return the (duration, queries sent, time saved) of each refresh."""
+    telnet = await ModelServer().start()
+    http_api = DenonAVRXApi("127.0.0.1", None)
+    http_api.port = http_port
+    avr = DenonReceiver(
+        "127.0.0.1", dispatcher=Dispatcher(), http_api=http_api, device_cache=cache
+    )
+    avr.telnet_connection.port = telnet.port
+    await avr.init()
+    avr.update_state({const.ATTR_POWER: True})
+    results = []
+    for _ in range(REFRESHES):
+        start = time.perf_counter()
+        plan = await avr.main.update_all()
+        results.append((time.perf_counter() - start, plan.sent, plan.time_saved))
+    await avr.disconnect()
+    await telnet.stop()
+    return results
+
+
+async def main():
+    """Run the benchmark."""
+    http = await FixtureServer().start()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.json")
+        print(f"{'run':12} {'refresh':>8} {'duration':>9} {'sent':>5} {'saved':>8}")
+        failures = const.DEFAULT_CAPABILITY_FAILURES
+        for run in ("no learning", "first start", "cached"):
+            const.DEFAULT_CAPABILITY_FAILURES = (
+                float("inf") if run == "no learning" else failures
+            )
+            results = await measure(http.port, FileCache(path))
+            for refresh, (duration, sent, saved) in enumerate(results, 1):
+                print(
+                    f"{run:12} {refresh:8} {duration * 1000:6.0f} ms {sent:5} "
+                    f"{saved * 1000:5.0f} ms"
+                )
+    await http.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
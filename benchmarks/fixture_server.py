@@ -0,0 +1,63 @@
+"""Local HTTP stand-in serving the Denon/Marantz XML test fixtures."""
+import asyncio
+import os
+
+from aiohttp import web
+
+from pyavreceiver.denon import const as denon_const
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "tests", "denon", "fixtures")
+
+ROUTES = {
+    denon_const.API_DEVICE_INFO_URL: "Deviceinfo-X1500H.xml",
+    denon_const.API_MAIN_ZONE_XML_URL: "MainZoneXml-1912.xml",
+    denon_const.API_MAIN_ZONE_XML_STATUS_URL: "MainZoneXmlStatus-1912.xml",
+    denon_const.API_APP_COMMAND_URL: "GetRename-Delete-X1500H.xml",
+    "/description.xml": "upnp-X1500H.xml",
+    "/upnp/desc/aios_device/aios_device.xml": "upnp-X1500H.xml",
+}
+
+
+def read_fixture(name: str) -> str:
+    """Return the contents of a fixture file."""
+    with open(os.path.join(FIXTURES, name)) as file:
+        return file.read()
+
+
+class FixtureServer:
+    """Serve fixture files with optional injected latency."""
+
+    def __init__(self, routes: dict = None, *, latency: float = 0.0):
+        """Init the server."""
+        self.routes = {
+            path: read_fixture(name) for path, name in (routes or ROUTES).items()
+        }
+        self.latency = latency
+        self.requests = 0
+        self.connections = set()
+        self.port = None  # type: int
+        self._runner = None  # type: web.AppRunner
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.path not in self.routes:
+            raise web.HTTPNotFound()
+        return web.Response(text=self.routes[request.path], content_type="text/xml")
+
+    async def start(self, port: int = 0) -> "FixtureServer":
+        """Start listening on localhost."""
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        await self._runner.cleanup()
@@ -0,0 +1,118 @@
+"""Benchmark the CPU and memory of many receivers, standalone and in a fleet.
+
+Simulated receivers are served by one local telnet stand-in, each at its own
+loopback address, with their device info cached so that no HTTP is needed.
+Reports, for each count and in a fresh process, the wall and CPU time to start
+them all, the CPU used over an idle period and the memory they hold.  Standalone
+receivers each load the command table and run their own heartbeat; a
+ReceiverFleet shares them.
+"""
+import asyncio
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.telnet_server import TelnetServer
+from pyavreceiver import const
+from pyavreceiver.cache import FileCache
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.fleet import ReceiverFleet
+from pyavreceiver.http_api import create_session
+
+COUNTS = (10, 100, 1000)
+IDLE = 5.0  # seconds
+DEVICE_INFO = {const.INFO_MODEL: "AVR-X1500H", const.INFO_ZONES: 2}
+
+
+def rss() -> int:
+    """Return the resident memory of the process in bytes."""
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def hosts(count: int) -> list:
+    """Return count loopback addresses."""
+    return [f"127.0.{i // 250}.{i % 250 + 1}" for i in range(count)]
+
+
+async def measure(count: int, port: int, cache: FileCache, fleet: bool) -> tuple:
+    """Return the start wall and CPU seconds, idle CPU seconds and memory."""
+    gc.collect()
+    memory = rss()
+    session = create_session()
+    start, cpu = time.perf_counter(), time.process_time()
+    if fleet:
+        receivers = ReceiverFleet(device_cache=cache)
+        for host in hosts(count):
+            http_api = DenonAVRXApi(host, None, session=session)
+            receivers.add(host, http_api=http_api).telnet_connection.port = port
+        await receivers.start()
+        connected = sum(
+            health["state"] == const.STATE_CONNECTED
+            for health in receivers.health().values()
+        )
+    else:
+        receivers = []
+        for host in hosts(count):
+            http_api = DenonAVRXApi(host, None, session=session)
+            receiver = DenonReceiver(host, device_cache=cache, http_api=http_api)
+            receiver.telnet_connection.port = port
+            receivers.append(receiver)
+        await asyncio.gather(*(receiver.init() for receiver in receivers))
+        connected = sum(r.connection_state == const.STATE_CONNECTED for r in receivers)
+    started, started_cpu = time.perf_counter() - start, time.process_time() - cpu
+    cpu = time.process_time()
+    await asyncio.sleep(IDLE)
+    idle_cpu = time.process_time() - cpu
+    gc.collect()
+    memory = rss() - memory
+    if fleet:
+        await receivers.stop()
+    else:
+        await asyncio.gather(*(receiver.disconnect() for receiver in receivers))
+    await session.close()
+    return connected, started, started_cpu, idle_cpu, memory
+
+
+async def run(count: int, fleet: bool) -> None:
+    """Measure count receivers in one mode and print a row."""
+    telnet = await TelnetServer().start(host="0.0.0.0")
+    with tempfile.TemporaryDirectory() as path:
+        cache = FileCache(os.path.join(path, "devices.json"))
+        for host in hosts(count):
+            cache.set(host, {"device_info": DEVICE_INFO, "sources": None})
+        connected, started, start_cpu, idle_cpu, memory = await measure(
+            count, telnet.port, cache, fleet
+        )
+    await telnet.stop()
+    print(
+        f"{count:9} {'fleet' if fleet else 'standalone':10} "
+        f"{connected:9} {started:7.2f} s {start_cpu:7.2f} s "
+        f"{idle_cpu:7.2f} s {memory / 2**20:6.1f} MB"
+    )
+
+
+def main(counts):
+    """Run the benchmark, each measurement in a fresh process."""
+    print(f"idle for {IDLE:.0f} s after starting")
+    print(
+        f"{'receivers':>9} {'mode':10} {'connected':>9} {'start':>9} "
+        f"{'start cpu':>9} {'idle cpu':>9} {'memory':>9}"
+    )
+    for count in counts:
+        for mode in ("standalone", "fleet"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.fleet", "--run", str(count), mode],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        asyncio.run(run(int(sys.argv[2]), sys.argv[3] == "fleet"))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or COUNTS)
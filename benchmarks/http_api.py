@@ -0,0 +1,63 @@
+"""Benchmark the Denon HTTP API against a local fixture server.
+
+Compares a new ClientSession per request with one pooled keep-alive session.
+"""
+import asyncio
+import time
+
+import aiohttp
+
+from benchmarks.fixture_server import FixtureServer
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.http_api import DenonAVRXApi
+
+ITERATIONS = 200
+
+
+async def unpooled(port: int) -> None:
+    """Emulate the previous behaviour: a session per request."""
+    for path in (denon_const.API_DEVICE_INFO_URL, "/goform/AppCommand.xml"):
+        async with aiohttp.ClientSession() as session:
+            async with session.post(f"http://127.0.0.1:{port}{path}") as resp:
+                await resp.text()
+
+
+async def pooled(api: DenonAVRXApi) -> None:
+    """Make the same requests through the shared session."""
+    await api._get_device_info()  # pylint: disable=protected-access
+    await api._app_command(b"")  # pylint: disable=protected-access
+
+
+async def main():
+    """Run the benchmark."""
+    server = await FixtureServer().start()
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await unpooled(server.port)
+    unpooled_time = time.perf_counter() - start
+    unpooled_connections = len(server.connections)
+
+    server.connections.clear()
+    api = DenonAVRXApi("127.0.0.1", None)
+    api.port = server.port
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await pooled(api)
+    pooled_time = time.perf_counter() - start
+    await api.close()
+
+    print(f"{ITERATIONS} x (device info + source names)")
+    print(
+        f"session per request: {unpooled_time * 1000 / ITERATIONS:.2f} ms/iter, "
+        f"{unpooled_connections} TCP connections"
+    )
+    print(
+        f"pooled session:      {pooled_time * 1000 / ITERATIONS:.2f} ms/iter, "
+        f"{len(server.connections)} TCP connections"
+    )
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""Benchmark HTTP state polling against a stand-in with changing state.
+
+The stand-in answers the batched AppCommand status request.  A scenario changes
+the volume in bursts separated by idle periods, and each poller is measured for
+the delay until a change is observed and the rate of requests it makes.
+"""
+import asyncio
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from pyavreceiver import const
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.http_poller import DenonHTTPPoller
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.dispatch import Dispatcher
+
+LATENCY = 0.005
+BURSTS = 3
+BURST_CHANGES = 5
+BURST_SPACING = 0.1
+IDLE = 2.0
+VOLUME = "<volume>-40.5</volume>"
+
+POLLERS = {
+    "fixed 0.1 s": {"min_interval": 0.1, "max_interval": 0.1},
+    "fixed 1.0 s": {"min_interval": 1.0, "max_interval": 1.0},
+    "adaptive 0.1-1.0 s": {"min_interval": 0.1, "max_interval": 1.0, "backoff": 1.5},
+}
+
+
+async def run_scenario(server: FixtureServer, template: str) -> list:
+    """Change the volume in bursts and return the times of the changes."""
+    changes = []
+    volume = -40.0
+    for _ in range(BURSTS):
+        await asyncio.sleep(IDLE)
+        for _ in range(BURST_CHANGES):
+            volume += 0.5
+            server.routes[denon_const.API_APP_COMMAND_URL] = template.replace(
+                VOLUME, f"<volume>{volume}</volume>"
+            )
+            changes.append((time.perf_counter(), volume))
+            await asyncio.sleep(BURST_SPACING)
+    await asyncio.sleep(IDLE / 2)
+    return changes
+
+
+async def measure(server: FixtureServer, template: str, kwargs: dict) -> tuple:
+    """Return the mean and max delay, missed changes and requests per second."""
+    server.routes[denon_const.API_APP_COMMAND_URL] = template
+    observed = []
+    dispatcher = Dispatcher()
+    dispatcher.connect(
+        const.SIGNAL_STATE_UPDATE,
+        lambda changes: const.ATTR_VOLUME in changes
+        and observed.append((time.perf_counter(), changes[const.ATTR_VOLUME])),
+    )
+    http_api = DenonAVRXApi("127.0.0.1", None)
+    http_api.port = server.port
+    avr = DenonReceiver("127.0.0.1", dispatcher=dispatcher, http_api=http_api)
+    await avr.telnet_connection.init_command_table()
+    poller = DenonHTTPPoller(avr, http_api, **kwargs)
+
+    await poller.poll()
+    observed.clear()
+    server.requests = 0
+    start = time.perf_counter()
+    await poller.start()
+    changes = await run_scenario(server, template)
+    await poller.stop()
+    duration = time.perf_counter() - start
+    await http_api.close()
+
+    delays = []
+    for change_time, volume in changes:
+        for observed_time, observed_volume in observed:
+            if observed_volume == volume:
+                delays.append(observed_time - change_time)
+                break
+    missed = len(changes) - len(delays)
+    mean = sum(delays) / len(delays) if delays else float("nan")
+    return mean, max(delays, default=float("nan")), missed, server.requests / duration
+
+
+async def main():
+    """Run the benchmark."""
+    server = await FixtureServer(
+        {denon_const.API_APP_COMMAND_URL: "GetAllZoneStatus-X1500H.xml"},
+        latency=LATENCY,
+    ).start()
+    template = server.routes[denon_const.API_APP_COMMAND_URL]
+    print(
+        f"{BURSTS} bursts of {BURST_CHANGES} changes {BURST_SPACING} s apart, "
+        f"{IDLE} s idle, {LATENCY * 1000:.0f} ms server latency"
+    )
+    print(
+        f"{'poller':20} {'mean delay':>11} {'max delay':>10} {'missed':>7} {'req/s':>7}"
+    )
+    for name, kwargs in POLLERS.items():
+        mean, worst, missed, rate = await measure(server, template, kwargs)
+        print(
+            f"{name:20} {mean * 1000:8.0f} ms {worst * 1000:7.0f} ms "
+            f"{missed:7} {rate:7.2f}"
+        )
+    await server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""Benchmark fixed and adaptive message pacing against simulated receivers.
+
+The simulated receiver drops a message that arrives sooner than its minimum gap
+after the last message it accepted, as an older unit under load does, and
+answers the others.  Volume steps of three zones are sent concurrently, each
+awaiting its reply, with the fixed 50 ms interval and with adaptive pacing.
+Reports the duration, throughput, retries and the interval the pacing settled
+on, for a fast and for a slow receiver.
+"""
+import asyncio
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.telnet_server import TelnetServer
+from pyavreceiver import const
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.dispatch import Dispatcher
+from pyavreceiver.pacing import AdaptivePacer
+
+ZONES = (const.ATTR_VOLUME, const.ATTR_ZONE2_VOLUME, const.ATTR_ZONE3_VOLUME)
+STEPS = 30
+DEVICES = {"fast": 0.015, "slow": 0.07}  # minimum gap between accepted messages
+
+
+class GapServer(TelnetServer):
+    """Drop messages that arrive sooner than the gap after the last accepted."""
+
+    def __init__(self, gap: float, **kwargs):
+        """Init the server."""
+        super().__init__(**kwargs)
+        self.gap = gap
+        self.dropped = 0
+        self._last = 0.0
+
+    async def respond(self, message):
+        now = time.perf_counter()
+        if now - self._last < self.gap:
+            self.dropped += 1
+            return None
+        self._last = now
+        return await super().respond(message)
+
+
+async def steps(connection, name: str) -> int:
+    """Step the volume of a zone and return the steps resolved."""
+    command = connection.commands[name]
+    resolved = 0
+    for step in range(STEPS):
+        val = -40.0 + step * 0.5
+        resolved += (
+            await connection.async_send_command(command.set_val(val, qos=2)) is not None
+        )
+    return resolved
+
+
+async def measure(http_port: int, gap: float, adaptive: bool) -> tuple:
+    """Return the duration, resolved steps, retries, drops and final interval."""
+    telnet = await GapServer(gap).start()
+    http_api = DenonAVRXApi("127.0.0.1", None)
+    http_api.port = http_port
+    avr = DenonReceiver("127.0.0.1", dispatcher=Dispatcher(), http_api=http_api)
+    avr.telnet_connection.port = telnet.port
+    await avr.init()
+    connection = avr.telnet_connection
+    if not adaptive:
+        interval = const.DEFAULT_MESSAGE_INTERVAL_LIMIT
+        connection.pacer = AdaptivePacer(interval, minimum=interval, maximum=interval)
+    start = time.perf_counter()
+    resolved = await asyncio.gather(*(steps(connection, name) for name in ZONES))
+    duration = time.perf_counter() - start
+    result = (
+        duration,
+        sum(resolved),
+        avr.metrics["commands_resent"],
+        telnet.dropped,
+        connection.message_interval_limit,
+    )
+    await avr.disconnect()
+    await telnet.stop()
+    return result
+
+
+async def main():
+    """Run the benchmark."""
+    http = await FixtureServer().start()
+    total = STEPS * len(ZONES)
+    print(f"{STEPS} volume steps in each of {len(ZONES)} zones, concurrently")
+    print(
+        f"{'device':7} {'pacing':9} {'duration':>10} {'steps/s':>8} "
+        f"{'resolved':>9} {'retries':>8} {'dropped':>8} {'interval':>9}"
+    )
+    for device, gap in DEVICES.items():
+        for adaptive in (False, True):
+            duration, resolved, retries, dropped, interval = await measure(
+                http.port, gap, adaptive
+            )
+            print(
+                f"{device:7} {'adaptive' if adaptive else 'fixed':9} "
+                f"{duration * 1000:7.0f} ms {total / duration:8.1f} "
+                f"{resolved:5}/{total} {retries:8} {dropped:8} "
+                f"{interval * 1000:6.1f} ms"
+            )
+    await http.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""Benchmark device probing against fixture servers with injected latency.
+
+One server stands in for a missing endpoint that answers slowly with 404, the
+other for the device's real UPnP description endpoint.
+"""
+import asyncio
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from pyavreceiver.http_api import create_session
+from pyavreceiver.probe import clear_probe_cache, probe
+
+ITERATIONS = 10
+
+
+async def gather_all(session, endpoints: dict) -> str:
+    """Emulate the previous factory: request every endpoint and gather."""
+
+    async def get(url):
+        async with session.get(f"http://127.0.0.1{url}") as resp:
+            return resp.status, await resp.text()
+
+    names = list(endpoints)
+    responses = await asyncio.gather(*(get(endpoints[name]) for name in names))
+    for name, (status, _) in zip(names, responses):
+        if status == 200:
+            return name
+    return None
+
+
+async def main():
+    """Run the benchmark."""
+    slow = await FixtureServer({}, latency=0.5).start()
+    fast = await FixtureServer(latency=0.02).start()
+    endpoints = {
+        "denon-avr": f":{slow.port}/description.xml",
+        "denon-avr-x": f":{slow.port}/description.xml",
+        "denon-avr-x-2016": f":{fast.port}/upnp/desc/aios_device/aios_device.xml",
+    }
+    session = create_session(limit_per_host=10)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await gather_all(session, endpoints)
+    gather_time = (time.perf_counter() - start) / ITERATIONS
+    gather_requests = slow.requests + fast.requests
+
+    slow.requests = fast.requests = 0
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        clear_probe_cache()
+        await probe("127.0.0.1", session, endpoints=endpoints)
+    race_time = (time.perf_counter() - start) / ITERATIONS
+    race_requests = slow.requests + fast.requests
+
+    slow.requests = fast.requests = 0
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await probe("127.0.0.1", session, endpoints=endpoints)
+    cached_time = (time.perf_counter() - start) / ITERATIONS
+    cached_requests = slow.requests + fast.requests
+
+    print(
+        f"slow endpoint {slow.latency * 1000:.0f} ms, fast {fast.latency * 1000:.0f} ms"
+    )
+    print(f"gather all:     {gather_time * 1000:7.1f} ms, {gather_requests} requests")
+    print(f"race:           {race_time * 1000:7.1f} ms, {race_requests} requests")
+    print(f"cached driver:  {cached_time * 1000:7.1f} ms, {cached_requests} requests")
+    await session.close()
+    await slow.stop()
+    await fast.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
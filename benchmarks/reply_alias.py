@@ -0,0 +1,99 @@
+"""Benchmark volume steps against a local telnet stand-in that replies like a receiver.
+
+A receiver answers MVUP with the new volume, eg. MV455, not with MVUP.  Compares
+the average async_send_command latency of the volume step commands resolved on
+their reply group with the same commands built without the ^reply aliases, as
+before, which only resolve by timing out.
+"""
+import asyncio
+import copy
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.telnet_server import TelnetServer
+from pyavreceiver import const
+from pyavreceiver.denon.commands import get_command_lookup
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.dispatch import Dispatcher
+
+COMMANDS = (
+    const.ATTR_VOLUME_UP,
+    const.ATTR_VOLUME_DOWN,
+    const.ATTR_ZONE2_VOLUME_UP,
+    const.ATTR_ZONE2_VOLUME_DOWN,
+)
+STEPS = 10
+
+
+class VolumeServer(TelnetServer):
+    """Reply to volume steps with the new volume."""
+
+    def __init__(self, **kwargs):
+        """Init the server."""
+        super().__init__(**kwargs)
+        self.volume = {"MV": 450, "Z2": 450}
+
+    async def respond(self, message):
+        for group in self.volume:
+            if message in (f"{group}UP", f"{group}DOWN"):
+                self.volume[group] += 5 if message.endswith("UP") else -5
+                return f"{group}{self.volume[group]:03}"
+        return await super().respond(message)
+
+
+def strip_aliases(entry):
+    """Return the command table without ^reply entries."""
+    if isinstance(entry, dict):
+        return {
+            key: strip_aliases(value)
+            for key, value in entry.items()
+            if key != const.COMMAND_REPLY
+        }
+    return entry
+
+
+async def measure(http_port: int, aliases: bool) -> dict:
+    """Return the average latency and resolved count of each command."""
+    telnet = await VolumeServer().start()
+    http_api = DenonAVRXApi("127.0.0.1", None)
+    http_api.port = http_port
+    avr = DenonReceiver("127.0.0.1", dispatcher=Dispatcher(), http_api=http_api)
+    avr.telnet_connection.port = telnet.port
+    await avr.init()
+    connection = avr.telnet_connection
+    lookup = connection.commands
+    if not aliases:
+        lookup = get_command_lookup(
+            strip_aliases(copy.deepcopy(connection.command_dict))
+        )
+    results = {}
+    for name in COMMANDS:
+        latencies, resolved = [], 0
+        for _ in range(STEPS):
+            start = time.perf_counter()
+            response = await connection.async_send_command(lookup[name].set_val(qos=2))
+            latencies.append(time.perf_counter() - start)
+            resolved += response is not None
+        results[name] = sum(latencies) / len(latencies), resolved
+    await avr.disconnect()
+    await telnet.stop()
+    return results
+
+
+async def main():
+    """Run the benchmark."""
+    http = await FixtureServer().start()
+    print(f"{STEPS} steps of each command, average async_send_command latency")
+    print(f"{'command':20} {'aliases':>8} {'latency':>10} {'resolved':>9}")
+    for aliases in (False, True):
+        for name, (latency, resolved) in (await measure(http.port, aliases)).items():
+            print(
+                f"{name:20} {'yes' if aliases else 'no':>8} "
+                f"{latency * 1000:7.1f} ms {resolved:6}/{STEPS}"
+            )
+    await http.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
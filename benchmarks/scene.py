@@ -0,0 +1,146 @@
+"""Benchmark applying a scene to a receiver that is slow to turn on.
+
+The telnet stand-in ignores a zone's commands while it is turning on and only
+confirms power once it is on, like a receiver leaving standby.  Applying all the
+settings at once relies on retries, a fixed sleep after power on must allow for
+the worst case, and a scene waits for the confirmation of each stage.
+"""
+import asyncio
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.telnet_server import TelnetServer
+from pyavreceiver import const
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.dispatch import Dispatcher
+from pyavreceiver.scene import Scene
+
+WARMUP = 0.2  # seconds for a zone to turn on
+FIXED_SLEEP = 1.0  # worst case allowance for turning on
+
+SCENE = {
+    "main": {
+        const.ATTR_ZONE1_POWER: True,
+        const.ATTR_SOURCE: "DVD",
+        const.ATTR_SOUND_MODE: "movie",
+        const.ATTR_BASS: 2,
+        const.ATTR_TREBLE: -1,
+        const.ATTR_VOLUME: -30,
+    },
+    "zone2": {
+        const.ATTR_POWER: True,
+        const.ATTR_SOURCE: "TUNER",
+        const.ATTR_VOLUME: -40,
+    },
+}
+POWER_MESSAGES = {"ZMON": "main", "Z2ON": "zone2"}
+
+
+class WarmupTelnetServer(TelnetServer):
+    """Ignore a zone's commands until WARMUP after it was turned on."""
+
+    def __init__(self):
+        """Init the server."""
+        super().__init__()
+        self.on_since = {}
+
+    async def respond(self, message: str):
+        if zone := POWER_MESSAGES.get(message):
+            self.on_since.setdefault(zone, time.perf_counter())
+            await asyncio.sleep(self.on_since[zone] + WARMUP - time.perf_counter())
+            return message
+        zone = "zone2" if message.startswith("Z2") else "main"
+        if time.perf_counter() < self.on_since.get(zone, float("inf")) + WARMUP:
+            return None  # still turning on
+        return message
+
+
+async def bounded(awaitable):
+    """Await a command, counting a reply that never arrives as failed."""
+    try:
+        return await asyncio.wait_for(awaitable, 2 * const.DEFAULT_COMMAND_EXPIRATION)
+    except asyncio.TimeoutError:
+        return None
+
+
+async def all_at_once(avr):
+    """Send every setting at once, relying on retries.
+
+    Settings of one zone2 group overwrite each other in the queue, and the
+    overwritten requests may never resolve.
+    """
+    tasks = [
+        bounded(getattr(avr, zone).set(name, val, 2))
+        for zone, settings in SCENE.items()
+        for name, val in settings.items()
+    ]
+    return await asyncio.gather(*tasks)
+
+
+async def fixed_sleep(avr):
+    """Turn the zones on, sleep for the worst case, then send the rest."""
+    await asyncio.gather(
+        avr.main.set(const.ATTR_ZONE1_POWER, True, 3),
+        avr.zone2.set(const.ATTR_POWER, True, 3),
+    )
+    await asyncio.sleep(FIXED_SLEEP)
+    return await asyncio.gather(
+        *(
+            getattr(avr, zone).set(name, val, 2)
+            for zone, settings in SCENE.items()
+            for name, val in settings.items()
+            if "power" not in name
+        )
+    )
+
+
+async def scene(avr):
+    """Apply the settings as a scene."""
+    return await Scene(SCENE).apply(avr)
+
+
+async def measure(http_port: int, apply) -> tuple:
+    """Return the latency, failed settings and messages sent of one strategy."""
+    telnet = await WarmupTelnetServer().start()
+    http_api = DenonAVRXApi("127.0.0.1", None)
+    http_api.port = http_port
+    avr = DenonReceiver("127.0.0.1", dispatcher=Dispatcher(), http_api=http_api)
+    avr.telnet_connection.port = telnet.port
+    await avr.init()
+    await asyncio.sleep(0.1)
+    telnet.messages.clear()
+
+    start = time.perf_counter()
+    result = await apply(avr)
+    latency = time.perf_counter() - start
+    if isinstance(result, list):
+        failed = sum(1 for response in result if response is None)
+    else:
+        failed = sum(
+            not ok for zone in result.outcomes.values() for ok in zone.values()
+        )
+    sent = len([message for message in telnet.messages if "?" not in message])
+    await avr.disconnect()
+    await telnet.stop()
+    return latency, failed, sent
+
+
+async def main():
+    """Run the benchmark."""
+    http = await FixtureServer().start()
+    settings = sum(len(settings) for settings in SCENE.values())
+    print(f"{settings} settings in 2 zones, {WARMUP * 1000:.0f} ms to turn on")
+    print(f"{'strategy':16} {'latency':>10} {'failed':>7} {'sent':>5}")
+    for name, apply in (
+        ("all at once", all_at_once),
+        ("fixed sleep", fixed_sleep),
+        ("scene", scene),
+    ):
+        latency, failed, sent = await measure(http.port, apply)
+        print(f"{name:16} {latency * 1000:7.0f} ms {failed:7} {sent:5}")
+    await http.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""Local telnet stand-in for a Denon/Marantz receiver."""
+import asyncio
+import time
+from typing import List, Optional
+
+import telnetlib3
+
+
+class TelnetServer:
+    """Reply to each message like a receiver, by default with the message.
+
+    Subclasses override respond to model other behaviour.
+    """
+
+    def __init__(self, *, latency: float = 0.0):
+        """Init the server."""
+        self.latency = latency
+        self.messages = []  # type: List[str]
+        self.times = []  # type: List[float]
+        self.port = None  # type: int
+        self._server = None
+
+    async def respond(self, message: str) -> Optional[str]:
+        """Return the reply to message, if any."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return message
+
+    async def _shell(self, reader, writer) -> None:
+        async def reply(message):
+            if response := await self.respond(message):
+                writer.write(f"{response}\r")
+
+        try:
+            while message := await reader.readuntil(separator=b"\r"):
+                message = message.decode()[:-1]
+                self.messages.append(message)
+                self.times.append(time.perf_counter())
+                asyncio.create_task(reply(message))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    async def start(self, port: int = 0, host: str = "127.0.0.1") -> "TelnetServer":
+        """Start listening, by default on localhost."""
+        self._server = await telnetlib3.create_server(
+            host=host, port=port, shell=self._shell
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        self._server.close()
+        await self._server.wait_closed()
@@ -0,0 +1,94 @@
+"""Benchmark fading the volume against a local telnet stand-in.
+
+Compares calling set_volume in a loop, as before, with ramp_volume.  Reports the
+messages sent, how evenly they were spaced and how many of them created an
+ExpectedResponse.
+"""
+import asyncio
+import statistics
+import time
+
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.telnet_server import TelnetServer
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.dispatch import Dispatcher
+
+START, TARGET = -50.0, -30.0
+DURATION = 1.0
+LOOP_STEP = 0.5
+LOOP_SLEEP = 0.025  # typical hand written fade
+
+
+async def set_volume_loop(avr):
+    """Fade by calling set_volume in a loop with a fixed sleep."""
+    level = START
+    while level < TARGET:
+        level += LOOP_STEP
+        asyncio.create_task(avr.main.set_volume(level))
+        await asyncio.sleep(LOOP_SLEEP)
+    return await avr.main.set_volume(TARGET)
+
+
+async def ramp(avr):
+    """Fade with ramp_volume."""
+    return await avr.main.ramp_volume(TARGET, DURATION)
+
+
+async def measure(http_port: int, fade) -> tuple:
+    """Return the duration, messages, interval jitter and expected responses."""
+    telnet = await TelnetServer().start()
+    http_api = DenonAVRXApi("127.0.0.1", None)
+    http_api.port = http_port
+    avr = DenonReceiver("127.0.0.1", dispatcher=Dispatcher(), http_api=http_api)
+    avr.telnet_connection.port = telnet.port
+    await avr.init()
+    avr.update_state({"volume": START})
+    await asyncio.sleep(0.1)
+    expected = 0
+    connection = avr.telnet_connection
+    async_send_command = connection.async_send_command
+
+    def counting_send(command):
+        nonlocal expected
+        expected += 1
+        return async_send_command(command)
+
+    connection.async_send_command = counting_send
+    telnet.messages.clear()
+    telnet.times.clear()
+
+    start = time.perf_counter()
+    await fade(avr)
+    duration = time.perf_counter() - start
+    times = [
+        sent
+        for sent, message in zip(telnet.times, telnet.messages)
+        if message.startswith("MV")
+    ]
+    intervals = [later - earlier for earlier, later in zip(times, times[1:])]
+    jitter = statistics.pstdev(intervals) if intervals else 0.0
+    await avr.disconnect()
+    await telnet.stop()
+    return duration, len(times), jitter, expected
+
+
+async def main():
+    """Run the benchmark."""
+    http = await FixtureServer().start()
+    print(f"fade {START} dB to {TARGET} dB")
+    print(
+        f"{'strategy':16} {'duration':>9} {'messages':>9} "
+        f"{'jitter':>10} {'expected':>9}"
+    )
+    for name, fade in (("set_volume loop", set_volume_loop), ("ramp_volume", ramp)):
+        duration, messages, jitter, expected = await measure(http.port, fade)
+        print(
+            f"{name:16} {duration * 1000:6.0f} ms {messages:9} "
+            f"{jitter * 1000:7.1f} ms {expected:9}"
+        )
+    await http.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
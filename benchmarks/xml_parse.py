@@ -0,0 +1,103 @@
+"""Benchmark parsing the fixture XML responses.
+
+Compares building a full ElementTree from the whole body, as before, with
+feeding the incremental parsers chunk by chunk as the body would arrive.
+"""
+import os
+import timeit
+from xml.etree import ElementTree as ET
+
+from benchmarks.fixture_server import FIXTURES
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.xml_parser import (
+    DeviceInfoParser,
+    LegacyRenamedSourcesParser,
+    RenamedSourcesParser,
+)
+
+NUMBER = 200
+
+
+def tree_device_info(xml: str) -> dict:
+    """Parse device info with a full tree and several find scans."""
+    root = ET.fromstring(xml)
+    xmlns = "{urn:schemas-upnp-org:device-1-0}"
+    info = {}
+    for key, tags in (
+        ("model_name", ("ModelName", f"*/{xmlns}modelName")),
+        ("mac_address", ("MacAddress",)),
+        ("serial_number", (f"*/{xmlns}serialNumber",)),
+        ("zones", ("DeviceZones",)),
+        ("manufacturer", (f"*/{xmlns}manufacturer",)),
+        ("friendly_name", (f"*/{xmlns}friendlyName",)),
+    ):
+        for tag in tags:
+            if (elem := root.find(tag)) is not None:
+                info[key] = elem.text
+                break
+    return info
+
+
+def tree_renamed(xml: str) -> dict:
+    """Parse renamed and deleted sources with a full tree."""
+    root = ET.fromstring(xml)
+    deleted = {
+        entry.find("name").text.strip().lower()
+        for entry in root.find("*/functiondelete").findall("list")
+        if entry.find("use").text == "0"
+    }
+    return {
+        entry.find(
+            "rename"
+        ).text.strip(): denon_const.MAP_HTTP_SOURCE_NAME_TO_TELNET.get(
+            entry.find("name").text.strip().lower()
+        )
+        for entry in root.find("*/functionrename").findall("list")
+        if entry.find("name").text.strip().lower() not in deleted
+    }
+
+
+def tree_legacy(xml: str) -> dict:
+    """Read the legacy source lists with a full tree."""
+    root = ET.fromstring(xml)
+    return {
+        tag: [value.text for value in root.find(tag) or []]
+        for tag in LegacyRenamedSourcesParser.SECTIONS
+    }
+
+
+def streamed(parser_class, data: bytes):
+    """Feed data in chunks until the parser is done."""
+    parser = parser_class()
+    for i in range(0, len(data), denon_const.XML_CHUNK_SIZE):
+        if parser.feed(data[i : i + denon_const.XML_CHUNK_SIZE]):
+            break
+    return parser.close()
+
+
+def main():
+    """Run the benchmark."""
+    cases = []
+    for name in sorted(os.listdir(FIXTURES)):
+        if name.startswith(("Deviceinfo", "upnp")):
+            cases.append((name, tree_device_info, DeviceInfoParser))
+        elif name.startswith("GetRename"):
+            cases.append((name, tree_renamed, RenamedSourcesParser))
+        elif name.startswith("MainZone"):
+            cases.append((name, tree_legacy, LegacyRenamedSourcesParser))
+
+    print(f"{'fixture':32} {'bytes':>7} {'tree us':>9} {'stream us':>10}")
+    for name, tree_func, parser_class in cases:
+        with open(os.path.join(FIXTURES, name), "rb") as file:
+            data = file.read()
+        text = data.decode()
+        tree = timeit.timeit(lambda: tree_func(text), number=NUMBER)
+        stream = timeit.timeit(lambda: streamed(parser_class, data), number=NUMBER)
+        print(
+            f"{name:32} {len(data):7} {tree * 1e6 / NUMBER:9.1f} "
+            f"{stream * 1e6 / NUMBER:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,74 @@
 """pyavreceiver - interface to control Audio/Video Receivers."""
-import asyncio
 import logging
+from typing import Optional
 
 import aiohttp
 
 from pyavreceiver import const
+from pyavreceiver.admission import AdmissionController
+from pyavreceiver.cache import FileCache
 from pyavreceiver.denon.http_api import DenonAVRApi, DenonAVRX2016Api, DenonAVRXApi
 from pyavreceiver.denon.receiver import DenonReceiver
-from pyavreceiver.error import AVReceiverIncompatibleDeviceError
+from pyavreceiver.http_api import create_session
+from pyavreceiver.probe import probe
 
 _LOGGER = logging.getLogger(__name__)
 
+DRIVERS = {
+    "denon-avr": (DenonReceiver, DenonAVRApi),
+    "denon-avr-x": (DenonReceiver, DenonAVRXApi),
+    "denon-avr-x-2016": (DenonReceiver, DenonAVRX2016Api),
+}
 
-async def factory(host: str, log_level: int = logging.WARNING):
-    """Return an instance of an AV Receiver."""
+
+async def factory(
+    host: str,
+    log_level: int = logging.WARNING,
+    *,
+    admission: AdmissionController = None,
+    device_cache: FileCache = None,
+    group_rtt: bool = False,
+    heart_beat: Optional[float] = const.DEFAULT_HEART_BEAT,
+    heart_beat_timeout: float = const.DEFAULT_HEART_BEAT_TIMEOUT,
+    offline_policy: str = const.OFFLINE_DROP,
+    offline_ttl: float = const.DEFAULT_OFFLINE_TTL,
+    session: aiohttp.ClientSession = None,
+    state_cache: FileCache = None,
+):
+    """Return an instance of an AV Receiver.
+
+    Pass a session, see create_session, to share one connection pool between many
+    receivers; otherwise the receiver owns a pool that is closed on disconnect.
+    Pass an admission controller, shared by the receivers, to limit how many
+    reconnect and resync at once.  Pass a state_cache to start from the last known
+    state of the receiver.  A dead connection is detected within heart_beat plus
+    heart_beat_timeout seconds of the last message; offline_policy and
+    offline_ttl apply to commands sent while not connected and group_rtt times
+    resends by the round trips of each command group.
+    Raises AVReceiverIncompatibleDeviceError if no supported device answers.
+    """
     _LOGGER.setLevel(log_level)
-    names, tasks = [], []
-    async with aiohttp.ClientSession() as session:
-        for name, url in const.UPNP_ENDPOINTS.items():
-            names.append(name)
-            tasks.append(
-                asyncio.create_task(session.get(f"http://{host}{url}", timeout=5))
-            )
-        responses = await asyncio.gather(*tasks)
-        for name, response in zip(names, responses):
-            if response.status == 200:
-                if name == "denon-avr-x-2016":
-                    http_api = DenonAVRX2016Api(host, await response.text())
-                    return DenonReceiver(host, http_api=http_api)
-                if name == "denon-avr-x":
-                    http_api = DenonAVRXApi(host, await response.text())
-                    return DenonReceiver(host, http_api=http_api)
-                if name == "denon-avr":
-                    http_api = DenonAVRApi(host, await response.text())
-                    return DenonReceiver(host, http_api=http_api)
-        raise AVReceiverIncompatibleDeviceError
+    owns_session = session is None
+    session = session or create_session()
+    try:
+        name, upnp_data = await probe(host, session)
+    except BaseException:
+        if owns_session:
+            await session.close()
+        raise
+    receiver_class, http_api_class = DRIVERS[name]
+    http_api = http_api_class(
+        host, upnp_data, session=session, owns_session=owns_session
+    )
+    return receiver_class(
+        host,
+        admission=admission,
+        device_cache=device_cache,
+        group_rtt=group_rtt,
+        heart_beat=heart_beat,
+        heart_beat_timeout=heart_beat_timeout,
+        http_api=http_api,
+        offline_policy=offline_policy,
+        offline_ttl=offline_ttl,
+        state_cache=state_cache,
+    )
@@ -0,0 +1,65 @@
+"""Define the admission of receivers to reconnecting and resyncing."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from pyavreceiver import const
+
+
+class AdmissionController:
+    """Limit how many receivers connect or resync at once.
+
+    Share one controller between the receivers of a process so that, eg. after a
+    switch reboots, they reconnect and refresh their state a few at a time rather
+    than all at once.
+    """
+
+    def __init__(self, limit: int = const.DEFAULT_ADMISSION_LIMIT):
+        """Init the controller."""
+        self._limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+        self._active = 0
+        self._waiting = 0
+        self._admitted = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}, limit: {self._limit}, "
+            f"active: {self._active}, waiting: {self._waiting}"
+        )
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Wait for a free slot and hold it until the context exits."""
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._active += 1
+        self._admitted += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+    @property
+    def limit(self) -> int:
+        """Get the number of receivers admitted at once."""
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        """Get the number of receivers admitted now."""
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """Get the number of receivers waiting for a slot."""
+        return self._waiting
+
+    @property
+    def admitted(self) -> int:
+        """Get the number of times a receiver was admitted."""
+        return self._admitted
@@ -0,0 +1,89 @@
+"""Define a persistent cache of rarely changing receiver data."""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from pyavreceiver import const
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FileCache:
+    """Define a compact JSON file of entries with a time to live.
+
+    Entries are keyed by a stable identifier, such as the serial number or MAC
+    address.  A host may be aliased to a key so that an entry can be found before
+    the device has been asked who it is.
+    """
+
+    def __init__(self, path: str, *, ttl: float = const.DEFAULT_CACHE_TTL):
+        """Init the cache."""
+        self._path = path
+        self._ttl = ttl
+        self._hosts = {}
+        self._entries = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    def _read(self) -> None:
+        """Read the cache file, ignoring a missing or corrupt file."""
+        try:
+            with open(self._path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self._hosts = data.get("hosts", {})
+            self._entries = data.get("entries", {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, AttributeError) as err:
+            _LOGGER.warning("Ignoring unreadable cache %s: %s", self._path, err)
+        self._loaded = True
+
+    def _write(self, data: str) -> None:
+        """Atomically replace the cache file."""
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(data)
+        os.replace(tmp_path, self._path)
+
+    async def async_load(self) -> None:
+        """Load the cache file in an executor, once."""
+        async with self._lock:
+            if not self._loaded:
+                await asyncio.get_running_loop().run_in_executor(None, self._read)
+
+    async def async_save(self) -> None:
+        """Save the cache file in an executor."""
+        data = json.dumps(
+            {"hosts": self._hosts, "entries": self._entries}, separators=(",", ":")
+        )
+        async with self._lock:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the data for key, or for the key aliased by host, if any."""
+        entry = self._entries.get(self._hosts.get(key, key))
+        return entry["data"] if entry else None
+
+    def is_fresh(self, key: str) -> bool:
+        """Return True if the entry for key exists and is within the TTL."""
+        entry = self._entries.get(self._hosts.get(key, key))
+        return bool(entry) and time.time() - entry["time"] < self._ttl
+
+    def set(self, key: str, data: Any, *, host: str = None) -> None:
+        """Set the data for key and optionally alias host to key."""
+        self._entries[key] = {"time": time.time(), "data": data}
+        if host and host != key:
+            self._hosts[host] = key
+
+    @property
+    def path(self) -> str:
+        """Get the path of the cache file."""
+        return self._path
+
+    @property
+    def ttl(self) -> float:
+        """Get the time to live of entries in seconds."""
+        return self._ttl
@@ -0,0 +1,94 @@
+"""Define the command groups that a receiver model supports."""
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set
+
+from pyavreceiver import const
+from pyavreceiver.command import TelnetCommand
+
+
+class Capabilities:
+    """Define the supported and unsupported command groups of a receiver model.
+
+    The command table is a superset of every model.  Groups of zones that the
+    model does not have are unsupported from the device info, and a group is
+    learned to be unsupported once its queries have gone unanswered, while the
+    receiver is on, DEFAULT_CAPABILITY_FAILURES times.  A group that the device
+    has sent a message of is supported and never marked unsupported.
+    """
+
+    __slots__ = ("_supported", "_unsupported", "_failures", "_changed")
+
+    def __init__(self, supported: Iterable[str] = (), unsupported: Iterable[str] = ()):
+        """Init the capabilities."""
+        self._supported = set(supported)  # type: Set[str]
+        self._unsupported = set(unsupported) - self._supported  # type: Set[str]
+        self._failures = Counter()
+        self._changed = False
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}, supported: {len(self._supported)}, "
+            f"unsupported: {sorted(self._unsupported)}"
+        )
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "Capabilities":
+        """Return the capabilities saved with as_dict."""
+        data = data or {}
+        return cls(data.get("supported", ()), data.get("unsupported", ()))
+
+    def as_dict(self) -> dict:
+        """Return the capabilities as a dict that can be saved as JSON."""
+        return {
+            "supported": sorted(self._supported),
+            "unsupported": sorted(self._unsupported),
+        }
+
+    def seed(self, zones: Optional[int], commands: Dict[str, TelnetCommand]) -> None:
+        """Mark the groups of the zones that the model does not have unsupported."""
+        prefixes = [
+            prefix
+            for number, prefix in enumerate(const.ZONE_PREFIX.values(), 1)
+            if prefix and number > int(zones or 1)
+        ]
+        for name, command in commands.items():
+            if any(name.startswith(prefix) for prefix in prefixes):
+                if command.group not in self._supported:
+                    self._unsupported.add(command.group)
+
+    def seen(self, group: str) -> None:
+        """Record that the device sent a message of group."""
+        if group in self._supported:
+            return
+        self._supported.add(group)
+        self._unsupported.discard(group)
+        self._failures.pop(group, None)
+        self._changed = True
+
+    def failed(self, group: str) -> None:
+        """Record that a query of group went unanswered."""
+        if group in self._supported or group in self._unsupported:
+            return
+        self._failures[group] += 1
+        if self._failures[group] >= const.DEFAULT_CAPABILITY_FAILURES:
+            self._unsupported.add(group)
+            self._changed = True
+
+    def is_supported(self, group: str) -> bool:
+        """Return False if group is known to be unsupported."""
+        return group not in self._unsupported
+
+    def pop_changed(self) -> bool:
+        """Return True if the capabilities changed since the last call."""
+        changed, self._changed = self._changed, False
+        return changed
+
+    @property
+    def supported(self) -> Set[str]:
+        """Get the groups the device has sent a message of."""
+        return self._supported
+
+    @property
+    def unsupported(self) -> Set[str]:
+        """Get the groups known to be unsupported."""
+        return self._unsupported
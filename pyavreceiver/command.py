@@ -1,6 +1,6 @@
 """Define commands."""
 from abc import ABC, abstractmethod
-from typing import Callable, List, Sequence, Tuple, Union
+from typing import Callable, FrozenSet, List, Optional, Sequence, Tuple, Union
 
 from pyavreceiver import const
 from pyavreceiver.error import AVReceiverInvalidArgumentError
@@ -71,6 +71,7 @@ class TelnetCommand(Command, ABC):
     __slots__ = (
         "_name",
         "_group",
+        "_reply_group",
         "_values",
         "_val_pfx",
         "_func",
@@ -81,6 +82,12 @@ class TelnetCommand(Command, ABC):
         "_qos",
         "_sequence",
         "_retries",
+        "_multi_groups",
+        "_multi_end",
+        "_query_group",
+        "_queryable",
+        "_standby",
+        "_stage",
     )
 
     def __init__(
@@ -88,6 +95,7 @@ class TelnetCommand(Command, ABC):
         *,
         name: str = None,
         group: str = None,
+        reply_group: str = None,
         values: CommandValues = None,
         val_pfx: str = "",
         func: Callable = identity,
@@ -97,9 +105,16 @@ class TelnetCommand(Command, ABC):
         message: str = None,
         qos: int = 0,
         sequence: int = -1,
+        multi_groups: FrozenSet[str] = None,
+        multi_end: str = None,
+        query_group: str = None,
+        queryable: bool = True,
+        standby: bool = False,
+        stage: str = None,
     ):
         self._name = name
         self._group = group
+        self._reply_group = reply_group
         self._values = values
         self._val_pfx = val_pfx
         self._func = func
@@ -110,6 +125,12 @@ class TelnetCommand(Command, ABC):
         self._qos = qos
         self._sequence = sequence
         self._retries = const.DEFAULT_RETRY_SCHEMA[qos]  # qos defines number of retries
+        self._multi_groups = multi_groups
+        self._multi_end = multi_end
+        self._query_group = query_group
+        self._queryable = queryable
+        self._standby = standby
+        self._stage = stage
 
     def __hash__(self):
         return self._sequence
@@ -159,6 +180,51 @@ class TelnetCommand(Command, ABC):
         """The group portion of the message."""
         return self._group
 
+    @property
+    def reply_group(self) -> str:
+        """The group of the message the device replies with."""
+        return self._reply_group or self._group
+
+    @property
+    def query_group(self) -> str:
+        """The group of the query that the device answers the command's value to."""
+        return self._query_group or self._group
+
+    @property
+    def queryable(self) -> bool:
+        """Return True if the device answers a query of the command."""
+        return self._queryable
+
+    @property
+    def standby(self) -> bool:
+        """Return True if the device answers a query of the command in standby."""
+        return self._standby
+
+    @property
+    def stage(self) -> Optional[str]:
+        """The stage of a scene the command is applied in, if not the default."""
+        return self._stage
+
+    @property
+    def is_query(self) -> bool:
+        """Return True if the command is a query."""
+        return False
+
+    @property
+    def multi_groups(self) -> FrozenSet[str]:
+        """The groups of the many messages that answer the command, if any."""
+        return self._multi_groups
+
+    @property
+    def multi_end(self) -> str:
+        """The group of the message that ends a multi-message answer, if any."""
+        return self._multi_end
+
+    @property
+    def is_multi(self) -> bool:
+        """Return True if the command is answered by many messages."""
+        return self._multi_groups is not None
+
     @property
     def message(self) -> str:
         """The complete message; group + argument."""
@@ -7,14 +7,55 @@ __version__ = "0.0.10"
 CLI_PORT = 23
 DEFAULT_COMMAND_EXPIRATION = 1.5  # 1500ms
 DEFAULT_MESSAGE_INTERVAL_LIMIT = 0.05  # 50ms
+DEFAULT_MIN_MESSAGE_INTERVAL = 0.02  # 20ms, fastest adaptive pacing
+DEFAULT_MAX_MESSAGE_INTERVAL = 0.2  # 200ms, slowest adaptive pacing
+DEFAULT_PACING_STEP = 0.002  # seconds taken off the interval per quick answer
+DEFAULT_PACING_BACKOFF = 2.0  # interval multiplier per dropped command
+DEFAULT_PACING_SLOW_ANSWER = 0.1  # seconds; slower answers hold the interval
 DEFAULT_QUEUE_INTERVAL = 0.002  # 2ms
-DEFAULT_TELNET_TIMEOUT = 0.25  # 250ms
+DEFAULT_TELNET_TIMEOUT = 0.25  # 250ms, retry timeout until the RTT is estimated
+DEFAULT_MIN_RETRY_TIMEOUT = 0.05  # 50ms
+DEFAULT_MAX_RETRY_TIMEOUT = 1.0  # within DEFAULT_COMMAND_EXPIRATION
+DEFAULT_GROUP_RTT_SAMPLES = 3  # samples before a group's own RTT is used
+RTT_ALPHA = 1 / 8  # RFC 6298 gains, multiplier and clock granularity
+RTT_BETA = 1 / 4
+RTT_K = 4
+RTT_GRANULARITY = 0.001
+DEFAULT_MULTI_RESPONSE_WINDOW = 0.1  # 100ms of quiet ends a multi-message answer
+DEFAULT_QUERY_OBSERVATIONS = 2  # times a query is seen answering a group to trust it
+DEFAULT_CAPABILITY_FAILURES = 2  # unanswered queries before a group is unsupported
+DEFAULT_CATCH_UP_DELAY = 1.0  # seconds after power on before catching up on queries
+DEFAULT_RESYNC_BATCH = 4  # queries per batch of the lazy part of a resync
+DEFAULT_RESYNC_INTERVAL = 0.5  # seconds between the batches
+DEFAULT_STATE_SAVE_DELAY = 5.0  # seconds of state changes batched into one write
+DEFAULT_OFFLINE_TTL = 30.0  # seconds a command buffered while offline stays valid
 DEFAULT_TIMEOUT = 10.0
-DEFAULT_RECONNECT_DELAY = 10.0
-DEFAULT_HEART_BEAT = 10.0
-DEFAULT_STEP = 5
+DEFAULT_RECONNECT_DELAY = 10.0  # seconds before the first retry, doubled per retry
+DEFAULT_RECONNECT_MAX_DELAY = 120.0
+DEFAULT_ADMISSION_LIMIT = 4  # receivers connecting or resyncing at once
+# a dead link is detected within heart beat + timeout seconds of the last message
+DEFAULT_HEART_BEAT = 2.0  # seconds without a message before a probe is sent
+DEFAULT_HEART_BEAT_TIMEOUT = 1.0  # seconds a probe waits for any message
+DEFAULT_FLEET_TICK = 0.5  # seconds between the heartbeat checks of a fleet
+DEFAULT_KEEPALIVE_IDLE = 5  # TCP keepalive: idle seconds before the first probe
+DEFAULT_KEEPALIVE_INTERVAL = 1  # seconds between probes
+DEFAULT_KEEPALIVE_COUNT = 3  # unanswered probes before the socket is closed
+DEFAULT_STEP = 5  # tenths of a dB
 DEFAULT_RETRY_SCHEMA = [0, 1, 2, 2, 2]  # number of retry attempts indexed by QoS level
 
+DEFAULT_HTTP_CONNECTION_LIMIT = 100
+DEFAULT_HTTP_LIMIT_PER_HOST = 2  # embedded web servers handle few connections
+DEFAULT_HTTP_KEEPALIVE = 30.0
+DEFAULT_HTTP_TIMEOUT = 5.0
+DEFAULT_CACHE_TTL = 604800.0  # 7 days
+DEFAULT_PROBE_TIMEOUT = 5.0
+DEFAULT_POLL_MIN_INTERVAL = 1.0
+DEFAULT_POLL_MAX_INTERVAL = 10.0
+DEFAULT_POLL_BACKOFF = 1.5
+DEFAULT_DISCOVERY_TIMEOUT = 5.0
+DEFAULT_DISCOVERY_CONCURRENCY = 20
+DEFAULT_SCAN_TIMEOUT = 1.0
+
 STATE_CONNECTED = "connected"
 STATE_DISCONNECTED = "disconnected"
 STATE_RECONNECTING = "reconnecting"
@@ -23,6 +64,13 @@ STATE_RECONNECTING = "reconnecting"
 COMMAND_NAME = "^name"
 COMMAND_NAMES = "^names"
 COMMAND_PARAMS = "^params"
+COMMAND_REPLY = "^reply"
+COMMAND_MULTI = "^multi"
+COMMAND_END = "^end"
+COMMAND_QUERY = "^query"
+COMMAND_NOQUERY = "^noquery"
+COMMAND_STANDBY = "^standby"
+COMMAND_STAGE = "^stage"
 COMMAND_RANGE = "^range"
 COMMAND_FUNCTION = "^function"
 COMMAND_STRINGS = "^strings"
@@ -45,6 +93,11 @@ QUEUE_CANCEL = "queue_cancel"
 QUEUE_FAILED = "queue_failed"
 QUEUE_NO_CANCEL = "queue_no_cancel"
 
+# What to do with a command sent while not connected
+OFFLINE_DROP = "drop"  # resolve None at once
+OFFLINE_FAIL = "fail"  # raise AVReceiverNotConnectedError
+OFFLINE_BUFFER = "buffer"  # replay on connect, the latest command of each group
+
 ATTR_POWER = "power"
 ATTR_VOLUME = "volume"
 ATTR_VOLUME_UP = "volume_up"
@@ -64,6 +117,9 @@ ATTR_META_DRC_ENABLED = "dynamic_range_control"
 ATTR_DSP_DRC = "dsp_dynamic_range_control"
 ATTR_DSP_MODE = "dsp_mode"
 ATTR_FRONT_HEIGHT = "front_height"
+ATTR_CHANNEL_LEVELS = "channel_levels"
+ATTR_SPEAKER_LEVELS = "speaker_levels"
+ATTR_SOUND_PARAMETERS = "sound_parameters"
 ATTR_META_DRC = "metadata_dynamic_range_control"
 ATTR_ZONE1_POWER = "zone1_power"
 
@@ -83,6 +139,17 @@ ATTR_ZONE3_BASS = "zone3_bass"
 ATTR_ZONE3_TREBLE = "zone3_treble"
 ATTR_ZONE3_SOURCE = "zone3_source"
 
+# Relative commands that are coalesced into an absolute command:
+# relative command: (absolute command, direction)
+RELATIVE_COMMANDS = {
+    ATTR_VOLUME_UP: (ATTR_VOLUME, 1),
+    ATTR_VOLUME_DOWN: (ATTR_VOLUME, -1),
+    ATTR_ZONE2_VOLUME_UP: (ATTR_ZONE2_VOLUME, 1),
+    ATTR_ZONE2_VOLUME_DOWN: (ATTR_ZONE2_VOLUME, -1),
+    ATTR_ZONE3_VOLUME_UP: (ATTR_ZONE3_VOLUME, 1),
+    ATTR_ZONE3_VOLUME_DOWN: (ATTR_ZONE3_VOLUME, -1),
+}
+
 VAL_DOWN = "down"
 VAL_UP = "up"
 
@@ -100,6 +167,15 @@ ZONE_PREFIX = {
     "zone4": "zone4_",
 }
 
+# Attributes of each zone refreshed first after a reconnect
+RESYNC_PRIORITY = (ATTR_POWER, ATTR_VOLUME, ATTR_SOURCE)
+
+ZONE_POWER = {
+    "main": ATTR_ZONE1_POWER,
+    "zone2": ATTR_ZONE2_POWER,
+    "zone3": ATTR_ZONE3_POWER,
+}
+
 FUNCTION_VOLUME = "volume"
 FUNCTION_NUM_TO_DB = "num_to_db"
 FUNCTION_DB_TO_NUM = "db_to_num"
@@ -110,6 +186,13 @@ INFO_MAC = "mac_address"
 INFO_MANUFACTURER = "manufacturer"
 INFO_ZONES = "zones"
 INFO_SERIAL = "serial_number"
+INFO_API_VERSION = "api_version"
+
+SSDP_ADDRESS = ("239.255.255.250", 1900)
+SSDP_MX = 2
+SSDP_REPEAT = 2
+SSDP_SEARCH_TARGET = "urn:schemas-upnp-org:device:MediaRenderer:1"
+SSDP_TTL = 2
 
 UPNP_ENDPOINTS = {
     "denon-avr": ":8080/description.xml",
@@ -42,6 +42,13 @@ class DenonTelnetCommand(TelnetCommand):
         return DenonTelnetCommand(
             name=self._name,
             group=self._group,
+            reply_group=self._reply_group,
+            multi_groups=self._multi_groups,
+            multi_end=self._multi_end,
+            query_group=self._query_group,
+            queryable=self._queryable,
+            standby=self._standby,
+            stage=self._stage,
             values=self._values,
             val_pfx=self._val_pfx,
             func=self._func,
@@ -53,6 +60,10 @@ class DenonTelnetCommand(TelnetCommand):
             sequence=sequence,
         )
 
+    @property
+    def is_query(self) -> bool:
+        return self._val == denon_const.TELNET_QUERY
+
     def set_query(self, qos: int = None) -> TelnetCommand:
         """Format the command with query and return."""
         if qos is None:
@@ -64,6 +75,13 @@ class DenonTelnetCommand(TelnetCommand):
         return DenonTelnetCommand(
             name=self._name,
             group=self._group,
+            reply_group=self._reply_group,
+            multi_groups=self._multi_groups,
+            multi_end=self._multi_end,
+            query_group=self._query_group,
+            queryable=self._queryable,
+            standby=self._standby,
+            stage=self._stage,
             values=self._values,
             val_pfx=self._val_pfx,
             func=self._func,
@@ -79,6 +97,8 @@ def get_command_lookup(command_dict):
     """Return the command lookup dict."""
     command_lookup = defaultdict(None)
     for cmd, entry in command_dict.items():
+        if isinstance(entry, dict) and const.COMMAND_MULTI in entry:
+            add_multi_command(command_lookup, cmd, entry)
         try:
             val_range = entry.get(const.COMMAND_RANGE)
             zero = entry.get(const.COMMAND_ZERO)
@@ -200,12 +220,36 @@ def add_command(ref, entry, name, cmd, val_pfx, val_range, zero, func, valid_str
     if values and val_range:
         values = values.update(val_range)
     values = val_range or values
+    if not isinstance(entry, dict):
+        entry = {}
+    if isinstance(stage := entry.get(const.COMMAND_STAGE), dict):
+        stage = stage.get(name)  # by name, for an entry of many names
     ref[name] = DenonTelnetCommand(
         name=name,
         group=cmd,
+        reply_group=entry.get(const.COMMAND_REPLY),
+        query_group=entry.get(const.COMMAND_QUERY),
+        queryable=not entry.get(const.COMMAND_NOQUERY),
+        standby=bool(entry.get(const.COMMAND_STANDBY)),
+        stage=stage,
         values=CommandValues(values),
         val_pfx=val_pfx,
         func=parse["db_to_num"] if func else None,
         zero=zero,
         valid_strings=valid_strings,
     )
+
+
+def add_multi_command(ref, cmd, entry):
+    """Add the query of every param of cmd, answered by a message for each."""
+    multi = entry[const.COMMAND_MULTI]
+    end = multi.get(const.COMMAND_END)
+    ref[multi[const.COMMAND_NAME]] = DenonTelnetCommand(
+        name=multi[const.COMMAND_NAME],
+        group=cmd,
+        values=CommandValues({}),
+        multi_groups=frozenset(
+            f"{cmd}{prm}" for prm in entry if not str(prm).startswith("^")
+        ),
+        multi_end=f"{cmd}{end}" if end else None,
+    )
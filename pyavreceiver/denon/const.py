@@ -1,9 +1,22 @@
 """Define constants for Denon/Marantz."""
+from pyavreceiver import const
 
+API_APP_COMMAND_URL = "/goform/AppCommand.xml"
+API_APP_COMMAND_0300_URL = "/goform/AppCommand0300.xml"
 API_DEVICE_INFO_URL = "/goform/Deviceinfo.xml"
 API_MAIN_ZONE_XML_STATUS_URL = "/goform/formMainZone_MainZoneXmlStatus.xml"
 API_MAIN_ZONE_XML_URL = "/goform/formMainZone_MainZoneXml.xml"
 API_PORT = 80
+XML_CHUNK_SIZE = 4096
+
+# At most 5 commands, the limit of one AppCommand request root
+APP_COMMAND_STATUS_QUERIES = [
+    "GetAllZonePowerStatus",
+    "GetAllZoneVolume",
+    "GetAllZoneMuteStatus",
+    "GetAllZoneSource",
+    "GetSurroundModeStatus",
+]
 
 API_2016_PORT = 8080
 API_2016_DEVICE_INFO_URL = "/goform/Deviceinfo.xml"
@@ -17,7 +30,8 @@ TELNET_SEPARATOR = "\r"
 TELNET_PORT = 23
 DEFAULT_TIMEOUT = 10.0
 DEFAULT_RECONNECT_DELAY = 10.0
-DEFAULT_HEART_BEAT = 10.0
+DEFAULT_HEART_BEAT = 2.0
+DEFAULT_APP_COMMAND_RETRY = 300.0  # seconds polling legacy before AppCommand again
 
 DEVICE_INFO_ENDPOINTS = [
     ":80/goform/Deviceinfo.xml",
@@ -71,6 +85,27 @@ ATTR_DYNAMIC_EQ = "audyssey_dynamic_eq"
 ATTR_MULTI_EQ = "audyssey_multi_eq"
 ATTR_REFLEV_OFFSET = "audyssey_reference_level_offset"
 
+# Settings that one AppCommand0300 request can set:
+# command name: (AppCommand, param, {telnet value: param value})
+APP_COMMAND_SETTINGS = {
+    ATTR_DYNAMIC_EQ: ("SetAudyssey", "dynamiceq", {"OFF": "0", "ON": "1"}),
+    ATTR_MULTI_EQ: (
+        "SetAudyssey",
+        "multeq",
+        {"OFF": "0", "FLAT": "1", "BYP.LR": "2", "AUDYSSEY": "3", "MANUAL": "4"},
+    ),
+    ATTR_REFLEV_OFFSET: (
+        "SetAudyssey",
+        "reflevoffset",
+        {"0": "0", "5": "1", "10": "2", "15": "3"},
+    ),
+    const.ATTR_DSP_DRC: (
+        "SetAudyssey",
+        "dynamicvol",
+        {"OFF": "0", "LIT": "1", "MED": "2", "HEV": "3"},
+    ),
+}
+
 XML_MODEL_NAME = "ModelName"
 XML_MAC_ADDRESS = "MacAddress"
 XML_ZONE_COUNT = "DeviceZones"
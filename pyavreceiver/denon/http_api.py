@@ -1,10 +1,22 @@
 """Define an HTTP connection to a Denon/Marantz receiver."""
-from xml.etree import ElementTree as ET
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional
 
 import aiohttp
 
 from pyavreceiver import const
+from pyavreceiver.command import TelnetCommand
 from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.xml_parser import (
+    AppCommandSetParser,
+    AppCommandStatusParser,
+    DeviceInfoParser,
+    LegacyRenamedSourcesParser,
+    LegacyStatusParser,
+    RenamedSourcesParser,
+    StreamingXMLParser,
+)
 from pyavreceiver.http_api import HTTPApi
 
 
@@ -13,8 +25,8 @@ class DenonHTTPApi(HTTPApi):
 
     async def get_device_info(self) -> dict:
         "Get information about the device"
-        xml = await self._get_device_info()
-        self.make_device_info_dict(xml)
+        if info := await self._get_device_info(DeviceInfoParser()):
+            self._update_device_info(info)
         if self._upnp_data:
             self.make_device_info_dict(self._upnp_data)
         return self.device_info
@@ -24,157 +36,161 @@ class DenonHTTPApi(HTTPApi):
         xml_body = DenonHTTPApi.make_xml_request(
             ["GetRenameSource", "GetDeletedSource"]
         )
-        xml = await self._app_command(xml_body)
-        if xml:
-            return DenonHTTPApi.make_renamed_dict(xml)
+        if sources := await self._app_command(xml_body, RenamedSourcesParser()):
+            return sources
 
-        # AppCommand endpoint failed, use alternate
-        xml = await self._get_mainzone_xml() or await self._get_status_xml()
-        return DenonHTTPApi.make_renamed_dict_legacy(xml)
+        # AppCommand endpoint failed, use alternates, preferring MainZoneXml
+        mainzone_sources, status_sources = await asyncio.gather(
+            self._get_mainzone_xml(LegacyRenamedSourcesParser()),
+            self._get_status_xml(LegacyRenamedSourcesParser()),
+        )
+        return mainzone_sources if mainzone_sources is not None else status_sources
+
+    async def get_status(self) -> Optional[List[str]]:
+        """Get the state of all zones as equivalent telnet messages.
 
-    async def _get_status_xml(self) -> str:
+        Returns None if the AppCommand status queries are not supported.
+        """
+        commands = denon_const.APP_COMMAND_STATUS_QUERIES
+        messages = await self._app_command(
+            DenonHTTPApi.make_xml_request(commands), AppCommandStatusParser(commands)
+        )
+        return messages or None
+
+    async def get_status_legacy(self) -> Optional[List[str]]:
+        """Get the main zone state as equivalent telnet messages."""
+        return await self._get_status_xml(LegacyStatusParser())
+
+    def can_set(self, command: TelnetCommand) -> bool:
+        """Return True if AppCommand0300 can set the value of command."""
+        if not (setting := denon_const.APP_COMMAND_SETTINGS.get(command.name)):
+            return False
+        return str(command.val) in setting[2]
+
+    async def set_many(self, commands: List[TelnetCommand]) -> Dict[str, bool]:
+        """Send the commands that AppCommand0300 can set in one request.
+
+        The outcome of each command is read from the parameters the receiver
+        echoes, see AppCommandSetParser.
+        """
+        params = defaultdict(dict)
+        sent = {}  # name: (app command, param)
+        for command in commands:
+            if not self.can_set(command):
+                continue
+            app_command, param, values = denon_const.APP_COMMAND_SETTINGS[command.name]
+            params[app_command][param] = values[str(command.val)]
+            sent[command.name] = (app_command, param)
+        if not sent:
+            return {}
+        xml_body = DenonHTTPApi.make_xml_request(list(params.items()))
+        try:
+            applied = await self._app_command(
+                xml_body,
+                AppCommandSetParser(),
+                url=denon_const.API_APP_COMMAND_0300_URL,
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return {}
+        if applied is False:
+            return {}
+        return {name: applied.get(key, False) for name, key in sent.items()}
+
+    async def _get_status_xml(self, parser: StreamingXMLParser = None):
         """Get the Main Zone status XML endpoint."""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"http://{self.host}:{self.port}{denon_const.API_MAIN_ZONE_XML_STATUS_URL}"
-            ) as resp:
-                if resp.status == 200:
-                    return await resp.text()
-
-    async def _get_mainzone_xml(self) -> str:
+        async with self.session.get(
+            f"http://{self.host}:{self.port}{denon_const.API_MAIN_ZONE_XML_STATUS_URL}"
+        ) as resp:
+            if resp.status == 200:
+                return await read_response(resp, parser)
+
+    async def _get_mainzone_xml(self, parser: StreamingXMLParser = None):
         """Get the Main Zone status XML endpoint."""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"http://{self.host}:{self.port}{denon_const.API_MAIN_ZONE_XML_URL}"
-            ) as resp:
-                if resp.status == 200:
-                    return await resp.text()
-
-    async def _get_device_info(self):
+        async with self.session.get(
+            f"http://{self.host}:{self.port}{denon_const.API_MAIN_ZONE_XML_URL}"
+        ) as resp:
+            if resp.status == 200:
+                return await read_response(resp, parser)
+
+    async def _get_device_info(self, parser: StreamingXMLParser = None):
         """Get information about the device."""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://{self.host}:{self.port}{self._device_info_url}"
-            ) as resp:
-                if resp.status == 200:
-                    return await resp.text()
-
-    async def _app_command(self, xml: bytes):
+        async with self.session.post(
+            f"http://{self.host}:{self.port}{self._device_info_url}"
+        ) as resp:
+            if resp.status == 200:
+                return await read_response(resp, parser)
+
+    async def _app_command(
+        self,
+        xml: bytes,
+        parser: StreamingXMLParser = None,
+        *,
+        url: str = denon_const.API_APP_COMMAND_URL,
+    ):
         """Make request to AppCommand.xml endpoint."""
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://{self.host}:{self.port}/goform/AppCommand.xml", data=xml
-            ) as resp:
-                if resp.status == 200:
-                    return await resp.text()
-                return False
+        async with self.session.post(
+            f"http://{self.host}:{self.port}{url}", data=xml
+        ) as resp:
+            if resp.status == 200:
+                return await read_response(resp, parser)
+            return False
 
     @staticmethod
     def make_renamed_dict(xml) -> dict:
         """Parse the XML response for renamed and deleted sources."""
-        root = ET.fromstring(xml)
-        deleted = set()
-        deleted_root = root.find("*/functiondelete")
-        for entry in deleted_root.findall("list"):
-            try:
-                if entry.find("use").text == "0":
-                    deleted.add(entry.find("name").text.strip().lower())
-            except AttributeError:
-                continue
-        rename_map = {}
-        renamed_root = root.find("*/functionrename")
-        for entry in renamed_root.findall("list"):
-            try:
-                name = entry.find("name").text.strip().lower()
-                rename = entry.find("rename").text.strip()
-            except AttributeError:
-                continue
-            if name not in deleted:
-                rename_map[rename] = (
-                    denon_const.MAP_HTTP_SOURCE_NAME_TO_TELNET.get(name) or name.upper()
-                )
-        return rename_map
+        parser = RenamedSourcesParser()
+        parser.feed(xml)
+        return parser.close()
 
     @staticmethod
     def make_renamed_dict_legacy(xml) -> dict:
         """Parse the XML response for renamed and deleted sources."""
-        root = ET.fromstring(xml)
-
-        original_names = []
-        skip_source = 0
-        for name in root.find("InputFuncList"):
-            try:
-                if name.text == "SOURCE":
-                    skip_source = 1  # Slice subsequent lists from 1:
-                    continue
-                original_names.append(name.text)
-            except AttributeError:
-                continue
-
-        deleted = [False] * len(original_names)
-
-        delete_list = root.find("SourceDelete")
-        if delete_list:
-            for i, delete in enumerate(delete_list[skip_source:]):
-                try:
-                    if delete.text == "DEL":
-                        deleted[i] = True
-                except AttributeError:
-                    continue
-
-        rename_map = {}
-        for i, name in enumerate(root.find("RenameSource")[skip_source:]):
-            if not deleted[i]:
-                original_name = original_names[i]
-                try:
-                    name = name.text.strip()
-                except AttributeError:
-                    name = original_name
-                rename_map[name] = (
-                    denon_const.MAP_HTTP_SOURCE_NAME_TO_TELNET.get(
-                        original_name.lower()
-                    )
-                    or original_name.upper()
-                )
-        return rename_map
+        parser = LegacyRenamedSourcesParser()
+        parser.feed(xml)
+        return parser.close()
 
     def make_device_info_dict(self, xml) -> dict:
         """Parse response for information."""
-        root = ET.fromstring(xml)
-        xmlns = "{urn:schemas-upnp-org:device-1-0}"
-        self._device_info[const.INFO_MODEL] = (
-            self._device_info.get(const.INFO_MODEL)
-            or get_text(root, "ModelName")
-            or get_text(root, f"*/{xmlns}modelName")
-        )
-        self._device_info[const.INFO_MAC] = self._device_info.get(
-            const.INFO_MAC
-        ) or get_text(root, "MacAddress")
-        self._device_info[const.INFO_SERIAL] = self._device_info.get(
-            const.INFO_SERIAL
-        ) or get_text(root, f"*/{xmlns}serialNumber")
+        parser = DeviceInfoParser()
+        parser.feed(xml)
+        self._update_device_info(parser.close())
+
+    def _update_device_info(self, info: dict) -> None:
+        """Update the device info with parsed values that are not yet known."""
+        for key in (
+            const.INFO_MODEL,
+            const.INFO_MAC,
+            const.INFO_SERIAL,
+            const.INFO_MANUFACTURER,
+            const.INFO_FRIENDLY_NAME,
+            const.INFO_API_VERSION,
+        ):
+            self._device_info[key] = self._device_info.get(key) or info.get(key)
         self._device_info[const.INFO_ZONES] = int(
-            self._device_info.get(const.INFO_ZONES)
-            or get_text(root, "DeviceZones")
-            or "1"
+            self._device_info.get(const.INFO_ZONES) or info.get(const.INFO_ZONES) or "1"
         )
-        self._device_info[const.INFO_MANUFACTURER] = self._device_info.get(
-            const.INFO_MANUFACTURER
-        ) or get_text(root, f"*/{xmlns}manufacturer")
-        self._device_info[const.INFO_FRIENDLY_NAME] = self._device_info.get(
-            const.INFO_FRIENDLY_NAME
-        ) or get_text(root, f"*/{xmlns}friendlyName")
 
     @staticmethod
     def make_xml_request(commands: list) -> bytes:
-        """Prepare XML body for Denon API."""
+        """Prepare XML body for Denon API.
+
+        A command is either a name, or a (name, params) tuple for the versioned
+        commands of AppCommand0300.xml.
+        """
         xml_parts = ['<?xml version="1.0" encoding="utf-8"?>\n', "<tx>"]
         for i, command in enumerate(commands):
             if (
                 i != 0 and i % 5 == 0
             ):  # API allows multiple XML roots, limit 5 commands each
                 xml_parts.append("</tx><tx>")
-            xml_parts.append(f'<cmd id="1">{command}</cmd>')
+            if isinstance(command, tuple):
+                name, params = command
+                xml_parts.append(f'<cmd id="3"><name>{name}</name><list>')
+                for param, value in params.items():
+                    xml_parts.append(f'<param name="{param}">{value}</param>')
+                xml_parts.append("</list></cmd>")
+            else:
+                xml_parts.append(f'<cmd id="1">{command}</cmd>')
         xml_parts.append("</tx>")
         return "".join(xml_parts).encode()
 
@@ -182,8 +198,8 @@ class DenonHTTPApi(HTTPApi):
 class DenonAVRApi(DenonHTTPApi):
     """Define the Denon/Marantz AVR API."""
 
-    def __init__(self, host, upnp_data):
-        super().__init__(host, upnp_data=upnp_data)
+    def __init__(self, host, upnp_data, **kwargs):
+        super().__init__(host, upnp_data=upnp_data, **kwargs)
         self.port = denon_const.API_PORT
         self._device_info_url = denon_const.API_DEVICE_INFO_URL
 
@@ -191,8 +207,8 @@ class DenonAVRApi(DenonHTTPApi):
 class DenonAVRXApi(DenonHTTPApi):
     """Define the Denon/Marantz AVR-X API."""
 
-    def __init__(self, host, upnp_data):
-        super().__init__(host, upnp_data=upnp_data)
+    def __init__(self, host, upnp_data, **kwargs):
+        super().__init__(host, upnp_data=upnp_data, **kwargs)
         self.port = denon_const.API_PORT
         self._device_info_url = denon_const.API_DEVICE_INFO_URL
 
@@ -200,15 +216,20 @@ class DenonAVRXApi(DenonHTTPApi):
 class DenonAVRX2016Api(DenonHTTPApi):
     """Define the Denon/Marantz AVR-X 2016 API."""
 
-    def __init__(self, host, upnp_data):
-        super().__init__(host, upnp_data=upnp_data)
+    def __init__(self, host, upnp_data, **kwargs):
+        super().__init__(host, upnp_data=upnp_data, **kwargs)
         self.port = denon_const.API_2016_PORT
         self._device_info_url = denon_const.API_2016_DEVICE_INFO_URL
 
 
-def get_text(root: ET.Element, tag: str):
-    """Get the text attribute if it exists."""
-    elem = root.find(tag)
-    if elem is not None:
-        return elem.text
-    return None
+async def read_response(resp: aiohttp.ClientResponse, parser: StreamingXMLParser):
+    """Return the response body, or the result of feeding it to parser.
+
+    The body is fed to the parser as it arrives.  Once the parser is done the rest
+    of the body is read but not parsed so that the connection can be reused.
+    """
+    if parser is None:
+        return await resp.text()
+    async for chunk in resp.content.iter_chunked(denon_const.XML_CHUNK_SIZE):
+        parser.feed(chunk)
+    return parser.close()
@@ -0,0 +1,52 @@
+"""Define polling a Denon/Marantz receiver over HTTP."""
+import time
+from typing import List
+
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.response import DenonMessage
+from pyavreceiver.http_poller import HTTPPoller
+
+
+class DenonHTTPPoller(HTTPPoller):
+    """Poll a Denon/Marantz receiver with one batched AppCommand request.
+
+    Falls back to the legacy MainZoneXmlStatus endpoint, main zone only, while the
+    receiver does not answer the AppCommand queries, and tries them again every
+    app_command_retry seconds.  Responses are translated to the equivalent telnet
+    messages so the state keys match the telnet connection.
+    """
+
+    def __init__(
+        self,
+        avr,
+        http_api,
+        *,
+        app_command_retry: float = denon_const.DEFAULT_APP_COMMAND_RETRY,
+        **kwargs,
+    ):
+        """Init the poller."""
+        super().__init__(avr, http_api, **kwargs)
+        self._app_command_retry = app_command_retry
+        self._legacy_since = None  # monotonic time AppCommand last went unanswered
+
+    async def _poll(self) -> List[DenonMessage]:
+        messages = None
+        if (
+            self._legacy_since is None
+            or time.monotonic() - self._legacy_since >= self._app_command_retry
+        ):
+            self._metrics["requests"] += 1
+            if (messages := await self._http_api.get_status()) is None:
+                self._legacy_since = time.monotonic()
+            else:
+                self._legacy_since = None
+        if self._legacy_since is not None:
+            self._metrics["requests"] += 1
+            messages = await self._http_api.get_status_legacy() or []
+        command_dict = self._avr.telnet_connection.command_dict
+        return [DenonMessage(message, command_dict) for message in messages]
+
+    @property
+    def legacy(self) -> bool:
+        """Return True if polling the legacy MainZoneXmlStatus endpoint."""
+        return self._legacy_since is not None
@@ -1,7 +1,11 @@
 """Define a Denon/Marantz Audio Video Receiver."""
 from typing import Optional
 
+from pyavreceiver import const
+from pyavreceiver.admission import AdmissionController
+from pyavreceiver.cache import FileCache
 from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.http_poller import DenonHTTPPoller
 from pyavreceiver.denon.telnet_connection import DenonTelnetConnection
 from pyavreceiver.denon.zone import DenonAuxZone, DenonMainZone
 from pyavreceiver.dispatch import Dispatcher
@@ -16,9 +20,18 @@ class DenonReceiver(AVReceiver):
         self,
         host,
         *,
+        admission: AdmissionController = None,
+        device_cache: FileCache = None,
         dispatcher: Dispatcher = Dispatcher(),
+        elide_max_age: Optional[float] = None,
+        group_rtt: bool = False,
         heart_beat: Optional[float] = denon_const.DEFAULT_HEART_BEAT,
+        heart_beat_timeout: float = const.DEFAULT_HEART_BEAT_TIMEOUT,
         http_api=None,
+        http_poller_class=DenonHTTPPoller,
+        offline_policy: str = const.OFFLINE_DROP,
+        offline_ttl: float = const.DEFAULT_OFFLINE_TTL,
+        state_cache: FileCache = None,
         telnet: bool = True,
         timeout: float = denon_const.DEFAULT_TIMEOUT,
         zone_aux_class: Zone = DenonAuxZone,
@@ -26,9 +39,18 @@ class DenonReceiver(AVReceiver):
     ):
         super().__init__(
             host,
+            admission=admission,
+            device_cache=device_cache,
             dispatcher=dispatcher,
+            elide_max_age=elide_max_age,
+            group_rtt=group_rtt,
             heart_beat=heart_beat,
+            heart_beat_timeout=heart_beat_timeout,
             http_api=http_api,
+            http_poller_class=http_poller_class,
+            offline_policy=offline_policy,
+            offline_ttl=offline_ttl,
+            state_cache=state_cache,
             telnet=telnet,
             timeout=timeout,
             zone_aux_class=zone_aux_class,
@@ -39,4 +61,8 @@ class DenonReceiver(AVReceiver):
             host,
             timeout=timeout,
             heart_beat=heart_beat,
+            heart_beat_timeout=heart_beat_timeout,
+            offline_policy=offline_policy,
+            offline_ttl=offline_ttl,
+            group_rtt=group_rtt,
         )
@@ -1,14 +1,16 @@
 """Define the Denon/Marantz telnet connection."""
 import logging
-from datetime import datetime
+import time
 from importlib import resources
 from typing import Optional
 
 import yaml
 
+from pyavreceiver import const
 from pyavreceiver.denon import const as denon_const
 from pyavreceiver.denon.commands import get_command_lookup
 from pyavreceiver.denon.response import DenonMessage
+from pyavreceiver.pacing import AdaptivePacer
 from pyavreceiver.telnet_connection import TelnetConnection
 
 _LOGGER = logging.getLogger(__name__)
@@ -25,10 +27,24 @@ class DenonTelnetConnection(TelnetConnection):
         port: int = denon_const.CLI_PORT,
         timeout: float = denon_const.DEFAULT_TIMEOUT,
         heart_beat: Optional[float] = denon_const.DEFAULT_HEART_BEAT,
+        heart_beat_timeout: float = const.DEFAULT_HEART_BEAT_TIMEOUT,
+        offline_policy: str = const.OFFLINE_DROP,
+        offline_ttl: float = const.DEFAULT_OFFLINE_TTL,
+        group_rtt: bool = False,
     ):
         """Init the connection."""
-        super().__init__(avr, host, port=port, timeout=timeout, heart_beat=heart_beat)
-        self._message_interval_limit = denon_const.DEFAULT_MESSAGE_INTERVAL_LIMIT
+        super().__init__(
+            avr,
+            host,
+            port=port,
+            timeout=timeout,
+            heart_beat=heart_beat,
+            heart_beat_timeout=heart_beat_timeout,
+            offline_policy=offline_policy,
+            offline_ttl=offline_ttl,
+            group_rtt=group_rtt,
+        )
+        self._pacer = AdaptivePacer(denon_const.DEFAULT_MESSAGE_INTERVAL_LIMIT)
 
     def _load_command_dict(self, path=None):
         with resources.open_text("pyavreceiver.denon", "commands.yaml") as file:
@@ -37,6 +53,9 @@ class DenonTelnetConnection(TelnetConnection):
     def _get_command_lookup(self, command_dict):
         return get_command_lookup(command_dict)
 
+    def make_message(self, message: str) -> DenonMessage:
+        return DenonMessage(message, command_dict=self._command_dict)
+
     async def _response_handler(self):
         while True:
             msg = None  # temporary for error detection
@@ -45,14 +64,9 @@ class DenonTelnetConnection(TelnetConnection):
                     separator=denon_const.TELNET_SEPARATOR.encode()
                 )
                 message = msg.decode()[:-1]
-                self._last_activity = datetime.utcnow()
-                resp = DenonMessage(message, command_dict=self._command_dict)
+                self._last_activity = time.monotonic()
+                resp = self.make_message(message)
                 self._handle_event(resp)
-
-                # Check if this is a response to a previous command
-                if exp_response_items := self._expected_responses.popmatch(resp.group):
-                    _, expected_response = exp_response_items
-                    expected_response.set(resp.message)
             # pylint: disable=broad-except, fixme
             except Exception as err:
                 # TODO: error handling
@@ -0,0 +1,337 @@
+"""Define incremental parsers for Denon/Marantz XML responses.
+
+The parsers are fed chunks of a response as they arrive, extract only the fields
+that are needed in a single pass and stop parsing once they have them.
+"""
+from typing import Dict, List, Optional, Tuple, Union
+from xml.etree import ElementTree as ET
+
+from pyavreceiver import const
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.parse import parse
+
+UPNP_XMLNS = "{urn:schemas-upnp-org:device-1-0}"
+VOLUME_ZERO = 80  # relative 0 dB is 80 on the absolute scale used by telnet
+
+
+class StreamingXMLParser:
+    """Define the incremental parser interface."""
+
+    def __init__(self):
+        """Init the parser."""
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._depth = 0
+        self._done = False
+
+    def feed(self, data: Union[bytes, str]) -> bool:
+        """Parse a chunk of the document and return True when done."""
+        if not self._done:
+            self._parser.feed(data)
+            self._read_events()
+        return self._done
+
+    def close(self):
+        """Finish parsing and return the result."""
+        if not self._done:
+            self._parser.close()
+            self._read_events()
+        return self.result()
+
+    def _read_events(self) -> None:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+                self._start(elem, self._depth)
+            else:
+                self._end(elem, self._depth)
+                self._depth -= 1
+            if self._done:
+                return
+
+    def _start(self, elem: ET.Element, depth: int) -> None:
+        """Handle the start of an element; the root is at depth 1."""
+
+    def _end(self, elem: ET.Element, depth: int) -> None:
+        """Handle the end of an element; the root is at depth 1."""
+
+    def result(self):
+        """Return the parsed result."""
+
+    @property
+    def done(self) -> bool:
+        """Return True if the parser has everything it needs."""
+        return self._done
+
+
+class DeviceInfoParser(StreamingXMLParser):
+    """Parse Deviceinfo.xml or a UPnP device description."""
+
+    # Deviceinfo.xml fields are children of the root
+    DEVICE_INFO_FIELDS = {
+        "ModelName": const.INFO_MODEL,
+        "MacAddress": const.INFO_MAC,
+        "DeviceZones": const.INFO_ZONES,
+        denon_const.XML_API_VERS: const.INFO_API_VERSION,
+    }
+    # UPnP fields are children of the root's device element
+    UPNP_FIELDS = {
+        f"{UPNP_XMLNS}modelName": const.INFO_MODEL,
+        f"{UPNP_XMLNS}serialNumber": const.INFO_SERIAL,
+        f"{UPNP_XMLNS}manufacturer": const.INFO_MANUFACTURER,
+        f"{UPNP_XMLNS}friendlyName": const.INFO_FRIENDLY_NAME,
+    }
+
+    def __init__(self):
+        """Init the parser."""
+        super().__init__()
+        self._fields = self.DEVICE_INFO_FIELDS
+        self._field_depth = 2
+        self._info = {}
+
+    def _start(self, elem: ET.Element, depth: int) -> None:
+        if depth == 1 and elem.tag == f"{UPNP_XMLNS}root":
+            self._fields = self.UPNP_FIELDS
+            self._field_depth = 3
+
+    def _end(self, elem: ET.Element, depth: int) -> None:
+        if depth == self._field_depth:
+            if (key := self._fields.get(elem.tag)) and key not in self._info:
+                self._info[key] = elem.text
+                self._done = len(self._info) == len(self._fields)
+            elem.clear()
+
+    def result(self) -> Dict[str, Optional[str]]:
+        return self._info
+
+
+class RenamedSourcesParser(StreamingXMLParser):
+    """Parse an AppCommand GetRenameSource and GetDeletedSource response."""
+
+    def __init__(self):
+        """Init the parser."""
+        super().__init__()
+        self._section = None  # type: str
+        self._sections_seen = set()
+        self._deleted = set()
+        self._renamed = []
+
+    def _start(self, elem: ET.Element, depth: int) -> None:
+        if depth == 3 and elem.tag in ("functionrename", "functiondelete"):
+            self._section = elem.tag
+
+    def _end(self, elem: ET.Element, depth: int) -> None:
+        if depth == 3 and elem.tag == self._section:
+            self._sections_seen.add(self._section)
+            self._section = None
+            self._done = len(self._sections_seen) == 2
+        elif depth == 4 and self._section and elem.tag == "list":
+            try:
+                name = elem.find("name").text.strip().lower()
+                if self._section == "functiondelete":
+                    if elem.find("use").text == "0":
+                        self._deleted.add(name)
+                else:
+                    self._renamed.append((name, elem.find("rename").text.strip()))
+            except AttributeError:
+                pass
+            elem.clear()
+
+    def result(self) -> Dict[str, str]:
+        rename_map = {}
+        for name, rename in self._renamed:
+            if name not in self._deleted:
+                rename_map[rename] = (
+                    denon_const.MAP_HTTP_SOURCE_NAME_TO_TELNET.get(name) or name.upper()
+                )
+        return rename_map
+
+
+class LegacyRenamedSourcesParser(StreamingXMLParser):
+    """Parse the sources of MainZoneXml or MainZoneXmlStatus."""
+
+    SECTIONS = ("InputFuncList", "RenameSource", "SourceDelete")
+
+    def __init__(self):
+        """Init the parser."""
+        super().__init__()
+        self._values = {}  # type: Dict[str, List[Optional[str]]]
+
+    def _end(self, elem: ET.Element, depth: int) -> None:
+        if depth == 2:
+            if elem.tag in self.SECTIONS and elem.tag not in self._values:
+                self._values[elem.tag] = [value.text for value in elem]
+                self._done = len(self._values) == len(self.SECTIONS)
+            elem.clear()
+
+    def result(self) -> Dict[str, str]:
+        original_names = []
+        skip_source = 0
+        for name in self._values.get("InputFuncList", []):
+            if name == "SOURCE":
+                skip_source = 1  # Slice subsequent lists from 1:
+                continue
+            original_names.append(name)
+
+        deleted = [False] * len(original_names)
+        for i, delete in enumerate(self._values.get("SourceDelete", [])[skip_source:]):
+            if delete == "DEL":
+                deleted[i] = True
+
+        rename_map = {}
+        for i, name in enumerate(self._values.get("RenameSource", [])[skip_source:]):
+            if not deleted[i]:
+                original_name = original_names[i]
+                try:
+                    name = name.strip()
+                except AttributeError:
+                    name = original_name
+                rename_map[name] = (
+                    denon_const.MAP_HTTP_SOURCE_NAME_TO_TELNET.get(
+                        original_name.lower()
+                    )
+                    or original_name.upper()
+                )
+        return rename_map
+
+
+class AppCommandStatusParser(StreamingXMLParser):
+    """Parse AppCommand status queries into equivalent telnet messages.
+
+    The n-th cmd element of the response answers the n-th requested command.
+    """
+
+    ZONE_PREFIX = {"zone1": "", "zone2": "Z2", "zone3": "Z3", "zone4": "Z4"}
+    POWER_PREFIX = {"zone1": "ZM", "zone2": "Z2", "zone3": "Z3", "zone4": "Z4"}
+
+    def __init__(self, commands: List[str]):
+        """Init the parser with the list of requested commands."""
+        super().__init__()
+        self._commands = commands
+        self._index = 0
+        self._messages = []
+
+    def _end(self, elem: ET.Element, depth: int) -> None:
+        if depth != 2 or elem.tag != "cmd":
+            return
+        if self._index < len(self._commands):
+            handler = getattr(self, f"_{self._commands[self._index]}", None)
+            if handler:
+                handler(elem)
+        self._index += 1
+        self._done = self._index == len(self._commands)
+        elem.clear()
+
+    def _GetAllZonePowerStatus(self, elem: ET.Element) -> None:
+        # pylint: disable=invalid-name
+        states = []
+        for zone in elem:
+            if (prefix := self.POWER_PREFIX.get(zone.tag)) and zone.text:
+                states.append(zone.text.strip().upper())
+                self._messages.append(f"{prefix}{states[-1]}")
+        if states:
+            self._messages.append("PWON" if "ON" in states else "PWSTANDBY")
+
+    def _GetAllZoneVolume(self, elem: ET.Element) -> None:
+        # pylint: disable=invalid-name
+        for zone in elem:
+            if (prefix := self.ZONE_PREFIX.get(zone.tag)) is None:
+                continue
+            try:
+                volume = float(zone.find("volume").text)
+            except (AttributeError, TypeError, ValueError):
+                continue  # eg. "--" at minimum volume
+            self._messages.append(
+                f"{prefix or 'MV'}{parse.db_to_num(volume, zero=VOLUME_ZERO)}"
+            )
+
+    def _GetAllZoneMuteStatus(self, elem: ET.Element) -> None:
+        # pylint: disable=invalid-name
+        for zone in elem:
+            if (prefix := self.ZONE_PREFIX.get(zone.tag)) is not None and zone.text:
+                self._messages.append(f"{prefix}MU{zone.text.strip().upper()}")
+
+    def _GetAllZoneSource(self, elem: ET.Element) -> None:
+        # pylint: disable=invalid-name
+        for zone in elem:
+            if (prefix := self.ZONE_PREFIX.get(zone.tag)) is None:
+                continue
+            if (source := zone.findtext("source")) and source.strip():
+                self._messages.append(f"{prefix or 'SI'}{telnet_source(source)}")
+
+    def _GetSurroundModeStatus(self, elem: ET.Element) -> None:
+        # pylint: disable=invalid-name
+        if surround := (elem.findtext("surround") or "").strip():
+            self._messages.append(f"MS{surround.upper()}")
+
+    def result(self) -> List[str]:
+        return self._messages
+
+
+class AppCommandSetParser(StreamingXMLParser):
+    """Parse the outcome of each parameter of AppCommand0300 set commands.
+
+    A parameter is applied if the receiver echoes it in the list of its command
+    without a result, or with result 1.  Parameters it does not echo were not
+    applied.
+    """
+
+    def __init__(self):
+        """Init the parser."""
+        super().__init__()
+        self._applied = {}  # type: Dict[Tuple[str, str], bool]
+
+    def _end(self, elem: ET.Element, depth: int) -> None:
+        if depth != 2 or elem.tag != "cmd":
+            return
+        name = (elem.findtext("name") or "").strip()
+        for param in elem.iter("param"):
+            if param_name := param.get("name"):
+                self._applied[(name, param_name)] = param.get("result", "1") == "1"
+        elem.clear()
+
+    def result(self) -> Dict[Tuple[str, str], bool]:
+        return self._applied
+
+
+class LegacyStatusParser(StreamingXMLParser):
+    """Parse MainZoneXmlStatus into equivalent telnet messages."""
+
+    PREFIXES = {
+        "Power": "PW",
+        "ZonePower": "ZM",
+        "InputFuncSelect": "SI",
+        "MasterVolume": "MV",
+        "Mute": "MU",
+        "selectSurround": "MS",
+        "SurrMode": "MS",
+    }
+
+    def __init__(self):
+        """Init the parser."""
+        super().__init__()
+        self._messages = {}
+
+    def _end(self, elem: ET.Element, depth: int) -> None:
+        if depth != 2:
+            return
+        value = (elem.findtext("value") or "").strip()
+        if (prefix := self.PREFIXES.get(elem.tag)) and value:
+            if prefix == "MV":
+                try:
+                    value = parse.db_to_num(float(value), zero=VOLUME_ZERO)
+                except ValueError:
+                    value = None
+            elif prefix == "SI":
+                value = telnet_source(value)
+            if value is not None:
+                self._messages.setdefault(prefix, f"{prefix}{value.upper()}")
+        elem.clear()
+
+    def result(self) -> List[str]:
+        return list(self._messages.values())
+
+
+def telnet_source(http_name: str) -> str:
+    """Return the telnet source for an HTTP API source name."""
+    name = http_name.strip()
+    return denon_const.MAP_HTTP_SOURCE_NAME_TO_TELNET.get(name.lower()) or name.upper()
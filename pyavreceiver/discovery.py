@@ -0,0 +1,229 @@
+"""Define discovery of receivers with SSDP or by scanning a network."""
+import asyncio
+import ipaddress
+import logging
+import socket
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from pyavreceiver import const
+from pyavreceiver.error import AVReceiverIncompatibleDeviceError
+from pyavreceiver.http_api import create_session
+from pyavreceiver.probe import probe
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DiscoveredDevice:
+    """Define a receiver found on the network."""
+
+    __slots__ = ("host", "name", "location", "upnp_data")
+
+    def __init__(self, host: str, name: str, location: str = None, upnp_data=None):
+        """Init the device."""
+        self.host = host
+        self.name = name
+        self.location = location
+        self.upnp_data = upnp_data
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}, host: {self.host}, name: {self.name}"
+
+
+class SSDPProtocol(asyncio.DatagramProtocol):
+    """Define a protocol that passes SSDP responses to a callback."""
+
+    def __init__(self, on_response: Callable[[Dict[str, str], Tuple], None]):
+        """Init the protocol."""
+        self._on_response = on_response
+
+    def datagram_received(self, data: bytes, addr: Tuple) -> None:
+        """Parse a response and pass on its headers."""
+        if headers := parse_ssdp_response(data):
+            self._on_response(headers, addr)
+
+
+def parse_ssdp_response(data: bytes) -> Optional[Dict[str, str]]:
+    """Return the upper case headers of an SSDP response, None if invalid."""
+    try:
+        lines = data.decode().split("\r\n")
+    except UnicodeDecodeError:
+        return None
+    if not lines[0].startswith("HTTP/1.1 200"):
+        return None
+    headers = {}
+    for line in lines[1:]:
+        key, sep, val = line.partition(":")
+        if sep:
+            headers[key.strip().upper()] = val.strip()
+    return headers
+
+
+def make_msearch(search_target: str, mx: int = const.SSDP_MX) -> bytes:
+    """Prepare an SSDP M-SEARCH request."""
+    return (
+        "M-SEARCH * HTTP/1.1\r\n"
+        f"HOST: {const.SSDP_ADDRESS[0]}:{const.SSDP_ADDRESS[1]}\r\n"
+        'MAN: "ssdp:discover"\r\n'
+        f"MX: {mx}\r\n"
+        f"ST: {search_target}\r\n"
+        "\r\n"
+    ).encode()
+
+
+def match_endpoint(location: str, endpoints: Dict[str, str]) -> Optional[str]:
+    """Return the name of the UPnP endpoint that location points to, if any."""
+    try:
+        url = urlsplit(location)
+        port = url.port or 80
+    except ValueError:
+        return None
+    for name, endpoint in endpoints.items():
+        if endpoint == f":{port}{url.path}":
+            return name
+    return None
+
+
+async def discover(
+    *,
+    timeout: float = const.DEFAULT_DISCOVERY_TIMEOUT,
+    address: Tuple[str, int] = const.SSDP_ADDRESS,
+    search_target: str = const.SSDP_SEARCH_TARGET,
+    max_concurrency: int = const.DEFAULT_DISCOVERY_CONCURRENCY,
+    endpoints: Dict[str, str] = None,
+    session: aiohttp.ClientSession = None,
+) -> AsyncIterator[DiscoveredDevice]:
+    """Search with SSDP and yield each supported receiver as it is confirmed.
+
+    A response whose LOCATION is one of the known UPnP endpoints is confirmed by
+    fetching that description; other hosts are probed at every endpoint.  At most
+    max_concurrency descriptions are fetched at once.
+    """
+    endpoints = endpoints or const.UPNP_ENDPOINTS
+    loop = asyncio.get_running_loop()
+    results = asyncio.Queue()
+    seen = set()
+    tasks = set()
+
+    def on_response(headers: Dict[str, str], addr: Tuple) -> None:
+        location = headers.get("LOCATION", "")
+        host = urlsplit(location).hostname or addr[0]
+        if host in seen:
+            return
+        seen.add(host)
+        if name := match_endpoint(location, endpoints):
+            host_endpoints = {name: endpoints[name]}
+        else:
+            host_endpoints = endpoints
+        task = loop.create_task(
+            _probe_host(
+                host, host_endpoints, session, semaphore, results, location=location
+            )
+        )
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    own_session = session is None
+    session = session or create_session(limit_per_host=1)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: SSDPProtocol(on_response), family=socket.AF_INET
+    )
+    sock = transport.get_extra_info("socket")
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, const.SSDP_TTL)
+    received = 0
+    try:
+        message = make_msearch(search_target)
+        for _ in range(const.SSDP_REPEAT):  # UDP may be lost
+            transport.sendto(message, address)
+        deadline = loop.time() + timeout
+        while (remaining := deadline - loop.time()) > 0 or received < len(seen):
+            # After the deadline, wait for the probes in flight, which time out
+            try:
+                device = await asyncio.wait_for(
+                    results.get(), remaining if remaining > 0 else None
+                )
+            except asyncio.TimeoutError:
+                continue
+            received += 1
+            if device is not None:
+                yield device
+    finally:
+        transport.close()
+        for task in tasks:
+            task.cancel()
+        if own_session:
+            await session.close()
+
+
+async def scan(
+    hosts: Iterable[str],
+    *,
+    timeout: float = const.DEFAULT_SCAN_TIMEOUT,
+    max_concurrency: int = const.DEFAULT_DISCOVERY_CONCURRENCY,
+    endpoints: Dict[str, str] = None,
+    session: aiohttp.ClientSession = None,
+) -> AsyncIterator[DiscoveredDevice]:
+    """Probe hosts, or every address of a network like "10.0.0.0/24".
+
+    Useful where multicast is not routed.  Receivers are yielded as they answer.
+    """
+    if isinstance(hosts, str):
+        hosts = (str(host) for host in ipaddress.ip_network(hosts).hosts())
+    endpoints = endpoints or const.UPNP_ENDPOINTS
+    own_session = session is None
+    session = session or create_session(limit_per_host=1)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = asyncio.Queue()
+    tasks = set()
+    pending = 0
+    try:
+        for host in hosts:
+            # Bound the number of pending tasks as well as requests in flight
+            while pending >= max_concurrency:
+                pending -= 1
+                if device := await results.get():
+                    yield device
+            task = asyncio.create_task(
+                _probe_host(
+                    host, endpoints, session, semaphore, results, timeout=timeout
+                )
+            )
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            pending += 1
+        while pending:
+            pending -= 1
+            if device := await results.get():
+                yield device
+    finally:
+        for task in tasks:
+            task.cancel()
+        if own_session:
+            await session.close()
+
+
+async def _probe_host(
+    host: str,
+    endpoints: Dict[str, str],
+    session: aiohttp.ClientSession,
+    semaphore: asyncio.Semaphore,
+    results: asyncio.Queue,
+    *,
+    location: str = None,
+    timeout: float = const.DEFAULT_PROBE_TIMEOUT,
+) -> None:
+    """Probe host and put the DiscoveredDevice, or None, on results."""
+    device = None
+    try:
+        async with semaphore:
+            name, upnp_data = await probe(
+                host, session, endpoints=endpoints, timeout=timeout
+            )
+        device = DiscoveredDevice(host, name, location, upnp_data)
+    except AVReceiverIncompatibleDeviceError:
+        _LOGGER.debug("No supported device at %s", host)
+    finally:
+        results.put_nowait(device)
@@ -13,6 +13,10 @@ class AVReceiverIncompatibleDeviceError(AVReceiverError):
     """Invalid argument error."""
 
 
+class AVReceiverNotConnectedError(AVReceiverError):
+    """Command sent while not connected error."""
+
+
 class QosTooHigh(AVReceiverError):
     """QoS too high error."""
 
@@ -0,0 +1,205 @@
+"""Define a fleet of receivers run together on one event loop."""
+import asyncio
+import logging
+from collections import Counter
+from functools import partial
+from typing import Any, Dict, List, Optional, Type
+
+from pyavreceiver import const
+from pyavreceiver.admission import AdmissionController
+from pyavreceiver.cache import FileCache
+from pyavreceiver.denon.receiver import DenonReceiver
+from pyavreceiver.dispatch import Dispatcher
+from pyavreceiver.receiver import AVReceiver
+
+_LOGGER = logging.getLogger(__name__)
+
+# Metrics that are gauges of one receiver rather than counts
+_GAUGES = ("srtt", "rttvar", "rto")
+
+
+class ReceiverFleet:
+    """Run many receivers, eg. hundreds, on one event loop.
+
+    The receivers share what they would otherwise each hold: the command table of
+    their class is read once, one heartbeat timer probes every idle connection
+    rather than a task per receiver, and the admission controller and caches are
+    common.  Their signals are relayed on the fleet dispatcher, with the host of
+    the receiver ahead of the arguments.
+    """
+
+    def __init__(
+        self,
+        *,
+        admission: AdmissionController = None,
+        device_cache: FileCache = None,
+        dispatcher: Dispatcher = None,
+        heart_beat: Optional[float] = const.DEFAULT_HEART_BEAT,
+        state_cache: FileCache = None,
+        tick: float = const.DEFAULT_FLEET_TICK,
+    ):
+        """Init the fleet."""
+        self._admission = admission or AdmissionController()
+        self._device_cache = device_cache
+        self._dispatcher = dispatcher or Dispatcher()
+        self._heart_beat = heart_beat
+        self._state_cache = state_cache
+        self._tick = tick
+        self._receivers = {}  # type: Dict[str, AVReceiver]
+        self._heart_beat_task = None  # type: asyncio.Task
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}, receivers: {len(self._receivers)}"
+
+    def __len__(self):
+        return len(self._receivers)
+
+    def add(
+        self,
+        host: str,
+        receiver_class: Type[AVReceiver] = DenonReceiver,
+        *,
+        http_api=None,
+        **kwargs,
+    ) -> AVReceiver:
+        """Add a receiver of host, to be initialized by start, and return it."""
+        receiver = receiver_class(
+            host,
+            admission=self._admission,
+            device_cache=self._device_cache,
+            dispatcher=Dispatcher(send=partial(self._relay, host)),
+            heart_beat=None,
+            http_api=http_api,
+            state_cache=self._state_cache,
+            **kwargs,
+        )
+        self._receivers[host] = receiver
+        return receiver
+
+    def _relay(self, host: str, signal: str, *args: Any) -> List[asyncio.Future]:
+        """Send a signal of the receiver of host on the fleet dispatcher."""
+        return self._dispatcher.send(signal, host, *args)
+
+    async def start(
+        self,
+        *,
+        auto_reconnect: bool = True,
+        reconnect_delay: float = const.DEFAULT_RECONNECT_DELAY,
+    ) -> Dict[str, Exception]:
+        """Initialize the receivers and return the errors of those that failed."""
+        tables = {}
+        for receiver in self._receivers.values():
+            connection = receiver.telnet_connection
+            connection_class = type(connection)
+            if connection_class not in tables:
+                tables[connection_class] = await connection.read_command_table()
+            connection.share_command_table(*tables[connection_class])
+        results = await asyncio.gather(
+            *(
+                receiver.init(
+                    auto_reconnect=auto_reconnect, reconnect_delay=reconnect_delay
+                )
+                for receiver in self._receivers.values()
+            ),
+            return_exceptions=True,
+        )
+        errors = {}
+        for host, result in zip(self._receivers, results):
+            if isinstance(result, Exception):
+                _LOGGER.warning("Failed to start %s: %s", host, result)
+                errors[host] = result
+        if self._heart_beat is not None and self._heart_beat > 0:
+            self._heart_beat_task = asyncio.create_task(self._heart_beats())
+        return errors
+
+    async def stop(self) -> None:
+        """Stop the heartbeats and disconnect the receivers."""
+        if self._heart_beat_task:
+            self._heart_beat_task.cancel()
+            try:
+                await self._heart_beat_task
+            except asyncio.CancelledError:
+                pass
+            self._heart_beat_task = None
+        await asyncio.gather(
+            *(receiver.disconnect() for receiver in self._receivers.values())
+        )
+
+    async def _heart_beats(self) -> None:
+        """Probe each connection idle for the heart beat interval, every tick."""
+        while True:
+            await asyncio.sleep(self._tick)
+            for receiver in self._receivers.values():
+                connection = receiver.telnet_connection
+                if (
+                    connection.state == const.STATE_CONNECTED
+                    and connection.idle >= self._heart_beat
+                ):
+                    connection.probe()
+
+    def state(self, attr: str) -> Dict[str, Any]:
+        """Get the value of attr of each receiver that has reported it."""
+        return {
+            host: receiver.state[attr]
+            for host, receiver in self._receivers.items()
+            if attr in receiver.state
+        }
+
+    def select(self, **attrs) -> List[AVReceiver]:
+        """Get the receivers whose state has all of the attribute values."""
+        return [
+            receiver
+            for receiver in self._receivers.values()
+            if all(
+                attr in receiver.state and receiver.state[attr] == val
+                for attr, val in attrs.items()
+            )
+        ]
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Get the connection health of each receiver."""
+        health = {}
+        for host, receiver in self._receivers.items():
+            connection = receiver.telnet_connection
+            metrics = receiver.metrics
+            health[host] = {
+                "state": connection.state,
+                "idle": connection.idle,
+                "srtt": connection.rtt.srtt,
+                "rto": connection.rtt.rto,
+                "message_interval": connection.message_interval_limit,
+                "reconnects": metrics["reconnects"],
+                "heart_beat_failures": metrics["heart_beat_failures"],
+                "commands_resent": metrics["commands_resent"],
+                "stale": len(receiver.stale),
+            }
+        return health
+
+    @property
+    def admission(self) -> AdmissionController:
+        """Get the admission controller shared by the receivers."""
+        return self._admission
+
+    @property
+    def dispatcher(self) -> Dispatcher:
+        """Get the dispatcher that relays the signals of the receivers."""
+        return self._dispatcher
+
+    @property
+    def metrics(self) -> Counter:
+        """Get the metrics summed over the receivers, without the gauges."""
+        metrics = Counter()
+        for receiver in self._receivers.values():
+            metrics.update(
+                {
+                    key: val
+                    for key, val in receiver.metrics.items()
+                    if key not in _GAUGES
+                }
+            )
+        return metrics
+
+    @property
+    def receivers(self) -> Dict[str, AVReceiver]:
+        """Get the receivers by host."""
+        return self._receivers
@@ -1,4 +1,6 @@
 """Functions for pyavreceiver."""
+import time
+from typing import Awaitable
 
 
 def identity(arg, **kwargs):
@@ -10,3 +12,17 @@ def identity(arg, **kwargs):
 async def none() -> None:
     """Awaitable that immediately resolves to None."""
     return None
+
+
+async def resolved(val):
+    """Awaitable that immediately resolves to val."""
+    return val
+
+
+async def timed(awaitable: Awaitable, timings: dict, key: str):
+    """Await awaitable and record the elapsed seconds in timings[key]."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[key] = time.perf_counter() - start
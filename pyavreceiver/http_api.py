@@ -1,20 +1,89 @@
 """Define a request/response connection to an AV Receiver."""
 from abc import ABC
 from collections import defaultdict
+from typing import Dict, List
+
+import aiohttp
+
+from pyavreceiver import const
+from pyavreceiver.command import TelnetCommand
+
+
+def create_session(
+    *,
+    limit: int = const.DEFAULT_HTTP_CONNECTION_LIMIT,
+    limit_per_host: int = const.DEFAULT_HTTP_LIMIT_PER_HOST,
+    keepalive_timeout: float = const.DEFAULT_HTTP_KEEPALIVE,
+    timeout: float = const.DEFAULT_HTTP_TIMEOUT,
+) -> aiohttp.ClientSession:
+    """Create a keep-alive, connection pooled session.
+
+    A single session may be shared by any number of HTTPApi instances, eg. one per
+    process for a fleet of receivers.  The caller owns a session that it passes in
+    and is responsible for closing it.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit, limit_per_host=limit_per_host, keepalive_timeout=keepalive_timeout
+    )
+    return aiohttp.ClientSession(
+        connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)
+    )
 
 
 class HTTPApi(ABC):
     """Define the HTTP connection interface."""
 
-    def __init__(self, host: str, upnp_data=None):
-        """Init the connection."""
+    def __init__(
+        self,
+        host: str,
+        upnp_data=None,
+        *,
+        session: aiohttp.ClientSession = None,
+        owns_session: bool = None,
+    ):
+        """Init the connection.
+
+        The session is closed by close() only if it is owned by this instance.  By
+        default a session that is passed in is owned by the caller.
+        """
         self.host = host
         self._upnp_data = upnp_data
         self.port = None  # type: int
         self._device_info_url = None  # type: str
         self._device_info = defaultdict(None)
+        self._session = session  # type: aiohttp.ClientSession
+        self._owns_session = session is None if owns_session is None else owns_session
+
+    async def close(self) -> None:
+        """Close the session if it is owned by this instance."""
+        if self._owns_session and self._session and not self._session.closed:
+            await self._session.close()
+        if self._owns_session:
+            self._session = None
+
+    def can_set(self, command: TelnetCommand) -> bool:
+        """Return True if set_many can send command."""
+        # pylint: disable=unused-argument
+        return False
+
+    async def set_many(self, commands: List[TelnetCommand]) -> Dict[str, bool]:
+        """Send the commands that the HTTP API can express in one request.
+
+        Return the outcome by name of each command that was sent; the caller is
+        responsible for sending the rest another way.
+        """
+        # pylint: disable=unused-argument
+        return {}
 
     @property
     def device_info(self):
         """Return the device info dict."""
         return self._device_info
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the client session, creating a pooled session if needed."""
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+            self._owns_session = True
+        return self._session
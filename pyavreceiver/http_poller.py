@@ -0,0 +1,110 @@
+"""Define polling the state of an AV Receiver over HTTP."""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import List
+
+from pyavreceiver import const
+from pyavreceiver.http_api import HTTPApi
+from pyavreceiver.response import Message
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HTTPPoller(ABC):
+    """Define an HTTP state poller with an adaptive interval.
+
+    The interval drops to min_interval whenever a poll observes a change and grows
+    by backoff after each poll that does not, up to max_interval.  The state is
+    read as the equivalent telnet messages, and each that changes the state is
+    signalled like a telnet message.
+    """
+
+    def __init__(
+        self,
+        avr,
+        http_api: HTTPApi,
+        *,
+        min_interval: float = const.DEFAULT_POLL_MIN_INTERVAL,
+        max_interval: float = const.DEFAULT_POLL_MAX_INTERVAL,
+        backoff: float = const.DEFAULT_POLL_BACKOFF,
+    ):
+        """Init the poller."""
+        self._avr = avr
+        self._http_api = http_api
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._backoff = backoff
+        self._interval = min_interval
+        self._metrics = Counter()
+        self._poll_task = None  # type: asyncio.Task
+
+    @abstractmethod
+    async def _poll(self) -> List[Message]:
+        """Request the state from the device as the equivalent telnet messages."""
+
+    async def poll(self) -> dict:
+        """Poll once, update the receiver state and return the changes."""
+        start = time.perf_counter()
+        messages = await self._poll()
+        self._metrics["polls"] += 1
+        self._metrics["poll_time"] += time.perf_counter() - start
+        changes = {}
+        for message in messages:
+            changed = {
+                attr: val
+                for attr, val in message.state_update.items()
+                if attr not in self._avr.state or self._avr.state[attr] != val
+            }
+            if self._avr.update_state(message.state_update):
+                changes.update(changed)
+                self._avr.dispatcher.send(const.SIGNAL_STATE_UPDATE, message.message)
+        if changes:
+            self._metrics["changes"] += 1
+            _LOGGER.debug("Polled state update: %s", changes)
+        return changes
+
+    async def _poll_loop(self):
+        """Poll at an interval that adapts to how fast the state changes."""
+        # pylint: disable=broad-except
+        while True:
+            try:
+                if await self.poll():
+                    self._interval = self._min_interval
+                else:
+                    self._interval = min(
+                        self._interval * self._backoff, self._max_interval
+                    )
+            except Exception as err:
+                self._metrics["errors"] += 1
+                self._interval = self._max_interval
+                _LOGGER.debug("Failed to poll %s: %s", self._http_api.host, err)
+            await asyncio.sleep(self._interval)
+
+    async def start(self) -> None:
+        """Start polling in the background."""
+        if not self._poll_task:
+            self._interval = self._min_interval
+            self._poll_task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._poll_task:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+
+    @property
+    def interval(self) -> float:
+        """Get the current polling interval in seconds."""
+        return self._interval
+
+    @property
+    def metrics(self) -> Counter:
+        """Get the counters of polls, requests, changes and errors."""
+        return self._metrics
@@ -0,0 +1,61 @@
+"""Define the pacing of the messages sent to a receiver."""
+from pyavreceiver import const
+
+
+class AdaptivePacer:
+    """Adapt the interval between messages to what the device keeps up with.
+
+    The interval is additively decreased each time a command is answered quickly
+    on its first attempt, and multiplicatively increased each time a command of a
+    group that the device is known to answer has to be retried, ie. the device
+    dropped it.  A slow answer holds the interval.  The interval stays within the
+    minimum and maximum; equal bounds fix it.
+    """
+
+    __slots__ = ("_interval", "_minimum", "_maximum")
+
+    def __init__(
+        self,
+        interval: float = const.DEFAULT_MESSAGE_INTERVAL_LIMIT,
+        *,
+        minimum: float = const.DEFAULT_MIN_MESSAGE_INTERVAL,
+        maximum: float = const.DEFAULT_MAX_MESSAGE_INTERVAL,
+    ):
+        """Init the pacer."""
+        self._minimum = min(minimum, interval)
+        self._maximum = max(maximum, interval)
+        self._interval = interval
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}, interval: {self._interval}, "
+            f"bounds: {self._minimum}-{self._maximum}"
+        )
+
+    def answered(self, latency: float) -> None:
+        """Record that a command was answered latency seconds after it was sent."""
+        if latency <= const.DEFAULT_PACING_SLOW_ANSWER:
+            self._interval = max(
+                self._minimum, self._interval - const.DEFAULT_PACING_STEP
+            )
+
+    def dropped(self) -> None:
+        """Record that the device dropped a command."""
+        self._interval = min(
+            self._maximum, self._interval * const.DEFAULT_PACING_BACKOFF
+        )
+
+    @property
+    def interval(self) -> float:
+        """Get the seconds between messages currently in use."""
+        return self._interval
+
+    @property
+    def minimum(self) -> float:
+        """Get the smallest interval."""
+        return self._minimum
+
+    @property
+    def maximum(self) -> float:
+        """Get the largest interval."""
+        return self._maximum
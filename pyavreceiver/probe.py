@@ -0,0 +1,87 @@
+"""Define probing of a host for a supported device."""
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+
+from pyavreceiver import const
+from pyavreceiver.error import AVReceiverIncompatibleDeviceError
+
+_LOGGER = logging.getLogger(__name__)
+
+_DRIVER_CACHE = {}  # type: Dict[str, str]
+
+
+async def probe(
+    host: str,
+    session: aiohttp.ClientSession,
+    *,
+    endpoints: Dict[str, str] = None,
+    timeout: float = const.DEFAULT_PROBE_TIMEOUT,
+) -> Tuple[str, str]:
+    """Return the (driver name, UPnP description) of the device at host.
+
+    Each distinct endpoint URL is requested once and concurrently.  The URLs keep
+    the priority order of endpoints: a successful response is decisive once every
+    URL ahead of it has failed, and the remaining requests are then cancelled.
+    Drivers that share a URL are ordered as in endpoints.  The detected driver is
+    cached per host and tried alone on the next probe.
+    """
+    endpoints = endpoints or const.UPNP_ENDPOINTS
+    if (name := _DRIVER_CACHE.get(host)) in endpoints:
+        if (
+            text := await _get_text(session, host, endpoints[name], timeout)
+        ) is not None:
+            return name, text
+        del _DRIVER_CACHE[host]
+
+    url_names = {}
+    for name, url in endpoints.items():
+        url_names.setdefault(url, name)
+    tasks = {
+        url: asyncio.create_task(_get_text(session, host, url, timeout))
+        for url in url_names
+    }
+    pending = set(tasks.values())
+    try:
+        while pending:
+            _, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for url, task in tasks.items():
+                if not task.done():
+                    break  # wait for the URLs ahead
+                if (text := task.result()) is not None:
+                    name = url_names[url]
+                    _DRIVER_CACHE[host] = name
+                    return name, text
+    finally:
+        for task in pending:
+            task.cancel()
+    raise AVReceiverIncompatibleDeviceError
+
+
+def clear_probe_cache(host: str = None) -> None:
+    """Forget the detected driver of host, or of all hosts."""
+    if host is None:
+        _DRIVER_CACHE.clear()
+    else:
+        _DRIVER_CACHE.pop(host, None)
+
+
+async def _get_text(
+    session: aiohttp.ClientSession, host: str, url: str, timeout: float
+) -> Optional[str]:
+    """Return the body of a successful GET, else None."""
+    # pylint: disable=broad-except
+    try:
+        async with session.get(
+            f"http://{host}{url}", timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            if response.status == 200:
+                return await response.text()
+            _LOGGER.debug("Probe of %s%s returned %s", host, url, response.status)
+    except Exception as err:
+        _LOGGER.debug("Probe of %s%s failed: %s", host, url, err)
+    return None
@@ -0,0 +1,142 @@
+"""Plan the fewest queries that update a set of attributes."""
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from pyavreceiver import const
+from pyavreceiver.command import TelnetCommand
+
+
+class QueryPlan:
+    """Define the queries planned to update a set of attributes."""
+
+    __slots__ = ("queries", "unplanned", "skipped", "naive", "sent", "time_saved")
+
+    def __init__(
+        self,
+        queries: Dict[str, List[str]],
+        unplanned: List[str],
+        naive: int,
+        skipped: Dict[str, List[str]] = None,
+    ):
+        """Init the plan."""
+        self.queries = queries  # query name: the wanted names it answers
+        self.unplanned = unplanned  # wanted names that no query answers
+        self.skipped = skipped or {}  # unsupported group: the wanted names in it
+        self.naive = naive  # queries needed at one query per name
+        self.sent = None  # type: Optional[int]
+        self.time_saved = 0.0  # seconds of unanswered queries not sent
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}, planned: {self.planned}, naive: {self.naive}, "
+            f"sent: {self.sent}, skipped: {list(self.skipped)}, "
+            f"queries: {list(self.queries)}"
+        )
+
+    @property
+    def planned(self) -> int:
+        """Return the number of queries planned."""
+        return len(self.queries)
+
+
+class QueryPlanner:
+    """Map wanted attributes to the smallest set of queries that answers them.
+
+    A query answers the group of its command and, from the command table, the
+    groups of the commands that share it, eg. MV? answers MV and MVMAX, and the
+    family of a multi-message query, eg. CV? answers every CV param.  Groups
+    that the device has been seen answering a query with, in the messages that
+    follow its reply, are learned and used once seen often enough.
+    """
+
+    def __init__(self, min_observations: int = const.DEFAULT_QUERY_OBSERVATIONS):
+        """Init the planner."""
+        self._min_observations = min_observations
+        self._commands = {}  # type: Dict[str, TelnetCommand]
+        self._query_names = {}  # type: Dict[str, str]
+        self._query_groups = {}  # type: Dict[str, str]
+        self._answers = defaultdict(set)  # type: Dict[str, Set[str]]
+        self._observations = defaultdict(Counter)  # type: Dict[str, Counter]
+
+    def load(self, commands: Dict[str, TelnetCommand]) -> None:
+        """Index the static knowledge of the command table."""
+        self._commands = commands
+        self._query_names = {}
+        self._query_groups = {}
+        self._answers = defaultdict(set)
+        for name, command in commands.items():
+            if not command.queryable:
+                continue
+            if command.is_multi:
+                self._query_names[name] = name
+                self._query_groups[name] = command.group
+                self._answers[name].update(command.multi_groups, (command.group, name))
+                continue
+            self._query_names.setdefault(command.group, name)
+            self._query_groups[command.group] = command.group
+            self._answers[command.group].add(command.group)
+            self._answers[command.query_group].add(command.group)
+
+    def observe(self, query_group: str, group: str) -> None:
+        """Record that a message of group followed the reply to a query."""
+        self._observations[query_group][group] += 1
+
+    def answers(self, query: str) -> Set[str]:
+        """Return the groups that a query, by group or multi command name, answers."""
+        learned = {
+            group
+            for group, count in self._observations.get(query, {}).items()
+            if count >= self._min_observations
+        }
+        return self._answers.get(query, set()) | learned
+
+    def plan(
+        self, names: Iterable[str], unsupported: Set[str] = frozenset()
+    ) -> QueryPlan:
+        """Return the queries that answer the wanted names.
+
+        Names of unsupported groups are skipped and queries of unsupported groups,
+        eg. a multi-message query, are not used.
+        """
+        wanted = defaultdict(list)  # type: Dict[str, List[str]]
+        skipped = defaultdict(list)  # type: Dict[str, List[str]]
+        unplanned = []
+        for name in names:
+            command = self._commands.get(name)
+            if command is None or not command.queryable:
+                unplanned.append(name)
+            elif command.group in unsupported:
+                skipped[command.group].append(name)
+            elif command.is_multi:
+                wanted[name].append(name)
+            else:
+                wanted[command.group].append(name)
+        naive = sum(len(group_names) for group_names in wanted.values()) + sum(
+            len(group_names) for group_names in skipped.values()
+        )
+
+        answers = {
+            query: self.answers(query)
+            for query in self._query_names
+            if self._query_groups[query] not in unsupported
+        }
+        candidates = {query: answers[query] & set(wanted) for query in answers}
+        uncovered = set(wanted)
+        queries = {}
+        while uncovered:
+            # most groups answered, then fewest groups answered in all
+            query = max(
+                candidates,
+                key=lambda q: (len(candidates[q] & uncovered), -len(answers[q])),
+                default=None,
+            )
+            if query is None or not candidates[query] & uncovered:
+                break
+            answered = candidates.pop(query) & uncovered
+            uncovered -= answered
+            queries[self._query_names[query]] = [
+                name for group in wanted if group in answered for name in wanted[group]
+            ]
+        for group in uncovered:
+            unplanned.extend(wanted[group])
+        return QueryPlan(queries, unplanned, naive, dict(skipped))
@@ -1,14 +1,25 @@
 """Define an audio/video receiver."""
-from collections import defaultdict
-from typing import Dict, Optional
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set
 
 from pyavreceiver import const
+from pyavreceiver.admission import AdmissionController
+from pyavreceiver.cache import FileCache
+from pyavreceiver.capabilities import Capabilities
 from pyavreceiver.command import Command, CommandValues
 from pyavreceiver.dispatch import Dispatcher
+from pyavreceiver.functions import timed
 from pyavreceiver.http_api import HTTPApi
+from pyavreceiver.http_poller import HTTPPoller
+from pyavreceiver.query_planner import QueryPlan
 from pyavreceiver.telnet_connection import TelnetConnection
 from pyavreceiver.zone import Zone
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class AVReceiver:
     """Representation of an audio/video receiver."""
@@ -17,9 +28,18 @@ class AVReceiver:
         self,
         host: str,
         *,
+        admission: AdmissionController = None,
+        device_cache: FileCache = None,
         dispatcher: Dispatcher = Dispatcher(),
+        elide_max_age: Optional[float] = None,
+        group_rtt: bool = False,
         heart_beat: Optional[float] = const.DEFAULT_HEART_BEAT,
+        heart_beat_timeout: float = const.DEFAULT_HEART_BEAT_TIMEOUT,
         http_api: HTTPApi = None,
+        http_poller_class: HTTPPoller = None,
+        offline_policy: str = const.OFFLINE_DROP,
+        offline_ttl: float = const.DEFAULT_OFFLINE_TTL,
+        state_cache: FileCache = None,
         telnet: bool = True,
         timeout: float = const.DEFAULT_TIMEOUT,
         zone_aux_class: Zone = None,
@@ -27,19 +47,38 @@ class AVReceiver:
     ):
         """Init the device."""
         self._host = host
+        self._admission = admission
+        self._device_cache = device_cache
         self._dispatcher = dispatcher
+        self._elide_max_age = elide_max_age
+        self._group_rtt = group_rtt
         self._heart_beat = heart_beat
+        self._heart_beat_timeout = heart_beat_timeout
         self._http_api = http_api
+        self._http_poller_class = http_poller_class
+        self._offline_policy = offline_policy
+        self._offline_ttl = offline_ttl
+        self._state_cache = state_cache
         self._telnet = telnet
         self._timeout = timeout
         self._zone_aux_class = zone_aux_class
         self._zone_main_class = zone_main_class
 
+        self._capabilities = Capabilities()
         self._connection = None  # type: TelnetConnection
         self._connections = []
         self._device_info = {}
+        self._device_info_task = None  # type: asyncio.Task
+        self._http_poller = None  # type: HTTPPoller
+        self._metrics = Counter()
         self._sources = None  # type: dict
         self._state = defaultdict()
+        self._state_times = {}  # attr: monotonic time the device last reported it
+        self._change_counts = Counter()  # attr: times the device changed it
+        self._stale = set()  # attrs loaded from the state cache, not yet reported
+        self._save_state_task = None  # type: asyncio.Task
+        self._warm_start_task = None  # type: asyncio.Task
+        self._timings = {}
 
         self._main_zone = None  # type: Zone
         self._zone2, self._zone3, self._zone4 = None, None, None
@@ -50,15 +89,39 @@ class AVReceiver:
         auto_reconnect=False,
         reconnect_delay: float = const.DEFAULT_RECONNECT_DELAY,
     ):
-        """Await the initialization of the device."""
-        disconnect = await self._connection.init(
-            auto_reconnect=auto_reconnect, reconnect_delay=reconnect_delay
-        )
-        self._connections.append(disconnect)
-        if self._sources:
-            self.commands[const.ATTR_SOURCE].init_values(CommandValues(self._sources))
-        if self._http_api:
-            await self.update_device_info()
+        """Await the initialization of the device.
+
+        The telnet connection and the HTTP device info requests are independent and
+        run concurrently; see startup_timings for the breakdown.  With a device_cache
+        the cached device info is used straight away and, if it has expired, it is
+        refreshed in the background.  With a state_cache the last known state is
+        loaded first, marked stale, and confirmed by a resync once connected.
+
+        Without telnet only the command table is loaded and, if there is an HTTP
+        API, the state is polled over HTTP instead.
+        """
+        start = time.perf_counter()
+        await self._load_state()
+        if self._telnet:
+            tasks = [
+                self._connection.init(
+                    auto_reconnect=auto_reconnect, reconnect_delay=reconnect_delay
+                )
+            ]
+        else:
+            tasks = [self._connection.init_command_table()]
+        if self._http_api and not await self._load_cached_device_info():
+            tasks.append(self.update_device_info())
+        # a connection made while the device info failed is still to be disconnected
+        disconnect, *results = await asyncio.gather(*tasks, return_exceptions=True)
+        if isinstance(disconnect, BaseException):
+            raise disconnect
+        if disconnect:
+            self._connections.append(disconnect)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        self._init_sources()
         if self.zones >= 1:
             self._main_zone = self._zone_main_class(self)
         if self.zones >= 2:
@@ -67,6 +130,14 @@ class AVReceiver:
             self._zone3 = self._zone_aux_class(self, zone="zone3")
         if self.zones >= 4:
             self._zone4 = self._zone_aux_class(self, zone="zone4")
+        await self._init_capabilities()
+        if not self._telnet and self._http_api and self._http_poller_class:
+            self._http_poller = self._http_poller_class(self, self._http_api)
+            await self._http_poller.start()
+            self._connections.append(self._http_poller.stop)
+        if self._telnet and self._stale:
+            self._warm_start_task = asyncio.create_task(self.resync())
+        self._timings["total"] = time.perf_counter() - start
 
     async def connect(
         self,
@@ -83,29 +154,255 @@ class AVReceiver:
 
     async def disconnect(self):
         """Disconnect from the audio/video receiver."""
+        for task in (self._device_info_task, self._warm_start_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._device_info_task, self._warm_start_task = None, None
+        if self._save_state_task:
+            self._save_state_task.cancel()
+            self._save_state_task = None
+            await self.save_state()
         while self._connections:
             disconnect = self._connections.pop()
             await disconnect()
+        if self._http_api:
+            await self._http_api.close()
 
     def update_state(self, state_update: dict) -> bool:
         """Handle a state update."""
         update = False
+        now = time.monotonic()
         for attr, val in state_update.items():
+            self._state_times[attr] = now
+            if attr in self._stale:
+                self._stale.discard(attr)
+            elif attr in self._state and self._state[attr] != val:
+                self._change_counts[attr] += 1
             if attr not in self._state or self._state[attr] != val:
                 self._state[attr] = val
                 update = True
+        if update and self._state_cache and not self._save_state_task:
+            self._save_state_task = asyncio.create_task(self._save_state_later())
         return update
 
+    async def save_state(self) -> None:
+        """Save a snapshot of the state to the state cache."""
+        if not self._state_cache:
+            return
+        self._state_cache.set(f"state/{self._host}", dict(self._state))
+        await self._state_cache.async_save()
+
+    async def _save_state_later(self) -> None:
+        """Save the state once the changes of DEFAULT_STATE_SAVE_DELAY are batched."""
+        await asyncio.sleep(const.DEFAULT_STATE_SAVE_DELAY)
+        self._save_state_task = None  # changes made while saving are saved again
+        await self.save_state()
+
+    async def _load_state(self) -> None:
+        """Load the last known state from the state cache, marked stale."""
+        if not self._state_cache:
+            return
+        await self._state_cache.async_load()
+        if snapshot := self._state_cache.get(f"state/{self._host}"):
+            self._state.update(snapshot)
+            self._stale = set(snapshot)
+
+    async def resync(self) -> None:
+        """Refresh the state, eg. after a reconnect, the attributes that matter first.
+
+        The power, volume and source of every zone are refreshed at once.  The
+        rest of the state is likely still correct, so it is refreshed lazily in
+        small batches, the attributes that change most often first, rather than
+        in one burst of queries.
+        """
+        await self.resync_priority()
+        await self.resync_rest()
+
+    async def resync_priority(self) -> None:
+        """Refresh the power, volume and source of every zone at once."""
+        if not self._main_zone:
+            return
+        self._metrics["resyncs"] += 1
+        for plan in await self.update_many(self._resync_priority()):
+            self._metrics["resync_queries"] += plan.sent
+
+    async def resync_rest(self) -> None:
+        """Refresh the state not refreshed by resync_priority, in small batches."""
+        if not self._main_zone:
+            return
+        priority = self._resync_priority()
+        rest = self._connection.query_planner.plan(
+            [name for name in self.commands if name not in priority],
+            self._capabilities.unsupported,
+        )
+        queries = sorted(
+            rest.queries.values(),
+            key=lambda names: max(self._change_counts[name] for name in names),
+            reverse=True,
+        )
+        for i in range(0, len(queries), const.DEFAULT_RESYNC_BATCH):
+            await asyncio.sleep(const.DEFAULT_RESYNC_INTERVAL)
+            batch = queries[i : i + const.DEFAULT_RESYNC_BATCH]
+            for plan in await self.update_many(
+                [name for names in batch for name in names]
+            ):
+                self._metrics["resync_queries"] += plan.sent
+
+    def _resync_priority(self) -> List[str]:
+        """Get the names of the attributes that a resync refreshes first."""
+        priority = [
+            f"{prefix}{attr}"
+            for name, prefix in const.ZONE_PREFIX.items()
+            if getattr(self, name)
+            for attr in const.RESYNC_PRIORITY
+        ]
+        return [name for name in priority if name in self.commands]
+
+    async def update_many(self, names: Iterable[str]) -> List[QueryPlan]:
+        """Update the attributes of names, of any zone, with the fewest queries."""
+        names = list(names)
+        zones = [
+            zone
+            for zone in (self._main_zone, self._zone2, self._zone3, self._zone4)
+            if zone
+        ]
+        return await asyncio.gather(
+            *(
+                zone.update_many([name for name in names if name in zone.commands])
+                for zone in zones
+                if any(name in zone.commands for name in names)
+            )
+        )
+
+    def state_age(self, attr: str) -> Optional[float]:
+        """Get the seconds since the device last reported attr, if ever."""
+        if (reported := self._state_times.get(attr)) is None:
+            return None
+        return time.monotonic() - reported
+
     async def update_device_info(self):
         """Update information about the A/V Receiver."""
-        self._device_info = await self._http_api.get_device_info()
-        self._sources = await self._http_api.get_source_names()
+        self._device_info, self._sources = await asyncio.gather(
+            timed(self._http_api.get_device_info(), self._timings, "device_info"),
+            timed(self._http_api.get_source_names(), self._timings, "source_names"),
+        )
+        if self._device_cache:
+            key = self.serial_number or self.mac or self._host
+            self._device_cache.set(
+                key,
+                {"device_info": dict(self._device_info), "sources": self._sources},
+                host=self._host,
+            )
+            await self._device_cache.async_save()
+
+    async def _load_cached_device_info(self) -> bool:
+        """Use cached device info, refreshing it in the background if expired."""
+        if not self._device_cache:
+            return False
+        await self._device_cache.async_load()
+        if not (cached := self._device_cache.get(self._host)):
+            return False
+        self._device_info = cached["device_info"]
+        self._sources = cached["sources"]
+        if not self._device_cache.is_fresh(self._host):
+            self._device_info_task = asyncio.create_task(self._refresh_device_info())
+        return True
+
+    async def _init_capabilities(self) -> None:
+        """Load the capabilities of the model and seed them from the device info."""
+        if self._device_cache and (key := self._capabilities_key):
+            await self._device_cache.async_load()
+            self._capabilities = Capabilities.from_dict(self._device_cache.get(key))
+        self._capabilities.seed(self.zones, self.commands)
+
+    async def save_capabilities(self) -> None:
+        """Save the capabilities to the device cache if they changed."""
+        if not self._capabilities.pop_changed():
+            return
+        if self._device_cache and (key := self._capabilities_key):
+            self._device_cache.set(key, self._capabilities.as_dict())
+            await self._device_cache.async_save()
+
+    @property
+    def _capabilities_key(self) -> Optional[str]:
+        """Get the device cache key of the capabilities, by model or serial number.
+
+        The API version is part of the key so that a firmware update that changes
+        it probes the capabilities again.
+        """
+        if not (identity := self.model or self.serial_number):
+            return None
+        api_version = self._device_info.get(const.INFO_API_VERSION) or ""
+        return f"capabilities/{identity}/{api_version}"
+
+    async def _refresh_device_info(self):
+        """Update the device info and the source command values."""
+        # pylint: disable=broad-except
+        try:
+            await self.update_device_info()
+        except Exception as err:
+            _LOGGER.debug("Failed to refresh device info of %s: %s", self._host, err)
+            return
+        if self._connection.commands:
+            self._init_sources()
+
+    def _init_sources(self):
+        """Init the source command values with the input sources map."""
+        if self._sources:
+            self.commands[const.ATTR_SOURCE].init_values(CommandValues(self._sources))
+
+    @property
+    def admission(self) -> Optional[AdmissionController]:
+        """Get the controller shared by receivers to reconnect and resync, if any."""
+        return self._admission
+
+    @property
+    def capabilities(self) -> Capabilities:
+        """Get the command groups the model supports."""
+        return self._capabilities
+
+    @property
+    def device_cache(self) -> FileCache:
+        """Get the device info cache, if any."""
+        return self._device_cache
+
+    @property
+    def elide_max_age(self) -> Optional[float]:
+        """Get the max age of state that a redundant command is elided against.
+
+        None disables elision.
+        """
+        return self._elide_max_age
+
+    @elide_max_age.setter
+    def elide_max_age(self, max_age: Optional[float]) -> None:
+        """Set the max age of state that a redundant command is elided against."""
+        self._elide_max_age = max_age
 
     @property
     def dispatcher(self) -> Dispatcher:
         """Get the dispatcher instance."""
         return self._dispatcher
 
+    @property
+    def stale(self) -> Set[str]:
+        """Get the attributes loaded from the state cache and not yet confirmed."""
+        return self._stale
+
+    @property
+    def state_cache(self) -> FileCache:
+        """Get the state cache, if any."""
+        return self._state_cache
+
+    @property
+    def change_counts(self) -> Counter:
+        """Get the number of times the device changed each attribute."""
+        return self._change_counts
+
     @property
     def commands(self) -> Dict[str, Command]:
         """Get the dict of commands."""
@@ -121,6 +418,16 @@ class AVReceiver:
         """Get the host."""
         return self._host
 
+    @property
+    def http_api(self) -> Optional[HTTPApi]:
+        """Get the HTTP API, if any."""
+        return self._http_api
+
+    @property
+    def http_poller(self) -> Optional[HTTPPoller]:
+        """Get the HTTP state poller, if polling instead of using telnet."""
+        return self._http_poller
+
     @property
     def friendly_name(self) -> str:
         """Get the friendly name."""
@@ -136,6 +443,11 @@ class AVReceiver:
         """Get the manufacturer."""
         return self._device_info.get(const.INFO_MANUFACTURER)
 
+    @property
+    def metrics(self) -> Counter:
+        """Get the counters of the receiver, eg. commands_elided."""
+        return self._metrics
+
     @property
     def model(self) -> str:
         """Get the model."""
@@ -156,6 +468,11 @@ class AVReceiver:
         """Get the input sources map."""
         return self._sources if self._sources else {}
 
+    @property
+    def startup_timings(self) -> Dict[str, float]:
+        """Get the seconds spent in each step of init."""
+        return {**self._connection.timings, **self._timings}
+
     @property
     def state(self) -> defaultdict:
         """Get the current state."""
@@ -1,5 +1,6 @@
 """Define the telnet message public interface."""
 from abc import ABC, abstractmethod
+from typing import Iterator, List
 
 
 class Message(ABC):
@@ -33,3 +34,49 @@ class Message(ABC):
     @abstractmethod
     def name(self) -> str:
         """Return the name. Maybe the same as command."""
+
+
+class MultiMessage:
+    """Define the messages that answer one query of a parameter family."""
+
+    __slots__ = ("_messages",)
+
+    def __init__(self):
+        """Init an empty answer."""
+        self._messages = []  # type: List[Message]
+
+    def __str__(self):
+        """Get the messages, one per line."""
+        return "\n".join(str(message) for message in self._messages)
+
+    def __repr__(self):
+        """Get readable messages."""
+        return f"{self.__class__.__name__}, messages: {self._messages}"
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def append(self, message: Message) -> None:
+        """Add a message to the answer."""
+        self._messages.append(message)
+
+    @property
+    def messages(self) -> List[Message]:
+        """Return the messages in the order received."""
+        return self._messages
+
+    @property
+    def groups(self) -> set:
+        """Return the groups of the messages."""
+        return {message.group for message in self._messages}
+
+    @property
+    def state_update(self) -> dict:
+        """Return the state update of all the messages."""
+        update = {}
+        for message in self._messages:
+            update.update(message.state_update)
+        return update
@@ -0,0 +1,77 @@
+"""Define the round trip time estimates that time the resends of commands."""
+from typing import Optional
+
+from pyavreceiver import const
+
+
+class RttEstimator:
+    """Estimate the retry timeout from the round trip times, like TCP (RFC 6298).
+
+    The smoothed round trip time and its variation are updated with each sample
+    and the retry timeout is their sum, srtt + 4 * rttvar, within bounds.  Until
+    the first sample the timeout is the initial one.  Only commands answered on
+    their first attempt are sampled, as the answer to a resent command could be
+    to either send.
+    """
+
+    __slots__ = ("_initial", "_minimum", "_maximum", "_srtt", "_rttvar", "_samples")
+
+    def __init__(
+        self,
+        initial: float = const.DEFAULT_TELNET_TIMEOUT,
+        *,
+        minimum: float = const.DEFAULT_MIN_RETRY_TIMEOUT,
+        maximum: float = const.DEFAULT_MAX_RETRY_TIMEOUT,
+    ):
+        """Init the estimator."""
+        self._initial = initial
+        self._minimum = minimum
+        self._maximum = maximum
+        self._srtt = None  # type: Optional[float]
+        self._rttvar = None  # type: Optional[float]
+        self._samples = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}, srtt: {self._srtt}, rttvar: {self._rttvar}, "
+            f"rto: {self.rto}, samples: {self._samples}"
+        )
+
+    def sample(self, rtt: float) -> None:
+        """Update the estimates with a round trip time in seconds."""
+        if self._srtt is None:
+            self._srtt = rtt
+            self._rttvar = rtt / 2
+        else:
+            self._rttvar = (1 - const.RTT_BETA) * self._rttvar + const.RTT_BETA * abs(
+                self._srtt - rtt
+            )
+            self._srtt = (1 - const.RTT_ALPHA) * self._srtt + const.RTT_ALPHA * rtt
+        self._samples += 1
+
+    def timeout(self, attempt: int = 1) -> float:
+        """Get the seconds to wait for an answer to attempt, backed off per resend."""
+        return min(self._maximum, self.rto * 2 ** max(0, attempt - 1))
+
+    @property
+    def rto(self) -> float:
+        """Get the retry timeout of a first attempt."""
+        if self._srtt is None:
+            return self._initial
+        rto = self._srtt + max(const.RTT_GRANULARITY, const.RTT_K * self._rttvar)
+        return min(self._maximum, max(self._minimum, rto))
+
+    @property
+    def srtt(self) -> Optional[float]:
+        """Get the smoothed round trip time, if sampled."""
+        return self._srtt
+
+    @property
+    def rttvar(self) -> Optional[float]:
+        """Get the round trip time variation, if sampled."""
+        return self._rttvar
+
+    @property
+    def samples(self) -> int:
+        """Get the number of samples."""
+        return self._samples
@@ -0,0 +1,126 @@
+"""Define scenes of settings applied to many zones of a receiver."""
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from pyavreceiver import const
+from pyavreceiver.command import Command
+from pyavreceiver.zone import Zone
+
+# Settings are applied in stages, each stage waits for the replies to the last
+# one: a zone ignores commands until it is on, and the available sound modes and
+# their settings depend on the source.  Volume is last so that it is not applied
+# to the previous source.  A command names its stage in the command table, eg.
+# ^stage in denon/commands.yaml, and is in the settings stage if it does not.
+STAGE_POWER = "power"
+STAGE_SOURCE = "source"
+STAGE_SOUND_MODE = "sound_mode"
+STAGE_SETTINGS = "settings"
+STAGE_VOLUME = "volume"
+STAGES = (STAGE_POWER, STAGE_SOURCE, STAGE_SOUND_MODE, STAGE_SETTINGS, STAGE_VOLUME)
+STAGE_QOS = {STAGE_POWER: 3}
+
+
+class SceneResult:
+    """Define the outcome of applying a scene."""
+
+    __slots__ = ("outcomes", "latency", "zone_latency")
+
+    def __init__(
+        self,
+        outcomes: Dict[str, Dict[str, bool]],
+        latency: float,
+        zone_latency: Dict[str, float],
+    ):
+        """Init the result."""
+        self.outcomes = outcomes
+        self.latency = latency
+        self.zone_latency = zone_latency
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}, success: {self.success}, "
+            f"latency: {self.latency:.3f}, outcomes: {self.outcomes}"
+        )
+
+    @property
+    def success(self) -> bool:
+        """Return True if every setting was applied."""
+        return all(all(zone.values()) for zone in self.outcomes.values())
+
+
+class Scene:
+    """Define settings for many zones, eg. a movie night.
+
+    Each zone applies its settings in dependency order, power then source then
+    sound mode then other settings then volume and mute, while the zones are
+    applied concurrently.  The settings of a stage are sent together and the
+    next stage starts as soon as the receiver has confirmed them.  If a zone is
+    turned off its power is applied last, and if it fails to turn on the rest of
+    its settings are not sent.
+    """
+
+    def __init__(self, settings: Dict[str, Dict[str, Any]]):
+        """Init the scene with settings by zone name, eg. "main" or "zone2"."""
+        for zone in settings:
+            if zone not in const.ZONE_PREFIX:
+                raise ValueError(f"Unknown zone: {zone}")
+        self._settings = settings
+
+    async def apply(self, avr) -> SceneResult:
+        """Apply the scene to the receiver."""
+        start = time.perf_counter()
+        names = list(self._settings)
+        results = await asyncio.gather(
+            *(
+                self._apply_zone(getattr(avr, name), self._settings[name])
+                for name in names
+            )
+        )
+        return SceneResult(
+            {name: outcomes for name, (outcomes, _) in zip(names, results)},
+            time.perf_counter() - start,
+            {name: latency for name, (_, latency) in zip(names, results)},
+        )
+
+    @staticmethod
+    async def _apply_zone(zone: Zone, settings: Dict[str, Any]) -> tuple:
+        """Apply the settings to zone and return the outcomes and latency."""
+        start = time.perf_counter()
+        if zone is None:
+            return dict.fromkeys(settings, False), 0.0
+        outcomes = {}
+        powered = True
+        for stage, stage_settings in plan(settings, zone.commands, zone.prefix):
+            if not powered:
+                outcomes.update(dict.fromkeys(stage_settings, False))
+                continue
+            stage_outcomes = await zone.set_many(
+                stage_settings, qos=STAGE_QOS.get(stage, 2)
+            )
+            outcomes.update(stage_outcomes)
+            if stage == STAGE_POWER:
+                powered = all(stage_outcomes.values())
+        return {name: outcomes[name] for name in settings}, time.perf_counter() - start
+
+    @property
+    def settings(self) -> Dict[str, Dict[str, Any]]:
+        """Get the settings by zone name."""
+        return self._settings
+
+
+def plan(
+    settings: Dict[str, Any], commands: Dict[str, Command], prefix: str = ""
+) -> List[tuple]:
+    """Return the (stage, settings) to apply in order, skipping empty stages.
+
+    The stage of a setting is that of its command, found by prefix + name.
+    """
+    staged = {stage: {} for stage in STAGES}
+    for name, val in settings.items():
+        command = commands.get(prefix + name)
+        staged[getattr(command, "stage", None) or STAGE_SETTINGS][name] = val
+    order = list(STAGES)
+    if staged[STAGE_POWER] and not any(staged[STAGE_POWER].values()):
+        order.append(order.pop(0))  # turning off, so power goes last
+    return [(stage, staged[stage]) for stage in order if staged[stage]]
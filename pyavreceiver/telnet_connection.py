@@ -1,18 +1,28 @@
 """Define persistent connection to an AV Receiver."""
 import asyncio
+import copy
 import logging
+import random
+import socket
+import time
 from abc import ABC, abstractmethod
 from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Coroutine, Dict, Optional, Tuple
+from functools import partial
+from typing import Awaitable, Dict, List, Optional, Tuple
 
 import telnetlib3
 
 from pyavreceiver import const
 from pyavreceiver.command import TelnetCommand
-from pyavreceiver.functions import none
+from pyavreceiver.error import AVReceiverNotConnectedError
+from pyavreceiver.functions import none, timed
+from pyavreceiver.pacing import AdaptivePacer
 from pyavreceiver.priority_queue import PriorityQueue
-from pyavreceiver.response import Message
+from pyavreceiver.query_planner import QueryPlanner
+from pyavreceiver.response import Message, MultiMessage
+from pyavreceiver.rtt import RttEstimator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +41,10 @@ class TelnetConnection(ABC):
         port: int = const.CLI_PORT,
         timeout: float = const.DEFAULT_TIMEOUT,
         heart_beat: Optional[float] = const.DEFAULT_HEART_BEAT,
+        heart_beat_timeout: float = const.DEFAULT_HEART_BEAT_TIMEOUT,
+        offline_policy: str = const.OFFLINE_DROP,
+        offline_ttl: float = const.DEFAULT_OFFLINE_TTL,
+        group_rtt: bool = False,
     ):
         """Init the connection."""
         self._avr = avr
@@ -38,25 +52,43 @@ class TelnetConnection(ABC):
         self.port = port
         self._command_dict = {}
         self._command_lookup = {}
-        self._command_timeout = const.DEFAULT_TELNET_TIMEOUT
+        self._rtt = RttEstimator()
+        self._group_rtts = {}  # type: Dict[str, RttEstimator]
+        self.group_rtt = group_rtt  # type: bool
         self._learned_commands = {}
+        self._relative_targets = {}  # name: (target, monotonic time queued)
+        self._query_planner = QueryPlanner()
+        self._last_answer = None  # (query group, monotonic time answered)
+        self._suppressed_queries = set()  # names of queries held until power on
+        self._catch_up_task = None  # type: asyncio.Task
+        self._resync_task = None  # type: asyncio.Task
+        self.offline_policy = offline_policy  # type: str
+        self.offline_ttl = offline_ttl  # type: float
+        # group: (latest command, futures of its outcome, expiry handle)
+        self._offline_buffer = OrderedDict()
         self.timeout = timeout  # type: int
         self._reader = None  # type: telnetlib3.TelnetReader
         self._writer = None  # type: telnetlib3.TelnetWriter
         self._response_handler_task = None  # type: asyncio.Task
         self._command_queue = PriorityQueue()
         self._command_queue_task = None  # type: asyncio.Task
+        self._queue_ready = asyncio.Event()  # set when a command is pushed
         self._expected_responses = ExpectedResponseQueue()
         self._sequence = 0  # type: int
         self._state = const.STATE_DISCONNECTED  # type: str
         self._auto_reconnect = True  # type: bool
         self._reconnect_delay = const.DEFAULT_RECONNECT_DELAY  # type: float
         self._reconnect_task = None  # type: asyncio.Task
-        self._last_activity = datetime(1970, 1, 1)  # type: datetime
+        self._last_activity = 0.0  # monotonic time a message was last received
         self._last_command_time = datetime(2020, 1, 1)  # type: datetime
         self._heart_beat_interval = heart_beat  # type: Optional[float]
+        self.heart_beat_timeout = heart_beat_timeout  # type: float
         self._heart_beat_task = None  # type: asyncio.Task
-        self._message_interval_limit = const.DEFAULT_MESSAGE_INTERVAL_LIMIT
+        self._probe_handle = None  # type: asyncio.TimerHandle
+        self._pacer = AdaptivePacer(const.DEFAULT_MESSAGE_INTERVAL_LIMIT)
+        self._command_table_ready = asyncio.Event()
+        self._shared_lookup = None  # type: dict
+        self._timings = {}
 
     @abstractmethod
     def _load_command_dict(self, path=None):
@@ -70,27 +102,82 @@ class TelnetConnection(ABC):
     async def _response_handler(self):
         """Handle messages received from the device."""
 
+    @abstractmethod
+    def make_message(self, message: str) -> Message:
+        """Create the Message of a line received from, or sent to, the device."""
+
     def _heartbeat_command(self):
+        """Send the heartbeat probe now, ahead of any queued command."""
         command = self._command_lookup[const.ATTR_POWER].set_query()
-        self.send_command(command, heartbeat=True)
+        self._writer.write(command.message)
+        self._last_command_time = datetime.utcnow()
 
     async def init(self, *, auto_reconnect: bool = True, reconnect_delay: float = -1):
-        """Await the async initialization."""
-        self._load_command_dict()
-        await self.connect(
-            auto_reconnect=auto_reconnect, reconnect_delay=reconnect_delay
+        """Await the async initialization.
+
+        The command table is loaded in an executor while the connection is opened.
+        Messages received before the table is ready wait in the reader buffer.
+        """
+        await asyncio.gather(
+            timed(self._load_command_table(), self._timings, "command_table"),
+            timed(
+                self.connect(
+                    auto_reconnect=auto_reconnect, reconnect_delay=reconnect_delay
+                ),
+                self._timings,
+                "telnet_connect",
+            ),
         )
-        self._command_lookup = self._get_command_lookup(self._command_dict)
+        await timed(self._build_command_lookup(), self._timings, "command_lookup")
         return self.disconnect
 
+    async def init_command_table(self):
+        """Load the command table without connecting, eg. when polling HTTP."""
+        await timed(self._load_command_table(), self._timings, "command_table")
+        await timed(self._build_command_lookup(), self._timings, "command_lookup")
+
+    async def read_command_table(self) -> Tuple[dict, dict]:
+        """Load the command table and return it with a lookup built from it."""
+        await self._load_command_table()
+        return self._command_dict, self._get_command_lookup(self._command_dict)
+
+    def share_command_table(self, command_dict: dict, command_lookup: dict) -> None:
+        """Use a command table read by another connection of the same class.
+
+        The table is then neither loaded nor parsed again; the commands of the
+        lookup are copied, so that per receiver values, eg. the source names, are
+        not shared.
+        """
+        self._command_dict = command_dict
+        self._shared_lookup = command_lookup
+
+    async def _load_command_table(self):
+        """Load the command table in an executor, unless it is shared."""
+        if self._shared_lookup is None:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._load_command_dict
+            )
+
+    async def _build_command_lookup(self):
+        """Create the command lookup and release the response handler."""
+        if self._shared_lookup is not None:
+            self._command_lookup = {
+                name: copy.copy(command)
+                for name, command in self._shared_lookup.items()
+            }
+        else:
+            self._command_lookup = self._get_command_lookup(self._command_dict)
+        self._query_planner.load(self._command_lookup)
+        self._command_table_ready.set()
+
     async def connect(
         self, *, auto_reconnect: bool = False, reconnect_delay: float = -1
     ):
         """Connect to the AV Receiver - called by init only."""
         if self._state == const.STATE_CONNECTED:
             return
-        if reconnect_delay < 0:
-            reconnect_delay = self._reconnect_delay
+        if reconnect_delay >= 0:
+            self._reconnect_delay = reconnect_delay
         self._auto_reconnect = False
         await self._connect()
         self._auto_reconnect = auto_reconnect
@@ -104,7 +191,8 @@ class TelnetConnection(ABC):
             )
         except Exception as error:
             raise error from error
-        self._response_handler_task = asyncio.create_task(self._response_handler())
+        _enable_keepalive(self._writer.get_extra_info("socket"))
+        self._response_handler_task = asyncio.create_task(self._run_response_handler())
         self._state = const.STATE_CONNECTED
         self._command_queue_task = asyncio.create_task(self._process_command_queue())
         if self._heart_beat_interval is not None and self._heart_beat_interval > 0:
@@ -112,9 +200,17 @@ class TelnetConnection(ABC):
 
         _LOGGER.debug("Connected to %s", self.host)
         self._avr.dispatcher.send(const.SIGNAL_TELNET_EVENT, const.EVENT_CONNECTED)
+        self._replay_offline()
+
+    async def _run_response_handler(self):
+        """Run the response handler once the command table is ready."""
+        await self._command_table_ready.wait()
+        await self._response_handler()
 
     async def disconnect(self):
-        """Disconnect from the AV Receiver."""
+        """Disconnect from the AV Receiver, discarding the commands buffered offline."""
+        for group in list(self._offline_buffer):
+            self._expire_offline(group, "offline_commands_discarded")
         if self._state == const.STATE_DISCONNECTED:
             return
         if self._reconnect_task:
@@ -129,6 +225,17 @@ class TelnetConnection(ABC):
 
     async def _disconnect(self):
         """Cancel response handler and pending tasks."""
+        for task in (self._catch_up_task, self._resync_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._catch_up_task, self._resync_task = None, None
+        if self._probe_handle:
+            self._probe_handle.cancel()
+            self._probe_handle = None
         if self._heart_beat_task:
             self._heart_beat_task.cancel()
             try:
@@ -174,77 +281,341 @@ class TelnetConnection(ABC):
         self._avr.dispatcher.send(const.SIGNAL_TELNET_EVENT, const.EVENT_DISCONNECTED)
 
     async def _reconnect(self):
-        """Perform core reconnection logic."""
+        """Perform core reconnection logic.
+
+        Failed attempts are retried after an exponential backoff with jitter, so
+        that receivers that lost their connections together do not retry in
+        lockstep, and each attempt waits for admission, see AdmissionController.
+        """
         # pylint: disable=broad-except
+        attempt = 0
         while self._state != const.STATE_CONNECTED:
             try:
-                await self._connect()
+                async with self._admit():
+                    await self._connect()
                 self._reconnect_task = None
+                self._avr.metrics["reconnects"] += 1
+                self._resync_task = asyncio.create_task(self._resync())
                 return
             except Exception as err:
                 # Occurs when we could not reconnect
                 _LOGGER.debug("Failed to reconnect to %s: %s", self.host, err)
+                self._avr.metrics["reconnect_failures"] += 1
                 await self._disconnect()
-                await asyncio.sleep(self._reconnect_delay)
+                await asyncio.sleep(self._reconnect_backoff(attempt))
+                attempt += 1
             except asyncio.CancelledError:
                 # Occurs when reconnect is cancelled via disconnect
                 return
 
+    def _reconnect_backoff(self, attempt: int) -> float:
+        """Get the seconds to wait after a failed attempt, with equal jitter."""
+        # the exponent is capped as a float overflows after ~1024 doublings
+        delay = min(
+            const.DEFAULT_RECONNECT_MAX_DELAY,
+            self._reconnect_delay * 2 ** min(attempt, 16),
+        )
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _admit(self):
+        """Get the context that admits the receiver to connect or resync."""
+        if admission := self._avr.admission:
+            return admission.admit()
+        return _admitted()
+
+    async def _resync(self) -> None:
+        """Resync the state that may have changed while disconnected.
+
+        Admission is held for the refresh of what matters first only, so that the
+        lazy rest does not keep other receivers from reconnecting.
+        """
+        try:
+            async with self._admit():
+                await self._avr.resync_priority()
+            await self._avr.resync_rest()
+        finally:
+            self._resync_task = None
+
     async def _heart_beat(self):
-        """Check for activity and send a heartbeat to check for connection."""
+        """Probe the connection while it is idle and fail it if it is dead.
+
+        Any message received counts as a heartbeat.  Once none has been received
+        for the heart beat interval, or since connecting, a probe is sent ahead of
+        queued commands, and the connection is failed if no message arrives within
+        heart_beat_timeout.
+        """
+        await self._command_table_ready.wait()
         while self._state == const.STATE_CONNECTED:
-            old_last_activity = self._last_activity
-            last_activity = datetime.utcnow() - self._last_activity
-            threshold = timedelta(seconds=self._heart_beat_interval)
-            if last_activity > threshold:
-                self._heartbeat_command()
-                await asyncio.sleep(5)
-                if self._last_activity <= old_last_activity:
-                    await self._handle_connection_error()
-            await asyncio.sleep(self._heart_beat_interval / 2)
-
-    def send_command(self, command: TelnetCommand, heartbeat=False):
-        """Execute a command."""
+            idle = time.monotonic() - self._last_activity
+            if idle < self._heart_beat_interval:
+                await asyncio.sleep(self._heart_beat_interval - idle)
+                continue
+            probed = time.monotonic()
+            self._heartbeat_command()
+            self._avr.metrics["heart_beats"] += 1
+            await asyncio.sleep(self.heart_beat_timeout)
+            if self._last_activity < probed:
+                self._avr.metrics["heart_beat_failures"] += 1
+                self._heart_beat_task = None  # not cancelled by the disconnect
+                await self._handle_connection_error("heart beat")
+                return
+
+    def probe(self, timeout: float = None) -> None:
+        """Send a heartbeat probe and fail the connection if it goes unanswered.
+
+        For receivers whose heartbeats are driven from outside, eg. by a
+        ReceiverFleet, rather than by a heart beat task of their own.  The
+        connection fails if no message arrives within timeout, by default
+        heart_beat_timeout.
+        """
+        if self._state != const.STATE_CONNECTED or self._probe_handle:
+            return
+        self._heartbeat_command()
+        self._avr.metrics["heart_beats"] += 1
+        self._probe_handle = asyncio.get_running_loop().call_later(
+            self.heart_beat_timeout if timeout is None else timeout,
+            self._check_probe,
+            time.monotonic(),
+        )
+
+    def _check_probe(self, probed: float) -> None:
+        """Fail the connection if no message arrived since the probe."""
+        self._probe_handle = None
+        if self._state == const.STATE_CONNECTED and self._last_activity < probed:
+            self._avr.metrics["heart_beat_failures"] += 1
+            asyncio.create_task(self._handle_connection_error("heart beat"))
+
+    def send_command(
+        self, command: TelnetCommand, heartbeat=False, ttl: float = None
+    ) -> None:
+        """Execute a command.
+
+        While not connected the command is handled by the offline policy, see
+        async_send_command.
+        """
         if not heartbeat and self._state != const.STATE_CONNECTED:
-            _LOGGER.debug(
-                "Command failed %s - Not connected to device %s",
-                command.message,
-                self.host,
-            )
+            self._offline(command, ttl)
+            return
+        if self._suppress(command):
             return
 
+        relative = command.name in const.RELATIVE_COMMANDS
+        if relative:
+            command = self._coalesce_relative(command)
         _LOGGER.debug("Command queued: %s", command.message)
-        self._command_queue.push(command)
+        status, _ = self._push_command(command)
+        if relative and status == const.QUEUE_CANCEL:
+            self._avr.metrics["relative_commands_coalesced"] += 1
 
-    def async_send_command(self, command: TelnetCommand) -> Coroutine:
-        """Execute an async command and return awaitable coroutine."""
+    def _offline(
+        self, command: TelnetCommand, ttl: float = None
+    ) -> Optional[asyncio.Future]:
+        """Apply the offline policy and return the future of a buffered command."""
+        metrics = self._avr.metrics
+        if self.offline_policy == const.OFFLINE_FAIL:
+            metrics["offline_commands_failed"] += 1
+            raise AVReceiverNotConnectedError(
+                f"Not connected to {self.host}: {command.message}"
+            )
+        if self.offline_policy != const.OFFLINE_BUFFER or command.is_query:
+            # a resync on connect refreshes the state that queries would
+            _LOGGER.debug("Command dropped, not connected: %s", command.message)
+            metrics["offline_commands_dropped"] += 1
+            return None
+        if command.name in const.RELATIVE_COMMANDS:
+            command = self._coalesce_relative(command)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        futures = [future]
+        if buffered := self._offline_buffer.pop(command.group, None):
+            _, replaced, handle = buffered
+            handle.cancel()
+            futures = replaced + futures
+            metrics["offline_commands_coalesced"] += 1
+        else:
+            metrics["offline_commands_buffered"] += 1
+        handle = loop.call_later(
+            self.offline_ttl if ttl is None else ttl,
+            self._expire_offline,
+            command.group,
+        )
+        _LOGGER.debug("Command buffered, not connected: %s", command.message)
+        self._offline_buffer[command.group] = (command, futures, handle)
+        return future
+
+    def _expire_offline(
+        self, group: str, metric: str = "offline_commands_expired"
+    ) -> None:
+        """Expire the command buffered for group once its ttl has run out.
+
+        Its awaitables resolve None.  A disconnect discards the buffered commands
+        the same way, counted under another metric.
+        """
+        _, futures, handle = self._offline_buffer.pop(group)
+        handle.cancel()
+        self._avr.metrics[metric] += 1
+        _resolve_futures(futures, None)
+
+    def _replay_offline(self) -> None:
+        """Send the commands buffered while not connected, in order."""
+        buffered, self._offline_buffer = self._offline_buffer, OrderedDict()
+        for command, futures, handle in buffered.values():
+            handle.cancel()
+            self._avr.metrics["offline_commands_replayed"] += 1
+            task = asyncio.ensure_future(self.async_send_command(command))
+            task.add_done_callback(partial(_resolve_replayed, futures))
+
+    def pending(self, command: TelnetCommand) -> bool:
+        """Return True if a command of the group of command is yet to take effect.
+
+        It is queued, buffered while offline or sent and waiting for its reply.
+        """
+        return (
+            command.group in self._command_queue
+            or command.group in self._offline_buffer
+            or bool(self._expected_responses.get(command.reply_group))
+        )
+
+    def answerable(self, command: TelnetCommand) -> bool:
+        """Return False if the device will not answer the query in its power state.
+
+        In standby a receiver answers the power queries and little else, and a
+        zone that is off does not answer the queries of its settings.
+        """
+        if command.standby:
+            return True
+        state = self._avr.state
+        if state.get(const.ATTR_POWER) is False:
+            return False
+        for zone, prefix in const.ZONE_PREFIX.items():
+            if prefix and command.name.startswith(prefix):
+                break
+        else:
+            zone = "main"
+        return state.get(const.ZONE_POWER.get(zone)) is not False
+
+    def _suppress(self, command: TelnetCommand) -> bool:
+        """Return True if command is a query to hold until power on."""
+        if not command.is_query or self.answerable(command):
+            return False
+        _LOGGER.debug("Query suppressed in standby: %s", command.message)
+        self._suppressed_queries.add(command.name)
+        self._avr.metrics["queries_suppressed"] += 1
+        return True
+
+    def _observe_power(self, state_update: dict) -> None:
+        """Catch up on the suppressed queries when power on is observed."""
+        if not self._suppressed_queries or self._catch_up_task:
+            return
+        state = self._avr.state
+        for attr in (const.ATTR_POWER, *const.ZONE_POWER.values()):
+            if state_update.get(attr) is True and state.get(attr) is not True:
+                self._catch_up_task = asyncio.create_task(self._catch_up())
+                return
+
+    async def _catch_up(self) -> None:
+        """Refresh, once, the queries that were suppressed while powered off."""
+        try:
+            await asyncio.sleep(const.DEFAULT_CATCH_UP_DELAY)
+            names, self._suppressed_queries = self._suppressed_queries, set()
+            self._avr.metrics["catch_up_refreshes"] += 1
+            await self._avr.update_many(names)
+        finally:
+            self._catch_up_task = None
+
+    def _coalesce_relative(self, command: TelnetCommand) -> TelnetCommand:
+        """Return the absolute command with the net effect of a relative command.
+
+        The step is applied to a queued absolute command, else to the last target
+        queued unless the device has reported the value since, else to the known
+        value.  Steps in a burst overwrite the same queued absolute command, so
+        they cost one message.  The relative command is returned if the value is
+        unknown.
+        """
+        name, direction = const.RELATIVE_COMMANDS[command.name]
+        if not (absolute := self._command_lookup.get(name)):
+            return command
+        qos = command.qos
+        current = self._avr.state.get(name)
+        queued = self._command_queue.get(absolute.group)
+        if queued is not None and queued.name == name:
+            current, qos = queued.val, queued.qos
+        elif name in self._relative_targets:
+            target, queued = self._relative_targets[name]
+            age = self._avr.state_age(name)
+            if age is None or time.monotonic() - age < queued:
+                current = target
+        if not isinstance(current, (int, float)) or isinstance(current, bool):
+            return command
+        target = current + direction * const.DEFAULT_STEP / 10
+        values = absolute.values
+        if (minimum := values.get("min")) is not None:
+            target = max(target, minimum)
+        if (maximum := self._avr.state.get(f"max_{name}")) is None:
+            maximum = values.get("max")
+        if isinstance(maximum, (int, float)):
+            target = min(target, maximum)
+        self._relative_targets[name] = (target, time.monotonic())
+        return absolute.set_val(target, qos=qos)
+
+    def async_send_command(
+        self, command: TelnetCommand, ttl: float = None
+    ) -> Awaitable:
+        """Execute an async command and return awaitable coroutine.
+
+        While not connected the offline policy applies: with OFFLINE_DROP the
+        awaitable resolves None at once, with OFFLINE_FAIL AVReceiverNotConnectedError
+        is raised and with OFFLINE_BUFFER the command is held for ttl seconds, by
+        default offline_ttl, and the awaitable resolves when it is replayed on
+        connect, or None if it expires first.  A buffered command replaces the one
+        of its group, whose awaitable resolves with the replacement.
+        """
         _LOGGER.debug("queueing command: %s", command.message)
+        if self._state != const.STATE_CONNECTED:
+            future = self._offline(command, ttl)
+            return none() if future is None else future
+        if self._suppress(command):
+            return none()
         # Give command a unique sequence id and increment
         command.set_sequence(self._sequence)
         self._sequence += 1
         # Push command onto queue
-        status, cancel = self._command_queue.push(command)
+        status, cancel = self._push_command(command)
         # Determine the type of awaitable response to return
         if status == const.QUEUE_FAILED:
             _LOGGER.debug("Command not queued: %s", command.message)
             return cancel.wait()
         if status == const.QUEUE_CANCEL:
             try:
-                _LOGGER.debug("Command overwritten: %s", command.message)
-                self._expected_responses[cancel].overwrite_command(command)
-                return self._expected_responses[cancel].wait()
+                expected_response = self._expected_responses[cancel]
             except KeyError:
-                # Can happen when a query returns multiple responses to one query
-                _LOGGER.debug("Command already resolved: %s", command.message)
-                return none()
+                # The overwritten command was not awaited, eg. the QoS 0 query sent
+                # with a resend, or was already resolved, so the command is queued
+                # in its place and awaited like a new one
+                status = const.QUEUE_NO_CANCEL
+            else:
+                _LOGGER.debug("Command overwritten: %s", command.message)
+                expected_response.overwrite_command(command)
+                return expected_response.wait()
         if status == const.QUEUE_NO_CANCEL:
             _LOGGER.debug("Command queued: %s", command.message)
-            self._expected_responses[command] = ExpectedResponse(command, self)
+            response_class = (
+                MultiExpectedResponse if command.is_multi else ExpectedResponse
+            )
+            self._expected_responses[command] = response_class(command, self)
             return self._expected_responses[command].wait()
 
     def resend_command(self, expected_response: "ExpectedResponse") -> None:
-        """Resend a command that was not responded to."""
-        status, cancel = self._command_queue.push(expected_response.command)
+        """Resend a command that was not responded to.
+
+        A command of a group that the device has answered before was dropped, so
+        the pacing backs off.
+        """
+        self._avr.metrics["commands_resent"] += 1
+        if expected_response.command.group in self._avr.capabilities.supported:
+            self._pacer.dropped()
+            self._avr.metrics["pacing_backoffs"] += 1
+        status, cancel = self._push_command(expected_response.command)
         if status == const.QUEUE_FAILED:
             # A resend at higher qos was already sent
             # This shouldn't happen
@@ -254,7 +625,7 @@ class TelnetConnection(ABC):
         if status == const.QUEUE_CANCEL:
             # The resend will overwrite a queued command, set that commands response to
             # trigger on resolution of this command
-            self._expected_responses[cancel] = self
+            self._expected_responses[cancel] = expected_response
             _LOGGER.debug(
                 "QoS requeueing command: %s", expected_response.command.message
             )
@@ -264,16 +635,24 @@ class TelnetConnection(ABC):
                 "QoS requeueing command: %s", expected_response.command.message
             )
 
+    def _push_command(self, command: TelnetCommand) -> Tuple[str, TelnetCommand]:
+        """Push a command onto the queue and wake the queue processor."""
+        result = self._command_queue.push(command)
+        self._queue_ready.set()
+        return result
+
     async def _process_command_queue(self):
+        """Send the queued commands, paced; wait for a push while it is empty."""
         while True:
-            wait_time = const.DEFAULT_QUEUE_INTERVAL
             if self._command_queue.is_empty:
-                await asyncio.sleep(wait_time)
+                self._queue_ready.clear()
+                await self._queue_ready.wait()
                 continue
             try:
                 time_since_last_command = datetime.utcnow() - self._last_command_time
-                threshold = timedelta(seconds=self._message_interval_limit)
-                wait_time = self._message_interval_limit
+                interval = self._pacer.interval
+                threshold = timedelta(seconds=interval)
+                wait_time = interval
                 if (time_since_last_command > threshold) and (
                     command := self._command_queue.popcommand()
                 ):
@@ -281,18 +660,16 @@ class TelnetConnection(ABC):
                     # Send command message
                     self._writer.write(command.message)
                     await self._writer.drain()
+                    if command.is_query:
+                        self._avr.metrics["queries_sent"] += 1
                     # Record time sent and update the expected response
                     self._last_command_time = datetime.utcnow()
                     try:
-                        self._expected_responses[command].set_sent(
-                            self._last_command_time
-                        )
+                        self._expected_responses[command].set_sent()
                     except KeyError:
                         # QoS 0 command
                         pass
-                    wait_time = (
-                        self._message_interval_limit + const.DEFAULT_QUEUE_INTERVAL
-                    )
+                    wait_time = interval + const.DEFAULT_QUEUE_INTERVAL
                 else:
                     wait_time = (
                         threshold.total_seconds()
@@ -304,31 +681,164 @@ class TelnetConnection(ABC):
             except Exception as err:
                 # TODO: error handling
                 _LOGGER.critical(Exception(err))
-                await asyncio.sleep(self._message_interval_limit)
+                await asyncio.sleep(self._pacer.interval)
 
     def _handle_event(self, resp: Message):
         """Handle a response event."""
         if resp.state_update == {}:
             _LOGGER.debug("No state update in message: %s", resp.message)
+        self._avr.capabilities.seen(resp.group)
+        self._observe_power(resp.state_update)
         if self._avr.update_state(resp.state_update):
             self._avr.dispatcher.send(const.SIGNAL_STATE_UPDATE, resp.message)
             _LOGGER.debug("Event received: %s", resp.state_update)
+        matched = False
+        if expected_response := self._expected_responses.match_multi(resp.group):
+            expected_response.set(resp)
+            matched = True
         if expected_response_items := self._expected_responses.popmatch(resp.group):
-            _, expected_response = expected_response_items
+            command, expected_response = expected_response_items
+            if (latency := expected_response.latency) is not None:
+                self._pacer.answered(latency)
+                self._sample_rtt(command.group, latency)
             expected_response.set(resp)
-        else:
+            if command.is_query:
+                self._last_answer = (command.group, time.monotonic())
+        elif not matched:
             _LOGGER.debug("No expected response matched: %s", resp.group)
+            self._observe_answer(resp.group)
+
+    def _sample_rtt(self, group: str, rtt: float) -> None:
+        """Update the round trip time estimates and their metrics."""
+        self._rtt.sample(rtt)
+        if self.group_rtt:
+            self._group_rtts.setdefault(group, RttEstimator()).sample(rtt)
+        metrics = self._avr.metrics
+        metrics["rtt_samples"] += 1
+        metrics["srtt"] = self._rtt.srtt
+        metrics["rttvar"] = self._rtt.rttvar
+        metrics["rto"] = self._rtt.rto
+
+    def retry_timeout(self, group: str, attempt: int = 1) -> float:
+        """Get the seconds to wait for an answer to attempt of a command of group.
+
+        With group_rtt, a group answered often enough has its own estimate.
+        """
+        estimator = self._group_rtts.get(group)
+        if (
+            not self.group_rtt
+            or estimator is None
+            or estimator.samples < const.DEFAULT_GROUP_RTT_SAMPLES
+        ):
+            estimator = self._rtt
+        return estimator.timeout(attempt)
+
+    def _observe_answer(self, group: str) -> None:
+        """Teach the query planner that the last query answered also group."""
+        if not self._last_answer:
+            return
+        query_group, answered = self._last_answer
+        if time.monotonic() - answered > const.DEFAULT_MULTI_RESPONSE_WINDOW:
+            return
+        if group != query_group:
+            self._query_planner.observe(query_group, group)
+
+    @property
+    def command_dict(self) -> dict:
+        """Get the command table as loaded."""
+        return self._command_dict
+
+    @property
+    def query_planner(self) -> QueryPlanner:
+        """Get the planner of the queries that update attributes."""
+        return self._query_planner
 
     @property
     def commands(self) -> dict:
         """Get the dict of commands."""
         return self._command_lookup
 
+    @property
+    def message_interval_limit(self) -> float:
+        """Get the minimum seconds between messages sent to the device.
+
+        The interval adapts to the device, see pacer.
+        """
+        return self._pacer.interval
+
+    @property
+    def rtt(self) -> RttEstimator:
+        """Get the round trip time estimates of the connection."""
+        return self._rtt
+
+    @property
+    def group_rtts(self) -> Dict[str, RttEstimator]:
+        """Get the round trip time estimates of each group, with group_rtt."""
+        return self._group_rtts
+
+    @property
+    def pacer(self) -> AdaptivePacer:
+        """Get the pacer of the messages sent to the device."""
+        return self._pacer
+
+    @pacer.setter
+    def pacer(self, pacer: AdaptivePacer) -> None:
+        """Set the pacer, eg. with equal bounds to fix the interval."""
+        self._pacer = pacer
+
+    @property
+    def idle(self) -> float:
+        """Get the seconds since a message was last received."""
+        return time.monotonic() - self._last_activity
+
     @property
     def state(self) -> str:
         """Get the current state of the connection."""
         return self._state
 
+    @property
+    def timings(self) -> dict:
+        """Get the seconds spent in each step of init."""
+        return self._timings
+
+
+@asynccontextmanager
+async def _admitted():
+    """Admit at once, without an admission controller."""
+    yield
+
+
+def _enable_keepalive(sock: Optional[socket.socket]) -> None:
+    """Enable TCP keepalive, so the OS closes a socket to a vanished peer.
+
+    The options that tune it are set where the platform has them.
+    """
+    if sock is None:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in (
+        ("TCP_KEEPIDLE", const.DEFAULT_KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", const.DEFAULT_KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT", const.DEFAULT_KEEPALIVE_COUNT),
+    ):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+def _resolve_futures(futures: List[asyncio.Future], result) -> None:
+    """Set the result of the futures that are not done."""
+    for future in futures:
+        if not future.done():
+            future.set_result(result)
+
+
+def _resolve_replayed(futures: List[asyncio.Future], task: asyncio.Task) -> None:
+    """Resolve the futures of a buffered command with its replayed outcome."""
+    if task.cancelled() or task.exception():
+        _resolve_futures(futures, None)
+    else:
+        _resolve_futures(futures, task.result())
+
 
 class ExpectedResponse:
     """Define an awaitable command event response."""
@@ -336,7 +846,6 @@ class ExpectedResponse:
     __slots__ = (
         "_attempts",
         "_command",
-        "_command_timeout",
         "_connection",
         "_event",
         "_expire_task",
@@ -349,7 +858,6 @@ class ExpectedResponse:
         """Init a new instance of the CommandEvent."""
         self._attempts = 0
         self._command = command
-        self._command_timeout = const.DEFAULT_TELNET_TIMEOUT
         self._connection = connection
         self._event = asyncio.Event()
         self._expire_task = None  # type: asyncio.Task
@@ -399,7 +907,7 @@ class ExpectedResponse:
         self._response = message
         self._event.set()
 
-    def set_sent(self, time=datetime.utcnow()) -> None:
+    def set_sent(self) -> None:
         """Set the time that the command was sent."""
         if not self._expire_task:
             self._expire_task = asyncio.create_task(self._expire())
@@ -409,11 +917,13 @@ class ExpectedResponse:
         if self._attempts == 0:
             self._command.raise_qos()  # prioritize resends
         self._attempts += 1
-        self._time_sent = time
+        self._time_sent = time.monotonic()
         self._qos_task = asyncio.create_task(self._resend_command())
 
     async def _resend_command(self) -> None:
-        await asyncio.sleep(self._command_timeout)
+        await asyncio.sleep(
+            self._connection.retry_timeout(self._command.group, self._attempts)
+        )
         if self._attempts <= self._command.retries:
             self._connection.resend_command(self)
         else:
@@ -429,23 +939,97 @@ class ExpectedResponse:
         """Get the command that represents this event."""
         return self._command
 
+    @property
+    def latency(self) -> Optional[float]:
+        """Get the seconds since the command was sent, if sent exactly once.
+
+        The answer to a resent command is ambiguous, so it has no latency.
+        """
+        if self._attempts != 1 or self._time_sent is None:
+            return None
+        return time.monotonic() - self._time_sent
+
+
+class MultiExpectedResponse(ExpectedResponse):
+    """Define an awaitable response made of many messages, eg. to CV?.
+
+    Messages are gathered until the end message, or a message of every expected
+    group, or a quiet window without messages, whichever comes first.
+    """
+
+    __slots__ = ("_messages", "_quiet_task")
+
+    def __init__(self, command: TelnetCommand, connection: TelnetConnection):
+        """Init a new instance of the multi-message response."""
+        super().__init__(command, connection)
+        self._messages = MultiMessage()
+        self._quiet_task = None  # type: asyncio.Task
+
+    async def cancel_tasks(self) -> None:
+        """Cancel the QoS, expire and quiet window tasks."""
+        if self._quiet_task:
+            self._quiet_task.cancel()
+            try:
+                await self._quiet_task
+            except asyncio.CancelledError:
+                pass
+            self._quiet_task = None
+        await super().cancel_tasks()
+
+    async def _quiet(self):
+        """Wait for the quiet window and end the response."""
+        await asyncio.sleep(const.DEFAULT_MULTI_RESPONSE_WINDOW)
+        self._end()
+
+    def _end(self) -> None:
+        """Set the response to the messages gathered, if any."""
+        super().set(self._messages if self._messages else None)
+
+    def set(self, message: Message) -> None:
+        """Gather a message of the response, or end it if message is None."""
+        if self._event.is_set():
+            return
+        if message is None:
+            self._end()
+            return
+        self._messages.append(message)
+        if self._qos_task:
+            self._qos_task.cancel()  # answered, so not resent
+        groups = self._command.multi_groups
+        if message.group == self._command.multi_end or (
+            groups and groups <= self._messages.groups
+        ):
+            self._end()
+            return
+        if self._quiet_task:
+            self._quiet_task.cancel()
+        self._quiet_task = asyncio.create_task(self._quiet())
+
 
 class ExpectedResponseQueue:
-    """Define a queue of ExpectedResponse."""
+    """Define a queue of ExpectedResponse.
+
+    Entries are keyed by the reply group of their command, the group of the
+    message that the device answers with, so that a response resolves the
+    oldest command waiting on it.
+    """
 
     def __init__(self):
         """Init the data structure."""
         self._queue = defaultdict(
             OrderedDict
         )  # type: Dict[OrderedDict[TelnetCommand, ExpectedResponse]]
+        self._multi_reply_groups = set()
 
     def __getitem__(self, command: TelnetCommand) -> ExpectedResponse:
         """Get item shortcut through both dicts."""
-        return self._queue[command.group][command]
+        return self._queue[command.reply_group][command]
 
     def __setitem__(self, command: TelnetCommand, expected_response: ExpectedResponse):
         """Set item shortcut through both dicts."""
-        self._queue[command.group][command] = expected_response
+        self._queue[command.reply_group][command] = expected_response
+        if command.is_multi:
+            self._multi_reply_groups.add(command.reply_group)
 
     def get(self, group) -> Optional[OrderedDict]:
         """Get the (command, response) entries for group, if any."""
@@ -460,15 +1044,28 @@ class ExpectedResponseQueue:
                 return None
             return (command, expected_response)
 
+    def match_multi(self, group) -> Optional[MultiExpectedResponse]:
+        """Get the oldest multi-message response that a message of group is part of.
+
+        The response is not popped, it gathers messages until it ends.
+        """
+        for multi_group in self._multi_reply_groups:
+            if not group.startswith(multi_group):
+                continue
+            for command, expected_response in self._queue.get(multi_group, {}).items():
+                if command.is_multi:
+                    return expected_response
+        return None
+
     async def cancel_expected_response(self, command: TelnetCommand) -> None:
         """Cancel and delete the expected response for a specific command."""
         try:
-            expected_response = self._queue[command.group][command]
+            expected_response = self._queue[command.reply_group][command]
             expected_response.set(None)
             await expected_response.cancel_tasks()
-            del self._queue[command.group][command]
+            del self._queue[command.reply_group][command]
             try:
-                self._queue[command.group][command]
+                self._queue[command.reply_group][command]
             except KeyError:
                 return
             _LOGGER.warning("Expected response: %s, was not deleted", expected_response)
@@ -1,6 +1,8 @@
 """Implement the AV Receiver interface."""
 from typing import Optional
 
+from pyavreceiver.admission import AdmissionController
+from pyavreceiver.cache import FileCache
 from pyavreceiver.dispatch import Dispatcher
 from pyavreceiver.receiver import AVReceiver
 from pyavreceiver.zone import MainZone, Zone
@@ -13,9 +15,14 @@ class TemplateReceiver(AVReceiver):
         self,
         host,
         *,
+        admission: AdmissionController = None,
+        device_cache: FileCache = None,
         dispatcher: Dispatcher = Dispatcher(),
+        elide_max_age: Optional[float] = None,
         heart_beat: Optional[float],
         http_api=None,
+        http_poller_class=None,
+        state_cache: FileCache = None,
         telnet: bool = True,
         timeout: float,
         zone_aux_class: Zone,
@@ -23,9 +30,14 @@ class TemplateReceiver(AVReceiver):
     ):
         super().__init__(
             host,
+            admission=admission,
+            device_cache=device_cache,
             dispatcher=dispatcher,
+            elide_max_age=elide_max_age,
             heart_beat=heart_beat,
             http_api=http_api,
+            http_poller_class=http_poller_class,
+            state_cache=state_cache,
             telnet=telnet,
             timeout=timeout,
             zone_aux_class=zone_aux_class,
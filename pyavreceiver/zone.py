@@ -1,15 +1,38 @@
 """Define the interface of an A/V Receiver Zone."""
 import asyncio
 import logging
+import math
 from functools import partial
-from typing import Callable, Coroutine, Dict, List, Optional, Sequence, Union
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 
 from pyavreceiver import const
-from pyavreceiver.command import Command
-from pyavreceiver.functions import none
+from pyavreceiver.command import Command, TelnetCommand
+from pyavreceiver.functions import none, resolved
+from pyavreceiver.query_planner import QueryPlan
 
 _LOGGER = logging.getLogger(__name__)
 
+UPDATE_QOS = 1
+
+# Volume ramp curves map the fraction of the duration elapsed to the fraction of
+# the change applied
+RAMP_CURVES = {
+    "linear": lambda x: x,
+    "ease_in": lambda x: x * x,
+    "ease_out": lambda x: 1 - (1 - x) * (1 - x),
+    "ease_in_out": lambda x: x * x * (3 - 2 * x),
+}
+
 
 class Zone:
     """Define an Audio/Video Receiver zone."""
@@ -20,6 +43,8 @@ class Zone:
         self._zone_prefix = const.ZONE_PREFIX[zone.lower()]
         self._filter_func = define_filter(zone)
         self._commands = dict(filter(self._filter_func, avr.commands.items()))
+        self._ramp_task = None  # type: asyncio.Task
+        self._ramp_level = None  # type: float
 
     def get(self, name: str) -> str:
         """Get the current state of the attribute name."""
@@ -32,7 +57,12 @@ class Zone:
         return None
 
     def set(self, name: str, val=None, qos=0) -> Union[Coroutine, bool]:
-        """Request the receiver set the name to val."""
+        """Request the receiver set the name to val.
+
+        If elision is enabled and the device recently reported that name is
+        already val, nothing is sent and the request resolves immediately, to the
+        message the command would have been answered with.
+        """
         if qos == 0:
             try:
                 command = self.commands[self._zone_prefix + name].set_val(val)
@@ -44,7 +74,8 @@ class Zone:
                     self.commands,
                 )
                 return None
-            self.telnet_connection.send_command(command)
+            if not self._is_redundant(command):
+                self.telnet_connection.send_command(command)
             return True
         try:
             command = self.commands[self._zone_prefix + name].set_val(val, qos=qos)
@@ -56,19 +87,130 @@ class Zone:
                 self.commands,
             )
             return none()
+        if self._is_redundant(command):
+            return resolved(
+                self.telnet_connection.make_message(command.message.strip())
+            )
         return self.telnet_connection.async_send_command(command)
 
+    def _is_redundant(self, command: TelnetCommand) -> bool:
+        """Return True, and count it, if command would not change fresh state.
+
+        A command of the same group that is yet to take effect may change the state,
+        so command is not elided then.
+        """
+        if (max_age := self.avr.elide_max_age) is None or command.val is None:
+            return False
+        if self.telnet_connection.pending(command):
+            return False
+        age = self.avr.state_age(command.name)
+        if age is None or age > max_age:
+            return False
+        try:
+            current = command.set_val(self.avr.state.get(command.name))
+        except (AttributeError, TypeError, ValueError):
+            return False
+        if current.message != command.message:
+            return False
+        self.avr.metrics["commands_elided"] += 1
+        return True
+
+    async def set_many(self, settings: Dict[str, Any], qos=2) -> Dict[str, bool]:
+        """Request the receiver set many attributes and return each outcome.
+
+        Settings that the HTTP API can express are sent in one request and the rest
+        are sent over telnet; redundant settings are elided as in set.  An outcome
+        is False if the attribute does not exist, the request failed or the receiver
+        did not reply.  Both transports are used concurrently, and settings that the
+        HTTP request did not apply are then sent over telnet.
+        """
+        results, commands = {}, {}
+        for name, val in settings.items():
+            try:
+                command = self.commands[self._zone_prefix + name].set_val(val, qos=qos)
+            except KeyError:
+                _LOGGER.debug("Command %s%s does not exist", self._zone_prefix, name)
+                results[name] = False
+                continue
+            if self._is_redundant(command):
+                results[name] = True
+            else:
+                commands[name] = command
+        http_api = self.avr.http_api
+        http = {
+            name: command
+            for name, command in commands.items()
+            if http_api and http_api.can_set(command)
+        }
+        telnet = {name: cmd for name, cmd in commands.items() if name not in http}
+        applied, telnet_results = await asyncio.gather(
+            http_api.set_many(list(http.values())) if http else none(),
+            self._set_over_telnet(telnet),
+        )
+        results.update(telnet_results)
+        applied = applied or {}
+        retry = {}
+        for name, command in http.items():
+            if applied.get(command.name):
+                results[name] = True
+            else:
+                retry[name] = command
+        results.update(await self._set_over_telnet(retry))
+        return {name: results[name] for name in settings}
+
+    async def _set_over_telnet(
+        self, commands: Dict[str, TelnetCommand]
+    ) -> Dict[str, bool]:
+        """Send commands over telnet and return whether each was replied to."""
+        if not commands or not self.available:
+            return dict.fromkeys(commands, False)
+        responses = await asyncio.gather(
+            *(self.telnet_connection.async_send_command(c) for c in commands.values())
+        )
+        return {
+            name: response is not None for name, response in zip(commands, responses)
+        }
+
     def update(self, name: str) -> Coroutine:
         """Request the receiver to send update of the value of name."""
-        command = self.commands[name].set_query(qos=1)
+        command = self.commands[name].set_query(qos=UPDATE_QOS)
         return self.telnet_connection.async_send_command(command)
 
-    async def update_all(self):
+    async def update_many(self, names: Iterable[str]) -> QueryPlan:
+        """Update the attributes of names with the fewest queries.
+
+        Groups that the model does not support are skipped.  Returns the plan,
+        with the number of queries planned and actually sent and the time saved by
+        the skipped queries.
+        """
+        capabilities = self.avr.capabilities
+        plan = self.telnet_connection.query_planner.plan(
+            names, capabilities.unsupported
+        )
+        sent = self.avr.metrics["queries_sent"]
+        connected = self.available
+        responses = await asyncio.gather(*(self.update(name) for name in plan.queries))
+        plan.sent = self.avr.metrics["queries_sent"] - sent
+        # queries go unanswered in standby, and are dropped while disconnected
+        if connected and self.available and self.avr.power:
+            for name, response in zip(plan.queries, responses):
+                command = self.commands[name]
+                if response is None and self.telnet_connection.answerable(command):
+                    capabilities.failed(command.group)
+        # each skipped query would have been sent and retried until it timed out
+        attempts = range(1, const.DEFAULT_RETRY_SCHEMA[UPDATE_QOS] + 2)
+        plan.time_saved = sum(
+            self.telnet_connection.retry_timeout(group, attempt)
+            for group in plan.skipped
+            for attempt in attempts
+        )
+        self.avr.metrics["query_time_saved"] += plan.time_saved
+        await self.avr.save_capabilities()
+        return plan
+
+    async def update_all(self) -> QueryPlan:
         """Update all known attributes in commands."""
-        tasks = []
-        for name in self.commands:
-            tasks.append(self.update(name))
-        await asyncio.gather(*tasks)
+        return await self.update_many(self.commands)
 
     @property
     def available(self) -> bool:
@@ -85,6 +227,11 @@ class Zone:
         """Get the commands for this zone."""
         return self._commands
 
+    @property
+    def prefix(self) -> str:
+        """Get the prefix of the command names of this zone."""
+        return self._zone_prefix
+
     @property
     def state(self) -> dict:
         """Get the state of this zone."""
@@ -160,6 +307,58 @@ class Zone:
         """Request the receiver set volume to val."""
         return self.set(const.ATTR_VOLUME, val, 2)
 
+    async def ramp_volume(
+        self, target: float, duration: float, curve: str = "linear"
+    ) -> Optional[str]:
+        """Request the receiver ramp the volume to target over duration seconds.
+
+        One setpoint, in the 0.5 dB steps of the receiver, is sent per message
+        interval without waiting for replies, and only the final setpoint is
+        confirmed.  A new ramp, eg. each move of a slider, cancels the running one
+        and continues from its last setpoint.  Return the reply to the final
+        setpoint, or None if the ramp was cancelled or failed.
+        """
+        if self._ramp_task and not self._ramp_task.done():
+            self._ramp_task.cancel()
+            try:
+                await self._ramp_task
+            except asyncio.CancelledError:
+                pass
+        else:
+            self._ramp_level = None
+        task = self._ramp_task = asyncio.create_task(
+            self._ramp_volume(target, duration, RAMP_CURVES[curve])
+        )
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise  # the caller was cancelled, not the ramp
+            return None
+
+    async def _ramp_volume(
+        self, target: float, duration: float, curve: Callable
+    ) -> Optional[str]:
+        name = self._zone_prefix + const.ATTR_VOLUME
+        start = self.volume if self._ramp_level is None else self._ramp_level
+        interval = self.telnet_connection.message_interval_limit
+        if start is not None and duration > 0:
+            loop = asyncio.get_running_loop()
+            steps = math.ceil(duration / interval)
+            begin = loop.time()
+            last = self.commands[name].set_val(start).message
+            for step in range(1, steps):
+                await asyncio.sleep(max(0, begin + step * interval - loop.time()))
+                level = start + (target - start) * curve(step / steps)
+                command = self.commands[name].set_val(level)
+                if command.message != last:
+                    self.telnet_connection.send_command(command)
+                    last = command.message
+                    self._ramp_level = level
+            await asyncio.sleep(max(0, begin + steps * interval - loop.time()))
+        self._ramp_level = target
+        return await self.set(const.ATTR_VOLUME, target, 2)
+
     def set_volume_down(self) -> bool:
         """Request the receiver turn the volume down."""
         return self.set(const.ATTR_VOLUME_DOWN)
@@ -1,11 +1,13 @@
 """Tests for the pyavreceiver library."""
-from datetime import datetime
+import time
 from importlib import resources
 
 import yaml
 
 from pyavreceiver import const
 from pyavreceiver.denon.commands import get_command_lookup
+from pyavreceiver.denon.response import DenonMessage
+from pyavreceiver.pacing import AdaptivePacer
 from pyavreceiver.telnet_connection import TelnetConnection
 
 
@@ -23,7 +25,7 @@ class GenericTelnetConnection(TelnetConnection):
     ):
         """Init the connection."""
         super().__init__(avr, host, port=port, timeout=timeout, heart_beat=heart_beat)
-        self._message_interval_limit = const.DEFAULT_MESSAGE_INTERVAL_LIMIT
+        self._pacer = AdaptivePacer(const.DEFAULT_MESSAGE_INTERVAL_LIMIT)
 
     def _load_command_dict(self, path=None):
         with resources.open_text("pyavreceiver.denon", "commands.yaml") as file:
@@ -32,11 +34,14 @@ class GenericTelnetConnection(TelnetConnection):
     def _get_command_lookup(self, command_dict):
         return get_command_lookup(command_dict)
 
+    def make_message(self, message):
+        return DenonMessage(message, command_dict=self._command_dict)
+
     async def _response_handler(self):
         while True:
             msg = await self._reader.readuntil(separator=b"\r")
             message = msg.decode()[:-1]
-            self._last_activity = datetime.utcnow()
+            self._last_activity = time.monotonic()
             resp = message
             # self._handle_event(resp)
 
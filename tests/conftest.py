@@ -1,5 +1,6 @@
 """Test fixtures for pyheos."""
 import asyncio
+from typing import Callable, List, Optional
 
 import pytest
 import telnetlib3
@@ -83,6 +84,47 @@ def mock_telnet_echo(event_loop: asyncio.AbstractEventLoop):
     event_loop.run_until_complete(server.wait_closed())
 
 
+@pytest.fixture(name="reply_telnet")
+def mock_telnet_reply(event_loop: asyncio.AbstractEventLoop):
+    """Mock telnet servers that reply to each message as a reply function says.
+
+    Yields a function that starts the server with reply, which returns what to
+    write for each message received, or None to stay silent, and returns the list
+    of messages received.
+    """
+    servers = []
+
+    def serve(reply: Callable[[str], Optional[str]]) -> List[str]:
+        messages = []
+
+        async def shell(
+            reader: telnetlib3.TelnetReader, writer: telnetlib3.TelnetWriter
+        ):
+            try:
+                while message := await reader.readuntil(separator=b"\r"):
+                    messages.append(message.decode())
+                    if (answer := reply(message.decode())) is not None:
+                        writer.write(answer)
+                        await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+
+        coro = telnetlib3.create_server(port=4000, shell=shell)
+        servers.append(event_loop.run_until_complete(coro))
+        return messages
+
+    yield serve
+    for server in servers:
+        server.close()
+        event_loop.run_until_complete(server.wait_closed())
+
+
+@pytest.fixture(name="echo_telnet")
+def mock_telnet_echo_all(reply_telnet):
+    """Mock a telnet server that replies to each message with the message."""
+    return reply_telnet(lambda message: message)
+
+
 @pytest.fixture
 def handler():
     """Fixture handler to mock in the dispatcher."""
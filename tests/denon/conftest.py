@@ -1,10 +1,17 @@
 """Configure the Denon/Marantz tests."""
 from importlib import resources
+from typing import Optional
 
 import pytest
 import yaml
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.denon.receiver import DenonReceiver
 from pyavreceiver.denon.response import DenonMessage
+from pyavreceiver.dispatch import Dispatcher
 
 
 @pytest.fixture(name="message_none")
@@ -31,3 +38,133 @@ fake_entries = {
     "FAKEFO": {"R T E STS": {}},
     "FAKEN": {"^params": True, "OR": "TEST"},
 }
+
+
+@pytest.fixture(name="http_fixture_server")
+def http_fixture_server_fixture(event_loop):
+    """Serve the XML fixtures like a Denon/Marantz web server."""
+
+    def fixture(name):
+        with open(f"tests/denon/fixtures/{name}", encoding="utf-8") as file:
+            return file.read()
+
+    routes = {
+        denon_const.API_DEVICE_INFO_URL: fixture("Deviceinfo-X1500H.xml"),
+        denon_const.API_MAIN_ZONE_XML_URL: fixture("MainZoneXml-1912.xml"),
+        denon_const.API_MAIN_ZONE_XML_STATUS_URL: fixture("MainZoneXmlStatus-1912.xml"),
+        denon_const.API_APP_COMMAND_URL: fixture("GetRename-Delete-X1500H.xml"),
+        denon_const.API_APP_COMMAND_0300_URL: '<?xml version="1.0" encoding="utf-8" ?>'
+        "<rx><cmd><name>SetAudyssey</name><list>"
+        '<param name="dynamiceq" result="1"></param>'
+        '<param name="multeq" result="1"></param>'
+        '<param name="dynamicvol" result="1"></param>'
+        "</list></cmd></rx>",
+        "/description.xml": fixture("upnp-X1500H.xml"),
+    }
+    # AppCommand responses by the first command of the request
+    app_commands = {
+        "GetAllZonePowerStatus": fixture("GetAllZoneStatus-X1500H.xml"),
+    }
+    peers = set()
+    requests = []
+    bodies = []
+
+    async def handle(request: web.Request) -> web.Response:
+        peers.add(request.transport.get_extra_info("peername"))
+        requests.append(request.path)
+        if request.path not in routes:
+            raise web.HTTPNotFound()
+        bodies.append(await request.text())
+        if request.path == denon_const.API_APP_COMMAND_URL:
+            body = bodies[-1]
+            for command, text in app_commands.items():
+                if f">{command}<" in body:
+                    return web.Response(text=text, content_type="text/xml")
+        return web.Response(text=routes[request.path], content_type="text/xml")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handle)
+    server = TestServer(app, host="127.0.0.1")
+    event_loop.run_until_complete(server.start_server())
+    server.peers = peers
+    server.requests = requests
+    server.bodies = bodies
+    server.routes = routes
+    server.app_commands = app_commands
+    yield server
+    event_loop.run_until_complete(server.close())
+
+
+@pytest.fixture(name="denon_receiver")
+def denon_receiver_fixture(http_fixture_server):
+    """Create receivers of the HTTP fixture server and the telnet server on 4000.
+
+    The receiver is created with the given keyword arguments and a dispatcher of
+    its own, and is initialized unless init is False.
+    """
+
+    async def create(*, init: bool = True, **kwargs) -> DenonReceiver:
+        http_api = DenonAVRXApi("127.0.0.1", None)
+        http_api.port = http_fixture_server.port
+        kwargs.setdefault("dispatcher", Dispatcher())
+        avr = DenonReceiver("127.0.0.1", http_api=http_api, **kwargs)
+        avr.telnet_connection.port = 4000
+        if init:
+            await avr.init()
+        return avr
+
+    return create
+
+
+@pytest.fixture(name="volume_telnet")
+def volume_telnet_fixture(reply_telnet):
+    """Mock a Denon/Marantz telnet server that replies to volume steps.
+
+    Like a receiver, it answers MVUP with the new volume, eg. MV455, and echoes
+    every other message.
+    """
+    volume = {"MV": 450, "Z2": 450, "Z3": 450}
+
+    def reply(message: str) -> str:
+        for group, level in volume.items():
+            if message in (f"{group}UP\r", f"{group}DOWN\r"):
+                volume[group] = level + (5 if message.endswith("UP\r") else -5)
+                return f"{group}{volume[group]:03}\r"
+        return message
+
+    reply_telnet(reply)
+    return volume
+
+
+@pytest.fixture(name="multi_telnet")
+def multi_telnet_fixture(reply_telnet):
+    """Mock a Denon/Marantz telnet server that answers some queries with many lines.
+
+    CV? is answered like a receiver, ending with CVEND, PS? has no end message and
+    every other message is echoed.
+    """
+    answers = {
+        "CV?\r": "CVFL 50\rCVFR 505\rCVC 48\rCVSW 45\rCVEND\r",
+        "PS?\r": "PSBAS 50\rPSTRE 52\rPSTONE CTRL ON\r",
+    }
+    return reply_telnet(lambda message: answers.get(message, message))
+
+
+@pytest.fixture(name="selective_telnet")
+def selective_telnet_fixture(reply_telnet):
+    """Mock a Denon/Marantz telnet server that does not answer some groups.
+
+    Messages starting with a prefix in the returned set are ignored, like a model
+    without the feature, MV? is answered like a receiver and every other message
+    is echoed.
+    """
+    ignored = set()
+    answers = {"MV?\r": "MV455\rMVMAX 98\r"}
+
+    def reply(message: str) -> Optional[str]:
+        if any(message.startswith(prefix) for prefix in ignored):
+            return None
+        return answers.get(message, message)
+
+    reply_telnet(reply)
+    return ignored
@@ -0,0 +1,36 @@
+"""Test the command groups a receiver model supports."""
+from pyavreceiver.capabilities import Capabilities
+from pyavreceiver.denon.commands import get_command_lookup
+
+
+def test_seed_from_zones(command_dict):
+    """Test the groups of zones the model does not have are unsupported."""
+    capabilities = Capabilities()
+    capabilities.seed(2, get_command_lookup(command_dict))
+    assert not capabilities.is_supported("Z3")
+    assert not capabilities.is_supported("Z3PSBAS")
+    assert capabilities.is_supported("Z2")
+    assert capabilities.is_supported("MV")
+
+
+def test_learn_unsupported():
+    """Test a group is unsupported after repeated failures unless it was seen."""
+    capabilities = Capabilities()
+    capabilities.failed("PSFH:")
+    assert capabilities.is_supported("PSFH:")
+    capabilities.failed("PSFH:")
+    assert not capabilities.is_supported("PSFH:")
+    assert capabilities.pop_changed()
+    assert not capabilities.pop_changed()
+
+    capabilities.seen("MV")
+    capabilities.failed("MV")
+    capabilities.failed("MV")
+    assert capabilities.is_supported("MV")
+
+    capabilities.seen("PSFH:")  # a firmware update added it
+    assert capabilities.is_supported("PSFH:")
+    assert Capabilities.from_dict(capabilities.as_dict()).as_dict() == {
+        "supported": ["MV", "PSFH:"],
+        "unsupported": [],
+    }
@@ -0,0 +1,54 @@
+"""Test the ReceiverFleet class."""
+import asyncio
+
+import pytest
+
+from pyavreceiver import const
+from pyavreceiver.cache import FileCache
+from pyavreceiver.denon.http_api import DenonAVRXApi
+from pyavreceiver.fleet import ReceiverFleet
+
+HOSTS = ("127.0.0.1", "127.0.0.2")
+
+
+@pytest.mark.asyncio
+async def test_fleet(echo_telnet, async_handler, tmp_path):
+    """Test a fleet shares the command table and heartbeats and relays signals."""
+    cache = FileCache(str(tmp_path / "devices.json"))
+    for host in HOSTS:
+        cache.set(host, {"device_info": {const.INFO_ZONES: 2}, "sources": None})
+    fleet = ReceiverFleet(device_cache=cache, heart_beat=0.2, tick=0.1)
+    for host in HOSTS:
+        http_api = DenonAVRXApi(host, None)
+        connection = fleet.add(host, http_api=http_api).telnet_connection
+        connection.port = 4000
+        connection.heart_beat_timeout = 0.1
+    fleet.dispatcher.connect(const.SIGNAL_TELNET_EVENT, async_handler)
+    assert await fleet.start() == {}
+
+    first, second = (fleet.receivers[host] for host in HOSTS)
+    assert len(fleet) == 2
+    assert first.telnet_connection.command_dict is (
+        second.telnet_connection.command_dict
+    )
+    assert first.commands[const.ATTR_SOURCE] is not second.commands[const.ATTR_SOURCE]
+    assert "command_table" in first.startup_timings
+    assert async_handler.args == (HOSTS[1], const.EVENT_CONNECTED)
+
+    await asyncio.sleep(0.5)
+    health = fleet.health()
+    assert set(health) == set(HOSTS)
+    assert health[HOSTS[0]]["state"] == const.STATE_CONNECTED
+    assert health[HOSTS[0]]["heart_beat_failures"] == 0
+    assert fleet.metrics["heart_beats"] >= 4
+    # pylint: disable=protected-access
+    assert first.telnet_connection._heart_beat_task is None
+
+    first.update_state({const.ATTR_POWER: True})
+    second.update_state({const.ATTR_POWER: False})
+    assert fleet.state(const.ATTR_POWER) == {HOSTS[0]: True, HOSTS[1]: False}
+    assert fleet.select(power=True) == [first]
+
+    await fleet.stop()
+    assert async_handler.args[1] == const.EVENT_DISCONNECTED
+    assert fleet.health()[HOSTS[0]]["state"] == const.STATE_DISCONNECTED
@@ -1,6 +1,9 @@
 """Test getting device information via HTTP API."""
+import pytest
+
 from pyavreceiver.denon import const as denon_const
-from pyavreceiver.denon.http_api import DenonHTTPApi
+from pyavreceiver.denon.http_api import DenonAVRXApi, DenonHTTPApi
+from pyavreceiver.http_api import create_session
 
 
 def test_get_renamed_and_deleted_sources():
@@ -159,3 +162,35 @@ def test_read_device_info_x_series_xml():
     assert api.device_info["zones"] == 2
     assert api.device_info["manufacturer"] == "Denon"
     assert api.device_info["friendly_name"] == "TV Speakers"
+
+
+@pytest.mark.asyncio
+async def test_requests_share_pooled_connection(http_fixture_server):
+    """Test that sequential requests reuse one keep-alive connection."""
+    api = DenonAVRXApi("127.0.0.1", None)
+    api.port = http_fixture_server.port
+    for _ in range(3):
+        device_info = await api.get_device_info()
+        sources = await api.get_source_names()
+    assert device_info["model_name"] == "AVR-X1500H"
+    assert sources["STEAM"] == denon_const.SOURCE_CABLE
+    assert len(http_fixture_server.requests) == 6
+    assert len(http_fixture_server.peers) == 1
+
+    session = api.session
+    await api.close()
+    assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_shared_session_is_not_closed(http_fixture_server):
+    """Test that a session passed in is left open for the caller."""
+    session = create_session()
+    apis = [DenonAVRXApi("127.0.0.1", None, session=session) for _ in range(3)]
+    for api in apis:
+        api.port = http_fixture_server.port
+        await api.get_device_info()
+        await api.close()
+    assert not session.closed
+    assert len(http_fixture_server.peers) == 1
+    await session.close()
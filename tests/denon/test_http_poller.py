@@ -0,0 +1,101 @@
+"""Test polling the state over HTTP."""
+import asyncio
+
+import pytest
+
+from pyavreceiver import const
+from pyavreceiver.denon.http_poller import DenonHTTPPoller
+from pyavreceiver.dispatch import Dispatcher
+
+
+@pytest.mark.asyncio
+async def test_poll_app_command(http_fixture_server, denon_receiver):
+    """Test one batched AppCommand request updates all zones."""
+    avr = await denon_receiver(init=False)
+    http_api = avr.http_api
+    await avr.telnet_connection.init_command_table()
+    poller = DenonHTTPPoller(avr, http_api)
+
+    changes = await poller.poll()
+    assert changes == avr.state
+    assert avr.state["power"] is True
+    assert avr.state["zone1_power"] is True
+    assert avr.state["zone2_power"] is False
+    assert avr.state["volume"] == -40.5
+    assert avr.state["zone2_volume"] == -50
+    assert avr.state["mute"] is False
+    assert avr.state["source"] == "SAT/CBL"
+    assert avr.state["sound_mode"] == "STEREO"
+    assert not poller.legacy
+    assert http_fixture_server.requests == ["/goform/AppCommand.xml"]
+
+    assert await poller.poll() == {}
+    assert poller.metrics["polls"] == 2
+    assert poller.metrics["requests"] == 2
+    assert poller.metrics["changes"] == 1
+    await http_api.close()
+
+
+@pytest.mark.asyncio
+async def test_poll_legacy_fallback(http_fixture_server, denon_receiver):
+    """Test falling back to MainZoneXmlStatus, then retrying AppCommand."""
+    app_commands = dict(http_fixture_server.app_commands)
+    http_fixture_server.app_commands.clear()
+    avr = await denon_receiver(init=False)
+    http_api = avr.http_api
+    await avr.telnet_connection.init_command_table()
+    poller = DenonHTTPPoller(avr, http_api, app_command_retry=0.1)
+
+    for _ in range(2):
+        await poller.poll()
+    assert poller.legacy
+    assert avr.state["power"] is True
+    assert avr.state["volume"] == -60
+    assert avr.state["source"] == "BD"
+    assert http_fixture_server.requests == [
+        "/goform/AppCommand.xml",
+        "/goform/formMainZone_MainZoneXmlStatus.xml",
+        "/goform/formMainZone_MainZoneXmlStatus.xml",
+    ]
+
+    http_fixture_server.app_commands.update(app_commands)
+    await asyncio.sleep(0.1)
+    await poller.poll()
+    assert not poller.legacy
+    assert http_fixture_server.requests[-1] == "/goform/AppCommand.xml"
+    await http_api.close()
+
+
+@pytest.mark.asyncio
+async def test_receiver_without_telnet(denon_receiver):
+    """Test a receiver without telnet polls over HTTP with an adaptive interval."""
+    dispatcher = Dispatcher()
+    updates = []
+    dispatcher.connect(const.SIGNAL_STATE_UPDATE, updates.append)
+    avr = await denon_receiver(dispatcher=dispatcher, telnet=False)
+    assert avr.connection_state == const.STATE_DISCONNECTED
+    await asyncio.sleep(0.05)
+    assert avr.main.volume == -40.5
+    assert "MV395" in updates  # signalled like the telnet message
+    assert avr.http_poller.metrics["polls"] == 1
+
+    await avr.disconnect()
+    assert avr.http_poller.metrics["polls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_poll_interval_backs_off(denon_receiver):
+    """Test the interval grows while the state is unchanged."""
+    avr = await denon_receiver(init=False)
+    http_api = avr.http_api
+    await avr.telnet_connection.init_command_table()
+    poller = DenonHTTPPoller(
+        avr, http_api, min_interval=0.01, max_interval=0.04, backoff=2
+    )
+    await poller.start()
+    await asyncio.sleep(0.1)
+    await poller.stop()
+    assert poller.metrics["changes"] == 1
+    assert poller.metrics["polls"] >= 3
+    assert poller.interval == 0.04
+    await http_api.close()
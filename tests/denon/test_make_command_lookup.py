@@ -121,6 +121,13 @@ def test_generate_commands(command_dict):
     assert command_lookup[const.ATTR_VOLUME].set_val(-30.5).message == "MV495\r"
     assert command_lookup[const.ATTR_VOLUME].set_query().message == "MV?\r"
     assert command_lookup[const.ATTR_VOLUME_UP].set_val().message == "MVUP\r"
+    assert command_lookup[const.ATTR_VOLUME_UP].set_val().reply_group == "MV"
+
+    channel_levels = command_lookup[const.ATTR_CHANNEL_LEVELS].set_query()
+    assert channel_levels.message == "CV?\r"
+    assert channel_levels.multi_end == "CVEND"
+    assert {"CVFL", "CVSW"} <= channel_levels.multi_groups
+    assert not command_lookup[const.ATTR_VOLUME].is_multi
     assert command_lookup[const.ATTR_VOLUME_DOWN].set_val().message == "MVDOWN\r"
 
     assert command_lookup[const.ATTR_MUTE].set_val(True).message == "MUON\r"
@@ -183,6 +190,8 @@ def test_generate_zone_commands(command_dict):
 
     assert command_lookup[const.ATTR_ZONE2_VOLUME_UP].set_val().message == "Z2UP\r"
     assert command_lookup[const.ATTR_ZONE3_VOLUME_DOWN].set_val().message == "Z3DOWN\r"
+    assert command_lookup[const.ATTR_ZONE2_VOLUME_UP].set_val().reply_group == "Z2"
+    assert command_lookup[const.ATTR_ZONE2_POWER].reply_group == "Z2"
 
     assert (
         command_lookup[const.ATTR_ZONE2_TREBLE].set_val(-4.5).message == "Z2PSTRE 455\r"
@@ -0,0 +1,49 @@
+"""Test planning the queries that update attributes."""
+from pyavreceiver import const
+from pyavreceiver.denon.commands import get_command_lookup
+from pyavreceiver.query_planner import QueryPlanner
+
+
+def test_plan_shares_queries(command_dict):
+    """Test names answered by the same query are planned as one query."""
+    planner = QueryPlanner()
+    planner.load(get_command_lookup(command_dict))
+
+    plan = planner.plan(
+        [
+            const.ATTR_VOLUME,
+            const.ATTR_MAX_VOLUME,
+            const.ATTR_ZONE2_POWER,
+            const.ATTR_ZONE2_SOURCE,
+            "channel_level_fl",
+            "channel_level_fr",
+            const.ATTR_VOLUME_UP,
+        ]
+    )
+    assert plan.naive == 6
+    assert plan.planned == 3
+    assert plan.queries[const.ATTR_VOLUME] == [
+        const.ATTR_VOLUME,
+        const.ATTR_MAX_VOLUME,
+    ]
+    assert plan.queries[const.ATTR_CHANNEL_LEVELS] == [
+        "channel_level_fl",
+        "channel_level_fr",
+    ]
+    assert plan.unplanned == [const.ATTR_VOLUME_UP]
+
+    # a single channel is queried alone rather than with the whole family
+    assert list(planner.plan(["channel_level_fl"]).queries) == ["channel_level_fl"]
+
+
+def test_plan_learns_answers(command_dict):
+    """Test groups seen answering a query are planned with it."""
+    planner = QueryPlanner()
+    planner.load(get_command_lookup(command_dict))
+    assert planner.plan([const.ATTR_MUTE, const.ATTR_VOLUME]).planned == 2
+
+    planner.observe("MU", "MV")
+    assert planner.plan([const.ATTR_MUTE, const.ATTR_VOLUME]).planned == 2
+    planner.observe("MU", "MV")
+    plan = planner.plan([const.ATTR_MUTE, const.ATTR_VOLUME])
+    assert plan.queries == {const.ATTR_MUTE: [const.ATTR_MUTE, const.ATTR_VOLUME]}
@@ -1,7 +1,14 @@
 """Test the DenonReceiver class."""
+import asyncio
+
+import pytest
+
 from pyavreceiver import const
+from pyavreceiver.admission import AdmissionController
+from pyavreceiver.cache import FileCache
 from pyavreceiver.denon.receiver import DenonReceiver
 from pyavreceiver.dispatch import Dispatcher
+from pyavreceiver.error import AVReceiverNotConnectedError
 
 
 def test_receiver_init():
@@ -14,6 +21,24 @@ def test_receiver_init():
     assert avr.main is None
 
 
+def test_receiver_connection_options():
+    """Test the connection options are passed to the telnet connection."""
+    avr = DenonReceiver(
+        "localhost",
+        group_rtt=True,
+        heart_beat=1.0,
+        heart_beat_timeout=0.5,
+        offline_policy=const.OFFLINE_BUFFER,
+        offline_ttl=5.0,
+    )
+    connection = avr.telnet_connection
+    assert connection.group_rtt
+    assert connection.heart_beat_timeout == 0.5
+    assert connection.offline_policy == const.OFFLINE_BUFFER
+    assert connection.offline_ttl == 5.0
+    assert const.DEFAULT_HEART_BEAT + const.DEFAULT_HEART_BEAT_TIMEOUT <= 3
+
+
 def test_receiver_update():
     """Test the receiver."""
     avr = DenonReceiver("")
@@ -29,3 +54,202 @@ def test_receiver_update():
     assert avr.state["volume"] == -18.5
     assert avr.update_state({"volume": -15})
     assert avr.state["volume"] == -15
+    assert avr.change_counts == {"power": 1, "volume": 1}
+
+
+@pytest.mark.asyncio
+async def test_receiver_init_concurrent(mock_telnet, denon_receiver):
+    """Test init connects, fetches device info and records timings."""
+    avr = await denon_receiver()
+
+    assert avr.connection_state == const.STATE_CONNECTED
+    assert avr.model == "AVR-X1500H"
+    assert avr.zones == 2
+    assert avr.main is not None
+    assert avr.zone2 is not None
+    assert avr.sources["STEAM"] == "SAT/CBL"
+    assert avr.commands["source"].values.get("STEAM") == "SAT/CBL"
+    assert set(avr.startup_timings) == {
+        "command_table",
+        "telnet_connect",
+        "command_lookup",
+        "device_info",
+        "source_names",
+        "total",
+    }
+    assert avr.startup_timings["total"] >= avr.startup_timings["device_info"]
+
+    await avr.disconnect()
+    assert avr.connection_state == const.STATE_DISCONNECTED
+
+
+@pytest.mark.asyncio
+async def test_receiver_init_from_device_cache(
+    mock_telnet, http_fixture_server, denon_receiver, tmp_path
+):
+    """Test a second init starts from the cache without HTTP requests."""
+    path = str(tmp_path / "devices.json")
+    for _ in range(2):
+        avr = await denon_receiver(device_cache=FileCache(path))
+        assert avr.model == "AVR-X1500H"
+        assert avr.zones == 2
+        assert avr.commands["source"].values.get("STEAM") == "SAT/CBL"
+        await avr.disconnect()
+    assert len(http_fixture_server.requests) == 2
+    assert FileCache(path).get("0005CDD1F6E8") is None  # not loaded yet
+
+    cache = FileCache(path)
+    await cache.async_load()
+    assert cache.get("127.0.0.1")["device_info"]["mac_address"] == "0005CDD1F6E8"
+
+
+@pytest.mark.asyncio
+async def test_init_device_info_fails(echo_telnet, denon_receiver, monkeypatch):
+    """Test the connection made while the device info failed is disconnected."""
+    avr = await denon_receiver(init=False)
+
+    async def update_device_info():
+        raise ValueError("no device info")
+
+    monkeypatch.setattr(avr, "update_device_info", update_device_info)
+    with pytest.raises(ValueError):
+        await avr.init()
+    assert avr.connection_state == const.STATE_CONNECTED
+    await avr.disconnect()
+    assert avr.connection_state == const.STATE_DISCONNECTED
+
+
+@pytest.mark.asyncio
+async def test_resync(echo_telnet, denon_receiver, monkeypatch):
+    """Test a resync refreshes power, volume and source, then the most changed."""
+    monkeypatch.setattr(const, "DEFAULT_RESYNC_BATCH", 1)
+    monkeypatch.setattr(const, "DEFAULT_RESYNC_INTERVAL", 0.0)
+    avr = await denon_receiver()
+    for mute in (True, False, True):
+        avr.update_state({const.ATTR_MUTE: mute})
+    await asyncio.sleep(0.1)
+    echo_telnet.clear()
+
+    resync = asyncio.create_task(avr.resync())
+    await asyncio.sleep(0.8)  # the priority queries go unanswered, then a batch
+    resync.cancel()
+    await asyncio.gather(resync, return_exceptions=True)
+    queries = [message for message in dict.fromkeys(echo_telnet) if message != "PW?\r"]
+    assert set(queries[:3]) == {"MV?\r", "SI?\r", "Z2?\r"}
+    assert queries[3] == "MU?\r"
+    assert avr.metrics["resyncs"] == 1
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_resync_admission(echo_telnet, denon_receiver, monkeypatch):
+    """Test admission is released before the lazy part of a resync."""
+    admission = AdmissionController(1)
+    avr = await denon_receiver(admission=admission)
+    active = []
+
+    async def resync_rest():
+        active.append(admission.active)
+
+    monkeypatch.setattr(avr, "resync_rest", resync_rest)
+    # pylint: disable=protected-access
+    await asyncio.wait_for(avr.telnet_connection._resync(), 5)
+    assert active == [0]
+    assert admission.admitted == 1
+    assert avr.metrics["resyncs"] == 1
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_state_cache(echo_telnet, denon_receiver, monkeypatch, tmp_path):
+    """Test the state is saved in batches and loaded stale after a restart."""
+    monkeypatch.setattr(const, "DEFAULT_STATE_SAVE_DELAY", 0.05)
+    path = str(tmp_path / "state.json")
+    cache = FileCache(path)
+    avr = await denon_receiver(state_cache=cache)
+    assert not avr.stale
+    writes = []
+    monkeypatch.setattr(cache, "_write", writes.append)
+    for volume in (-40.0, -39.5, -39.0):
+        avr.update_state({const.ATTR_VOLUME: volume, const.ATTR_MUTE: False})
+    await asyncio.sleep(0.1)
+    assert len(writes) == 1
+    monkeypatch.undo()
+    avr.update_state({const.ATTR_VOLUME: -38.5})
+    await avr.disconnect()  # saves the pending change
+
+    avr = await denon_receiver(state_cache=FileCache(path))
+    assert avr.state[const.ATTR_VOLUME] == -38.5
+    assert {const.ATTR_VOLUME, const.ATTR_MUTE} <= avr.stale
+    assert avr.state_age(const.ATTR_VOLUME) is None
+    avr.update_state({const.ATTR_VOLUME: -38.0})
+    assert const.ATTR_VOLUME not in avr.stale
+    assert const.ATTR_MUTE in avr.stale
+    assert not avr.change_counts[const.ATTR_VOLUME]
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_offline_policy(echo_telnet, denon_receiver):
+    """Test commands sent offline fail, or are buffered and replayed coalesced."""
+    avr = await denon_receiver()
+    conn = avr.telnet_connection
+    await conn.disconnect()
+    volume = avr.commands[const.ATTR_VOLUME]
+    assert await conn.async_send_command(volume.set_val(-40, qos=1)) is None
+    assert avr.metrics["offline_commands_dropped"] == 1
+
+    conn.offline_policy = const.OFFLINE_FAIL
+    with pytest.raises(AVReceiverNotConnectedError):
+        conn.send_command(volume.set_val(-40))
+
+    conn.offline_policy = const.OFFLINE_BUFFER
+    first = conn.async_send_command(volume.set_val(-40, qos=1))
+    latest = conn.async_send_command(volume.set_val(-30, qos=1))
+    mute = conn.async_send_command(avr.commands[const.ATTR_MUTE].set_val(True), ttl=0)
+    assert await mute is None
+    echo_telnet.clear()
+    await conn.connect()
+    assert str(await first) == str(await latest) == "MV50"
+    assert [message for message in echo_telnet if message.startswith("MV")] == [
+        "MV50\r"
+    ]
+    assert avr.metrics["offline_commands_buffered"] == 2
+    assert avr.metrics["offline_commands_coalesced"] == 1
+    assert avr.metrics["offline_commands_expired"] == 1
+    assert avr.metrics["offline_commands_replayed"] == 1
+
+    await conn.disconnect()
+    buffered = conn.async_send_command(volume.set_val(-40, qos=1))
+    await avr.disconnect()
+    assert await buffered is None
+    assert avr.metrics["offline_commands_discarded"] == 1
+    assert avr.metrics["offline_commands_expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_command_replaces_unawaited_query(echo_telnet, denon_receiver):
+    """Test a command that overwrites a queued QoS 0 query is awaited."""
+    avr = await denon_receiver()
+    conn = avr.telnet_connection
+    volume = avr.commands[const.ATTR_VOLUME]
+    conn.send_command(volume.set_query())
+    assert str(await conn.async_send_command(volume.set_val(-30, qos=1))) == "MV50"
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_rtt_estimates(echo_telnet, denon_receiver):
+    """Test answers update the round trip time estimates that time resends."""
+    avr = await denon_receiver()
+    conn = avr.telnet_connection
+    conn.group_rtt = True
+    volume = avr.commands[const.ATTR_VOLUME]
+    for val in range(-40, -40 + const.DEFAULT_GROUP_RTT_SAMPLES):
+        assert await conn.async_send_command(volume.set_val(val, qos=1))
+    assert avr.metrics["rtt_samples"] == const.DEFAULT_GROUP_RTT_SAMPLES
+    assert avr.metrics["rto"] == conn.rtt.rto < const.DEFAULT_TELNET_TIMEOUT
+    assert conn.retry_timeout("MV") == conn.group_rtts["MV"].rto
+    assert conn.retry_timeout("MV", 2) == 2 * conn.group_rtts["MV"].rto
+    assert conn.retry_timeout("SI") == conn.rtt.rto
+    await avr.disconnect()
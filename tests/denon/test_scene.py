@@ -0,0 +1,76 @@
+"""Test applying scenes to a Denon/Marantz receiver."""
+import pytest
+
+from pyavreceiver import const
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.commands import get_command_lookup
+from pyavreceiver.scene import Scene, plan
+
+
+def test_plan(command_dict):
+    """Test settings are staged in dependency order."""
+    settings = {
+        const.ATTR_VOLUME: -30,
+        denon_const.ATTR_DYNAMIC_EQ: True,
+        const.ATTR_SOUND_MODE: "movie",
+        const.ATTR_SOURCE: "DVD",
+        const.ATTR_ZONE1_POWER: True,
+        const.ATTR_MUTE: False,
+    }
+    commands = get_command_lookup(command_dict)
+    assert plan(settings, commands) == [
+        ("power", {const.ATTR_ZONE1_POWER: True}),
+        ("source", {const.ATTR_SOURCE: "DVD"}),
+        ("sound_mode", {const.ATTR_SOUND_MODE: "movie"}),
+        ("settings", {denon_const.ATTR_DYNAMIC_EQ: True}),
+        ("volume", {const.ATTR_VOLUME: -30, const.ATTR_MUTE: False}),
+    ]
+    assert plan({const.ATTR_POWER: False, const.ATTR_VOLUME: -30}, commands) == [
+        ("volume", {const.ATTR_VOLUME: -30}),
+        ("power", {const.ATTR_POWER: False}),
+    ]
+    zone2 = {const.ATTR_SOURCE: "TUNER", const.ATTR_POWER: True, const.ATTR_MUTE: True}
+    assert plan(zone2, commands, "zone2_") == [
+        ("power", {const.ATTR_POWER: True}),
+        ("source", {const.ATTR_SOURCE: "TUNER"}),
+        ("volume", {const.ATTR_MUTE: True}),
+    ]
+    with pytest.raises(ValueError):
+        Scene({"zone9": {}})
+
+
+@pytest.mark.asyncio
+async def test_apply_scene(echo_telnet, denon_receiver):
+    """Test a scene is applied to each zone in order and reports latency."""
+    avr = await denon_receiver()
+    echo_telnet.clear()
+
+    scene = Scene(
+        {
+            "main": {
+                const.ATTR_VOLUME: -30,
+                const.ATTR_SOURCE: "DVD",
+                const.ATTR_ZONE1_POWER: True,
+            },
+            "zone2": {
+                const.ATTR_VOLUME: -40,
+                const.ATTR_SOURCE: "TUNER",
+                const.ATTR_POWER: True,
+            },
+            "zone3": {const.ATTR_POWER: True},  # the receiver has two zones
+        }
+    )
+    result = await scene.apply(avr)
+    assert result.outcomes == {
+        "main": {"volume": True, "source": True, "zone1_power": True},
+        "zone2": {"volume": True, "source": True, "power": True},
+        "zone3": {"power": False},
+    }
+    assert not result.success
+    assert result.latency >= max(result.zone_latency.values())
+
+    main = [msg for msg in echo_telnet if msg[:2] in ("ZM", "SI", "MV")]
+    zone2 = [msg for msg in echo_telnet if msg.startswith("Z2")]
+    assert main == ["ZMON\r", "SIDVD\r", "MV50\r"]
+    assert zone2 == ["Z2ON\r", "Z2TUNER\r", "Z240\r"]
+    await avr.disconnect()
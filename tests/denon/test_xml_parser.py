@@ -0,0 +1,86 @@
+"""Test the incremental Denon/Marantz XML parsers."""
+import pytest
+
+from pyavreceiver.denon.xml_parser import (
+    AppCommandSetParser,
+    DeviceInfoParser,
+    LegacyRenamedSourcesParser,
+    RenamedSourcesParser,
+)
+
+
+def feed_chunks(parser, name, size=256):
+    """Feed a fixture to parser in chunks and return the chunks fed."""
+    with open(f"tests/denon/fixtures/{name}", "rb") as file:
+        data = file.read()
+    chunks = 0
+    for i in range(0, len(data), size):
+        chunks += 1
+        if parser.feed(data[i : i + size]):
+            break
+    return chunks, len(range(0, len(data), size))
+
+
+def test_device_info_stops_early():
+    """Test Deviceinfo.xml parsing stops once the fields are found."""
+    parser = DeviceInfoParser()
+    chunks, total = feed_chunks(parser, "Deviceinfo-X8500H.xml")
+    assert parser.done
+    assert chunks < total / 100
+    assert parser.close() == {
+        "model_name": "AVC-X8500H",
+        "mac_address": "0005CDA60D0C",
+        "zones": "3",
+        "api_version": "0301",
+    }
+
+
+def test_upnp_device_info():
+    """Test the UPnP description fields are found under the device element."""
+    parser = DeviceInfoParser()
+    feed_chunks(parser, "upnp-X1500H.xml")
+    assert parser.close() == {
+        "model_name": "Denon AVR-X1500H",
+        "serial_number": "AYW27181117704",
+        "manufacturer": "Denon",
+        "friendly_name": "TV Speakers",
+    }
+
+
+@pytest.mark.parametrize(
+    "name", ["GetRename-Delete-NR1604.xml", "GetRename-Delete-X1500H.xml"]
+)
+def test_renamed_sources_chunked(name):
+    """Test chunked parsing matches parsing the whole document."""
+    parser = RenamedSourcesParser()
+    feed_chunks(parser, name, size=7)
+    whole = RenamedSourcesParser()
+    with open(f"tests/denon/fixtures/{name}", encoding="utf-8") as file:
+        whole.feed(file.read())
+    assert parser.close() == whole.close()
+    assert parser.done
+
+
+def test_legacy_sources_stop_early():
+    """Test MainZoneXml parsing stops after the source lists."""
+    parser = LegacyRenamedSourcesParser()
+    chunks, total = feed_chunks(parser, "MainZoneXml-3311CI.xml", size=64)
+    assert parser.done
+    assert chunks < total
+    assert parser.close()["SqzBox"] == "CD"
+
+
+def test_app_command_set_outcomes():
+    """Test the outcome of each parameter of a set command is parsed."""
+    parser = AppCommandSetParser()
+    parser.feed(
+        '<?xml version="1.0" encoding="utf-8" ?><rx><cmd><name>SetAudyssey</name>'
+        '<list><param name="dynamiceq" result="1"></param>'
+        '<param name="multeq" result="0"></param>'
+        '<param name="dynamicvol"></param></list></cmd></rx>'
+    )
+    assert parser.close() == {
+        ("SetAudyssey", "dynamiceq"): True,
+        ("SetAudyssey", "multeq"): False,
+        ("SetAudyssey", "dynamicvol"): True,
+    }
@@ -0,0 +1,326 @@
+"""Test the Denon/Marantz zones."""
+import asyncio
+
+import pytest
+
+from pyavreceiver import const
+from pyavreceiver.cache import FileCache
+from pyavreceiver.denon import const as denon_const
+from pyavreceiver.denon.http_api import DenonHTTPApi
+from pyavreceiver.denon.response import DenonMessage
+from pyavreceiver.zone import UPDATE_QOS
+
+
+def test_make_xml_set_request():
+    """Test the XML body of versioned set commands."""
+    xml = DenonHTTPApi.make_xml_request(
+        [("SetAudyssey", {"dynamiceq": "1", "multeq": "3"})]
+    )
+    assert xml == (
+        b'<?xml version="1.0" encoding="utf-8"?>\n<tx><cmd id="3">'
+        b"<name>SetAudyssey</name><list>"
+        b'<param name="dynamiceq">1</param><param name="multeq">3</param>'
+        b"</list></cmd></tx>"
+    )
+
+
+@pytest.mark.asyncio
+async def test_set_many(echo_telnet, http_fixture_server, denon_receiver):
+    """Test settings are batched over HTTP and the rest sent over telnet."""
+    avr = await denon_receiver()
+    http_fixture_server.requests.clear()
+
+    results = await avr.main.set_many(
+        {
+            denon_const.ATTR_DYNAMIC_EQ: True,
+            denon_const.ATTR_MULTI_EQ: "audyssey",
+            const.ATTR_DSP_DRC: "medium",
+            const.ATTR_SOUND_MODE: "stereo",
+            const.ATTR_BASS: 2,
+            "not_a_command": 1,
+        }
+    )
+    assert results == {
+        denon_const.ATTR_DYNAMIC_EQ: True,
+        denon_const.ATTR_MULTI_EQ: True,
+        const.ATTR_DSP_DRC: True,
+        const.ATTR_SOUND_MODE: True,
+        const.ATTR_BASS: True,
+        "not_a_command": False,
+    }
+    assert http_fixture_server.requests == ["/goform/AppCommand0300.xml"]
+    assert (
+        '<param name="dynamiceq">1</param><param name="multeq">3</param>'
+        '<param name="dynamicvol">2</param>'
+    ) in http_fixture_server.bodies[-1]
+    assert sorted(message for message in echo_telnet if "?" not in message) == [
+        "MSSTEREO\r",
+        "PSBAS 52\r",
+    ]
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_set_many_falls_back_to_telnet(
+    echo_telnet, http_fixture_server, denon_receiver
+):
+    """Test settings are sent over telnet if the HTTP request fails."""
+    del http_fixture_server.routes[denon_const.API_APP_COMMAND_0300_URL]
+    avr = await denon_receiver()
+
+    results = await avr.main.set_many({denon_const.ATTR_DYNAMIC_EQ: False})
+    assert results == {denon_const.ATTR_DYNAMIC_EQ: True}
+    assert "PSDYNEQ OFF\r" in echo_telnet
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_set_many_outcome_per_setting(
+    echo_telnet, http_fixture_server, denon_receiver
+):
+    """Test a setting the HTTP request did not apply is sent over telnet."""
+    routes = http_fixture_server.routes
+    url = denon_const.API_APP_COMMAND_0300_URL
+    routes[url] = routes[url].replace(
+        '"dynamicvol" result="1"', '"dynamicvol" result="0"'
+    )
+    avr = await denon_receiver()
+    echo_telnet.clear()
+
+    results = await avr.main.set_many(
+        {denon_const.ATTR_DYNAMIC_EQ: True, const.ATTR_DSP_DRC: "medium"}
+    )
+    assert results == {denon_const.ATTR_DYNAMIC_EQ: True, const.ATTR_DSP_DRC: True}
+    assert [message for message in echo_telnet if "?" not in message] == [
+        "PSDYNVOL MED\r"
+    ]
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_elide_redundant_commands(echo_telnet, denon_receiver):
+    """Test commands that would not change fresh state are not sent."""
+    avr = await denon_receiver(elide_max_age=60)
+    avr.update_state({"mute": False, "volume": -40.5, "bass": 2})
+
+    assert str(await avr.main.set_mute(False)) == "MUOFF"
+    elided = await avr.main.set_volume(-40.5)
+    assert isinstance(elided, DenonMessage)
+    assert elided.state_update == {const.ATTR_VOLUME: -40.5}
+    assert avr.main.set_bass(2)
+    assert await avr.main.set_many({"mute": False, "volume": -40.5}) == {
+        "mute": True,
+        "volume": True,
+    }
+    assert avr.metrics["commands_elided"] == 5
+    assert not [message for message in echo_telnet if "?" not in message]
+
+    assert str(await avr.main.set_mute(True)) == "MUON"
+    assert "MUON\r" in echo_telnet
+
+    avr.elide_max_age = 0  # all state is stale
+    assert str(await avr.main.set_volume(-40.5)) == "MV395"
+    assert "MV395\r" in echo_telnet
+    assert avr.metrics["commands_elided"] == 5
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_no_elision_while_pending(echo_telnet, denon_receiver):
+    """Test setting back to the reported value is sent while a change is pending."""
+    avr = await denon_receiver(elide_max_age=60)
+    avr.update_state({"volume": -40})
+
+    changed = avr.main.set_volume(-30)
+    restored = avr.main.set_volume(-40)
+    await asyncio.gather(changed, restored)
+    assert avr.metrics["commands_elided"] == 0
+    assert "MV40\r" in echo_telnet
+    assert avr.main.volume == -40
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_ramp_volume(echo_telnet, denon_receiver):
+    """Test a ramp sends one setpoint per interval and a new ramp retargets it."""
+    avr = await denon_receiver()
+    avr.update_state({"volume": -40})
+    echo_telnet.clear()
+
+    assert str(await avr.main.ramp_volume(-30, 0.5)) == "MV50"
+    sent = [message for message in echo_telnet if "?" not in message]
+    assert sent == [f"MV{level}\r" for level in range(41, 51)]
+    assert avr.main.volume == -30
+
+    echo_telnet.clear()
+    first = asyncio.create_task(avr.main.ramp_volume(-20, 1.0, "ease_in_out"))
+    await asyncio.sleep(0.22)
+    assert str(await avr.main.ramp_volume(-40, 0.2)) == "MV40"
+    assert await first is None
+    levels = [int(message[2:4]) for message in echo_telnet if "?" not in message]
+    peak = levels.index(max(levels))
+    assert levels[: peak + 1] == sorted(levels[: peak + 1])  # up then retargeted
+    assert levels[peak:] == sorted(levels[peak:], reverse=True)
+    assert 50 < max(levels) < 55
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_coalesce_volume_steps(echo_telnet, denon_receiver):
+    """Test a burst of relative volume steps becomes one absolute command."""
+    avr = await denon_receiver()
+
+    assert avr.main.set_volume_up()  # volume unknown, sent as is
+    await asyncio.sleep(0.1)
+    assert [message for message in echo_telnet if "?" not in message] == ["MVUP\r"]
+
+    echo_telnet.clear()
+    avr.update_state({"volume": -40})
+    for _ in range(20):
+        avr.main.set_volume_up()
+    await asyncio.sleep(0.1)
+    for _ in range(3):
+        avr.main.set_volume_down()
+        await asyncio.sleep(0.06)  # each step sent before the next
+    await asyncio.sleep(0.1)
+    sent = [message for message in echo_telnet if "?" not in message]
+    assert sent == ["MV50\r", "MV495\r", "MV49\r", "MV485\r"]
+    assert avr.main.volume == -31.5
+    assert avr.metrics["relative_commands_coalesced"] == 19
+
+    echo_telnet.clear()
+    pending = avr.main.set_volume(-20)
+    avr.main.set_volume_up()  # merged with the queued absolute volume
+    assert str(await pending) == "MV605"
+    await asyncio.sleep(0.1)
+    assert [message for message in echo_telnet if "?" not in message] == ["MV605\r"]
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_volume_step_resolves_on_volume_reply(volume_telnet, denon_receiver):
+    """Test a volume step resolves on the volume the receiver replies with."""
+    avr = await denon_receiver()
+
+    volume_up = avr.main.set(const.ATTR_VOLUME_UP, None, 2)
+    assert str(await asyncio.wait_for(volume_up, 0.5)) == "MV455"
+    volume_down = avr.zone2.set(const.ATTR_VOLUME_DOWN, None, 2)
+    assert str(await asyncio.wait_for(volume_down, 0.5)) == "Z2445"
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_multi_message_query(multi_telnet, denon_receiver):
+    """Test the lines answering one query are gathered into one response."""
+    avr = await denon_receiver()
+
+    response = await asyncio.wait_for(avr.main.update(const.ATTR_CHANNEL_LEVELS), 0.5)
+    assert str(response) == "CVFL 50\nCVFR 505\nCVC 48\nCVSW 45\nCVEND"
+    assert response.state_update["channel_level_fr"] == 0.5
+    assert avr.state["channel_level_sw"] == -5
+
+    start = asyncio.get_running_loop().time()
+    response = await avr.main.update(const.ATTR_SOUND_PARAMETERS)  # no end message
+    assert len(response) == 3
+    assert avr.state[const.ATTR_TONE_CONTROL] is True
+    assert (
+        asyncio.get_running_loop().time() - start
+        < const.DEFAULT_MULTI_RESPONSE_WINDOW + const.DEFAULT_TELNET_TIMEOUT
+    )
+    assert [message for message in multi_telnet if message in ("CV?\r", "PS?\r")] == [
+        "CV?\r",
+        "PS?\r",
+    ]
+
+    multi_telnet.clear()
+    plan = await avr.main.update_all()
+    assert plan.planned < plan.naive
+    assert plan.sent >= plan.planned
+    assert "CV?\r" in multi_telnet
+    assert not [message for message in multi_telnet if message.startswith("CVFL")]
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_skip_unsupported_groups(selective_telnet, denon_receiver, tmp_path):
+    """Test groups learned to be unsupported are cached and skipped."""
+    selective_telnet.add("PSFH:")
+    names = [const.ATTR_VOLUME, const.ATTR_FRONT_HEIGHT]
+    cache = FileCache(str(tmp_path / "cache.json"))
+    avr = await denon_receiver(device_cache=cache)
+    assert not avr.capabilities.is_supported("Z3")  # a 2 zone model
+    avr.update_state({const.ATTR_POWER: True})
+
+    for _ in range(2):
+        plan = await avr.main.update_many(names)
+        assert plan.planned == 2
+    assert not avr.capabilities.is_supported("PSFH:")
+    await avr.disconnect()
+
+    avr = await denon_receiver(device_cache=FileCache(str(tmp_path / "cache.json")))
+    plan = await avr.main.update_many(names)
+    assert list(plan.queries) == [const.ATTR_VOLUME]
+    assert plan.skipped == {"PSFH:": [const.ATTR_FRONT_HEIGHT]}
+    attempts = range(1, const.DEFAULT_RETRY_SCHEMA[UPDATE_QOS] + 2)
+    saved = sum(avr.telnet_connection.retry_timeout("PSFH:", a) for a in attempts)
+    assert plan.time_saved == pytest.approx(saved)
+    assert avr.metrics["query_time_saved"] == pytest.approx(saved)
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_no_unsupported_groups_offline(selective_telnet, denon_receiver):
+    """Test queries dropped while disconnected do not mark groups unsupported."""
+    avr = await denon_receiver()
+    unsupported = set(avr.capabilities.unsupported)
+    await avr.disconnect()
+    avr.update_state({const.ATTR_POWER: True})
+
+    for _ in range(2):
+        plan = await avr.main.update_all()
+        assert plan.sent == 0
+    assert avr.capabilities.unsupported == unsupported
+
+
+@pytest.mark.asyncio
+async def test_standby_query_suppression(selective_telnet, denon_receiver, monkeypatch):
+    """Test queries are held in standby and caught up on power on."""
+    monkeypatch.setattr(const, "DEFAULT_CATCH_UP_DELAY", 0.0)
+    avr = await denon_receiver()
+    avr.update_state({const.ATTR_POWER: False})
+
+    plan = await asyncio.wait_for(
+        avr.main.update_many([const.ATTR_VOLUME, const.ATTR_MUTE, const.ATTR_POWER]),
+        0.5,
+    )
+    assert plan.planned == 3
+    assert avr.metrics["queries_suppressed"] == 2
+    assert avr.capabilities.is_supported("MV")
+    assert avr.main.volume is None
+
+    await asyncio.sleep(0.1)  # let the queued PW? go before PWON
+    assert avr.set_power(True)  # echoed as PWON
+    await asyncio.sleep(0.3)
+    assert avr.metrics["catch_up_refreshes"] == 1
+    assert avr.main.volume == -34.5
+    assert avr.metrics["queries_suppressed"] == 2
+    await avr.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_zone2_query_catch_up(selective_telnet, denon_receiver, monkeypatch):
+    """Test queries of zone2 held in its standby are caught up on its power on."""
+    monkeypatch.setattr(const, "DEFAULT_CATCH_UP_DELAY", 0.0)
+    avr = await denon_receiver()
+    avr.update_state({const.ATTR_POWER: True, const.ATTR_ZONE2_POWER: False})
+
+    mute = avr.zone2.prefix + const.ATTR_MUTE
+    await asyncio.wait_for(avr.zone2.update_many([mute]), 0.5)
+    assert avr.metrics["queries_suppressed"] == 1
+
+    sent = avr.metrics["queries_sent"]
+    await avr.zone2.set_power(True)  # echoed as Z2ON
+    await asyncio.sleep(0.3)
+    assert avr.metrics["catch_up_refreshes"] == 1
+    assert avr.metrics["queries_sent"] == sent + 1
+    await avr.disconnect()
@@ -0,0 +1,49 @@
+"""Tests for the AdmissionController class."""
+import asyncio
+
+import pytest
+
+from pyavreceiver.admission import AdmissionController
+
+
+@pytest.mark.asyncio
+async def test_limit():
+    """Test no more than limit receivers are admitted at once."""
+    admission = AdmissionController(2)
+    most = 0
+
+    async def reconnect():
+        nonlocal most
+        async with admission.admit():
+            most = max(most, admission.active)
+            await asyncio.sleep(0.01)
+
+    tasks = [asyncio.create_task(reconnect()) for _ in range(6)]
+    await asyncio.sleep(0)
+    assert admission.active == 2
+    assert admission.waiting == 4
+    await asyncio.gather(*tasks)
+    assert most == 2
+    assert admission.admitted == 6
+    assert admission.active == admission.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait():
+    """Test a receiver cancelled while waiting does not hold a slot."""
+    admission = AdmissionController(1)
+
+    async def reconnect():
+        async with admission.admit():
+            pass
+
+    async with admission.admit():
+        waiter = asyncio.create_task(reconnect())
+        await asyncio.sleep(0)
+        assert admission.waiting == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+    assert admission.waiting == 0
+    async with admission.admit():
+        assert admission.active == 1
@@ -0,0 +1,46 @@
+"""Tests for the FileCache class."""
+from unittest.mock import patch
+
+import pytest
+
+from pyavreceiver.cache import FileCache
+
+
+@pytest.mark.asyncio
+async def test_save_and_load(tmp_path):
+    """Test entries persist across instances and are found by host."""
+    path = str(tmp_path / "cache.json")
+    cache = FileCache(path)
+    await cache.async_load()
+    assert cache.get("192.168.1.2") is None
+    cache.set("AYW27181117704", {"model_name": "AVR-X1500H"}, host="192.168.1.2")
+    await cache.async_save()
+
+    cache = FileCache(path)
+    await cache.async_load()
+    assert cache.get("AYW27181117704") == {"model_name": "AVR-X1500H"}
+    assert cache.get("192.168.1.2") == {"model_name": "AVR-X1500H"}
+    assert cache.is_fresh("192.168.1.2")
+
+
+@pytest.mark.asyncio
+async def test_ttl(tmp_path):
+    """Test entries expire after the TTL."""
+    cache = FileCache(str(tmp_path / "cache.json"), ttl=60)
+    with patch("pyavreceiver.cache.time.time", return_value=1000):
+        cache.set("key", 1)
+    with patch("pyavreceiver.cache.time.time", return_value=1059):
+        assert cache.is_fresh("key")
+    with patch("pyavreceiver.cache.time.time", return_value=1061):
+        assert not cache.is_fresh("key")
+        assert cache.get("key") == 1
+
+
+@pytest.mark.asyncio
+async def test_corrupt_file(tmp_path):
+    """Test an unreadable file is treated as empty."""
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    cache = FileCache(str(path))
+    await cache.async_load()
+    assert cache.get("key") is None
@@ -0,0 +1,131 @@
+"""Tests for SSDP discovery and network scanning."""
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pyavreceiver import const
+from pyavreceiver.discovery import discover, match_endpoint, parse_ssdp_response, scan
+from pyavreceiver.probe import clear_probe_cache
+
+SSDP_RESPONSE = (
+    "HTTP/1.1 200 OK\r\n"
+    "CACHE-CONTROL: max-age=180\r\n"
+    "LOCATION: http://{host}:{port}/description.xml\r\n"
+    "ST: urn:schemas-upnp-org:device:MediaRenderer:1\r\n"
+    "\r\n"
+)
+
+
+class Responder(asyncio.DatagramProtocol):
+    """Stand-in for the receivers on a network answering an M-SEARCH."""
+
+    def __init__(self, locations):
+        self.locations = locations
+        self.searches = []
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.searches.append(data)
+        for host, port in self.locations:
+            response = SSDP_RESPONSE.format(host=host, port=port)
+            self.transport.sendto(response.encode(), addr)
+
+
+async def start_description_server() -> TestServer:
+    """Start a UPnP description server."""
+
+    async def handle(request: web.Request) -> web.Response:
+        if request.path != "/description.xml":
+            raise web.HTTPNotFound()
+        return web.Response(text="<root/>")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    return server
+
+
+def test_parse_ssdp_response():
+    """Test parsing the headers of an SSDP response."""
+    headers = parse_ssdp_response(
+        SSDP_RESPONSE.format(host="10.0.0.2", port=8080).encode()
+    )
+    assert headers["LOCATION"] == "http://10.0.0.2:8080/description.xml"
+    assert parse_ssdp_response(b"NOTIFY * HTTP/1.1\r\n\r\n") is None
+    assert parse_ssdp_response(b"\xff") is None
+
+
+def test_match_endpoint():
+    """Test matching a LOCATION to the known UPnP endpoints."""
+    endpoints = const.UPNP_ENDPOINTS
+    assert (
+        match_endpoint("http://10.0.0.2:8080/description.xml", endpoints) == "denon-avr"
+    )
+    assert (
+        match_endpoint(
+            "http://10.0.0.2:60006/upnp/desc/aios_device/aios_device.xml", endpoints
+        )
+        == "denon-avr-x-2016"
+    )
+    assert match_endpoint("http://10.0.0.2/dmr.xml", endpoints) is None
+
+
+@pytest.mark.asyncio
+async def test_discover():
+    """Test discovery against a local SSDP responder."""
+    clear_probe_cache()
+    server = await start_description_server()
+    endpoints = {
+        "denon-avr": f":{server.port}/description.xml",
+        "denon-avr-x-2016": f":{server.port}/aios_device.xml",
+    }
+    loop = asyncio.get_running_loop()
+    transport, responder = await loop.create_datagram_endpoint(
+        lambda: Responder(
+            [
+                ("127.0.0.1", server.port),
+                ("127.0.0.1", server.port),  # duplicate answer
+                ("127.0.0.2", 1),  # not a supported device
+            ]
+        ),
+        local_addr=("127.0.0.1", 0),
+    )
+    address = transport.get_extra_info("sockname")
+
+    devices = [
+        device
+        async for device in discover(timeout=0.5, address=address, endpoints=endpoints)
+    ]
+    assert len(responder.searches) == const.SSDP_REPEAT
+    assert b'MAN: "ssdp:discover"' in responder.searches[0]
+    assert len(devices) == 1
+    assert devices[0].host == "127.0.0.1"
+    assert devices[0].name == "denon-avr"
+    assert devices[0].upnp_data == "<root/>"
+
+    transport.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_scan():
+    """Test probing a list of hosts."""
+    clear_probe_cache()
+    server = await start_description_server()
+    endpoints = {"denon-avr": f":{server.port}/description.xml"}
+    devices = [
+        device
+        async for device in scan(
+            ["127.0.0.1", "127.0.0.2", "127.0.0.3"],
+            endpoints=endpoints,
+            max_concurrency=2,
+        )
+    ]
+    assert [device.host for device in devices] == ["127.0.0.1"]
+    await server.close()
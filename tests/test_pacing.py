@@ -0,0 +1,35 @@
+"""Tests for the AdaptivePacer class."""
+import pytest
+
+from pyavreceiver import const
+from pyavreceiver.pacing import AdaptivePacer
+
+
+def test_additive_decrease_multiplicative_increase():
+    """Test quick answers speed the pacing up and drops back it off, in bounds."""
+    pacer = AdaptivePacer(0.05, minimum=0.02, maximum=0.2)
+    pacer.answered(0.01)
+    assert pacer.interval == pytest.approx(0.05 - const.DEFAULT_PACING_STEP)
+    for _ in range(100):
+        pacer.answered(0.01)
+    assert pacer.interval == 0.02
+    pacer.dropped()
+    assert pacer.interval == pytest.approx(0.02 * const.DEFAULT_PACING_BACKOFF)
+    for _ in range(10):
+        pacer.dropped()
+    assert pacer.interval == 0.2
+
+
+def test_slow_answer_holds():
+    """Test a slow answer neither speeds up nor backs off the pacing."""
+    pacer = AdaptivePacer(0.05)
+    pacer.answered(const.DEFAULT_PACING_SLOW_ANSWER + 0.01)
+    assert pacer.interval == 0.05
+
+
+def test_fixed_interval():
+    """Test equal bounds fix the interval."""
+    pacer = AdaptivePacer(0.05, minimum=0.05, maximum=0.05)
+    pacer.answered(0.01)
+    pacer.dropped()
+    assert pacer.interval == 0.05
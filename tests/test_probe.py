@@ -0,0 +1,80 @@
+"""Tests for probing a host for a supported device."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pyavreceiver.error import AVReceiverIncompatibleDeviceError
+from pyavreceiver.http_api import create_session
+from pyavreceiver.probe import clear_probe_cache, probe
+
+
+async def start_server(status: int = 200, latency: float = 0.0) -> TestServer:
+    """Start a UPnP description server."""
+    requests = []
+
+    async def handle(request: web.Request) -> web.Response:
+        requests.append(request.path)
+        await asyncio.sleep(latency)
+        return web.Response(status=status, text="<root/>")
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    server.requests = requests
+    return server
+
+
+@pytest.mark.asyncio
+async def test_probe_priority():
+    """Test a success is decisive once the endpoints ahead of it have failed."""
+    clear_probe_cache()
+    slow = await start_server(latency=0.3)
+    fast = await start_server()
+    not_found = await start_server(status=404)
+    endpoints = {
+        "denon-avr": f":{slow.port}/description.xml",
+        "denon-avr-x": f":{slow.port}/description.xml",
+        "denon-avr-x-2016": f":{fast.port}/aios_device.xml",
+    }
+    session = create_session()
+    start = time.perf_counter()
+    name, text = await probe("127.0.0.1", session, endpoints=endpoints)
+    assert time.perf_counter() - start >= 0.3
+    assert name == "denon-avr"
+    assert text == "<root/>"
+    assert len(slow.requests) == 1  # shared URL is requested once
+    assert len(fast.requests) == 1
+
+    # The detected driver is cached and probed alone
+    await probe("127.0.0.1", session, endpoints=endpoints)
+    assert len(slow.requests) == 2
+    assert len(fast.requests) == 1
+
+    clear_probe_cache()
+    endpoints["denon-avr"] = endpoints["denon-avr-x"] = f":{not_found.port}/d.xml"
+    name, _ = await probe("127.0.0.1", session, endpoints=endpoints)
+    assert name == "denon-avr-x-2016"
+
+    await session.close()
+    for server in (slow, fast, not_found):
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_probe_failures():
+    """Test failed and unreachable endpoints raise incompatible device."""
+    clear_probe_cache()
+    not_found = await start_server(status=404)
+    endpoints = {
+        "denon-avr": f":{not_found.port}/description.xml",
+        "denon-avr-x-2016": ":1/aios_device.xml",
+    }
+    session = create_session()
+    with pytest.raises(AVReceiverIncompatibleDeviceError):
+        await probe("127.0.0.1", session, endpoints=endpoints, timeout=1)
+    await session.close()
+    await not_found.close()
@@ -0,0 +1,36 @@
+"""Tests for the RttEstimator class."""
+import pytest
+
+from pyavreceiver import const
+from pyavreceiver.rtt import RttEstimator
+
+
+def test_initial_timeout():
+    """Test the initial timeout is used until the first sample."""
+    rtt = RttEstimator(0.25)
+    assert rtt.srtt is None
+    assert rtt.rto == 0.25
+
+
+def test_rfc_6298_estimates():
+    """Test the smoothed round trip time, its variation and the timeout."""
+    rtt = RttEstimator(minimum=0.0, maximum=10.0)
+    rtt.sample(0.1)
+    assert rtt.srtt == pytest.approx(0.1)
+    assert rtt.rttvar == pytest.approx(0.05)
+    assert rtt.rto == pytest.approx(0.1 + const.RTT_K * 0.05)
+    rtt.sample(0.2)
+    assert rtt.rttvar == pytest.approx(0.75 * 0.05 + 0.25 * 0.1)
+    assert rtt.srtt == pytest.approx(0.875 * 0.1 + 0.125 * 0.2)
+    assert rtt.samples == 2
+
+
+def test_bounds_and_backoff():
+    """Test the timeout stays in bounds and doubles with each resend."""
+    rtt = RttEstimator(minimum=0.05, maximum=1.0)
+    for _ in range(50):
+        rtt.sample(0.001)
+    assert rtt.rto == 0.05
+    assert rtt.timeout(2) == pytest.approx(0.1)
+    assert rtt.timeout(3) == pytest.approx(0.2)
+    assert rtt.timeout(10) == 1.0
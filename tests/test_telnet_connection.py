@@ -1,11 +1,14 @@
 """Tests for the TelnetConnection class."""
 import asyncio
+import socket
+from collections import Counter
 from typing import Union
 from unittest.mock import patch
 
 import pytest
 
 from pyavreceiver import const
+from pyavreceiver.capabilities import Capabilities
 from pyavreceiver.command import TelnetCommand
 from pyavreceiver.dispatch import Dispatcher
 from tests import GenericTelnetConnection
@@ -15,7 +18,9 @@ class FakeAvr:
     """Mock AVR."""
 
     def __init__(self):
+        self.capabilities = Capabilities()
         self.dispatcher = Dispatcher()
+        self.metrics = Counter()
 
 
 class GenericCommand(TelnetCommand):
@@ -162,6 +167,70 @@ async def test_heartbeat(mock_telnet):
     await conn.disconnect()
 
 
+@pytest.mark.asyncio
+async def test_heartbeat_failure(mock_telnet):
+    """Test a probe left unanswered fails the connection within the timeout."""
+    avr = FakeAvr()
+    conn = GenericTelnetConnection(avr, "127.0.0.1", heart_beat=0.2)
+    conn.heart_beat_timeout = 0.3
+    await conn.init(auto_reconnect=False)
+    await asyncio.sleep(0.1)
+    assert conn.state == const.STATE_CONNECTED
+    await asyncio.sleep(0.5)
+
+    assert mock_telnet == ["PW?\r"]
+    assert conn.state == const.STATE_DISCONNECTED
+    assert avr.metrics["heart_beat_failures"] == 1
+    await conn.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_probe_failure(mock_telnet):
+    """Test an external probe left unanswered fails the connection."""
+    avr = FakeAvr()
+    conn = GenericTelnetConnection(avr, "127.0.0.1", heart_beat=None)
+    await conn.init(auto_reconnect=False)
+    conn.probe(0.2)
+    conn.probe(0.2)
+    await asyncio.sleep(0.4)
+
+    assert mock_telnet == ["PW?\r"]
+    assert conn.state == const.STATE_DISCONNECTED
+    assert avr.metrics["heart_beats"] == 1
+    assert avr.metrics["heart_beat_failures"] == 1
+    await conn.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_ahead_of_queue(mock_telnet):
+    """Test the probe is sent ahead of queued commands."""
+    conn = GenericTelnetConnection(FakeAvr(), "127.0.0.1", heart_beat=None)
+    await conn.init()
+    for group in "abcd":
+        conn.send_command(GenericCommand(group=group).set_val(1))
+    # pylint: disable=protected-access
+    conn._heartbeat_command()
+    await asyncio.sleep(0.1)
+
+    assert mock_telnet == ["PW?\r"]
+    sock = conn._writer.get_extra_info("socket")
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    await conn.disconnect()
+
+
+def test_reconnect_backoff():
+    """Test reconnect retries back off exponentially, with jitter, to a cap."""
+    conn = GenericTelnetConnection(FakeAvr(), "127.0.0.1")
+    # pylint: disable=protected-access
+    base = conn._reconnect_delay
+    for attempt in range(3):
+        delays = {conn._reconnect_backoff(attempt) for _ in range(20)}
+        assert len(delays) > 1
+        assert all(base * 2**attempt / 2 <= d <= base * 2**attempt for d in delays)
+    assert conn._reconnect_backoff(20) <= const.DEFAULT_RECONNECT_MAX_DELAY
+    assert conn._reconnect_backoff(5000) <= const.DEFAULT_RECONNECT_MAX_DELAY
+
+
 @pytest.mark.asyncio
 async def test_connect_fails():
     """Test connect to non-existing device."""